@@ -1,17 +1,43 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import time
+import uuid
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from pymongo.errors import DuplicateKeyError
 import os
 
+from cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
 JWT_SECRET = os.environ.get('JWT_SECRET', 'your-secret-key')
 JWT_ALGORITHM = os.environ.get('JWT_ALGORITHM', 'HS256')
 JWT_EXPIRATION_HOURS = int(os.environ.get('JWT_EXPIRATION_HOURS', 168))
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.environ.get('ACCESS_TOKEN_EXPIRE_MINUTES', 15))
+REFRESH_TOKEN_EXPIRE_HOURS = int(os.environ.get('REFRESH_TOKEN_EXPIRE_HOURS', JWT_EXPIRATION_HOURS))
+REVOCATION_REFRESH_SECONDS = int(os.environ.get('REVOCATION_REFRESH_SECONDS', 5))
+REFRESH_REUSE_GRACE_SECONDS = int(os.environ.get('REFRESH_REUSE_GRACE_SECONDS', 10))
+
+PASSWORD_HASH_EXECUTOR = os.environ.get('PASSWORD_HASH_EXECUTOR', 'thread')
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 4))
+PASSWORD_HASH_QUEUE_SIZE = int(os.environ.get('PASSWORD_HASH_QUEUE_SIZE', 32))
+
+TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', 10000))
+TOKEN_CACHE_TTL = int(os.environ.get('TOKEN_CACHE_TTL', 300))
+
+# Verified JWT payloads keyed by token digest, never kept past the token's exp
+token_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl=TOKEN_CACHE_TTL)
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -19,20 +45,311 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+def _timed_call(func, *args):
+    """Run func in a pool worker and report when it actually started"""
+    started_at = time.time()
+    result = func(*args)
+    return started_at, time.time() - started_at, result
+
+def _warm_up():
+    """No-op submitted at startup so each process worker is spawned up front"""
+    return None
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing/verification in a bounded worker pool so the event
+    loop is never blocked. Once `workers + queue_size` calls are pending,
+    new calls are rejected with 503 instead of queueing indefinitely.
+    """
+
+    def __init__(self, executor: str = PASSWORD_HASH_EXECUTOR,
+                 workers: int = PASSWORD_HASH_WORKERS,
+                 queue_size: int = PASSWORD_HASH_QUEUE_SIZE):
+        self.executor_type = executor
+        self.workers = workers
+        self.queue_size = queue_size
+        self._executor = None
+        self._pending = 0
+        self._running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+
+    def _get_executor(self):
+        if self._executor is None:
+            if self.executor_type == 'process':
+                # spawn, not fork: forking the API process would copy its event loop and sockets
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="password-hash"
+                )
+        return self._executor
+
+    def start(self):
+        """Create the pool now, so the first login doesn't pay for starting workers"""
+        executor = self._get_executor()
+        if self.executor_type == 'process':
+            for _ in range(self.workers):
+                executor.submit(_warm_up)
+
+    async def _submit(self, func, *args):
+        if self._pending >= self.workers + self.queue_size:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please try again shortly",
+                headers={"Retry-After": "1"},
+            )
+
+        loop = asyncio.get_running_loop()
+        submitted_at = time.time()
+        self._pending += 1
+        try:
+            started_at, run_time, result = await loop.run_in_executor(
+                self._get_executor(), _timed_call, func, *args
+            )
+        finally:
+            self._pending -= 1
+
+        wait = max(started_at - submitted_at, 0.0)
+        self.completed += 1
+        self.total_wait += wait
+        self.total_run += run_time
+        self.max_wait = max(self.max_wait, wait)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._submit(verify_password, plain_password, hashed_password)
+
+    @property
+    def queue_depth(self) -> int:
+        return max(self._pending - self.workers, 0)
+
+    @property
+    def avg_run_time(self) -> float:
+        return self.total_run / self.completed if self.completed else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "executor": self.executor_type,
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "in_flight": self._pending,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait / self.completed * 1000, 2) if self.completed else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+            "avg_run_ms": round(self.avg_run_time * 1000, 2),
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+password_hasher = PasswordHasher()
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password without blocking the event loop"""
+    return await password_hasher.hash(password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password without blocking the event loop"""
+    return await password_hasher.verify(plain_password, hashed_password)
+
+def _encode_token(data: dict, token_type: str, expires_delta: timedelta) -> str:
+    now = datetime.now(timezone.utc)
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
-    else:
-        expire = datetime.now(timezone.utc) + timedelta(hours=JWT_EXPIRATION_HOURS)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
-    return encoded_jwt
+    to_encode.update({
+        "type": token_type,
+        "jti": uuid.uuid4().hex,
+        # Float iat so revocations within the same second compare correctly
+        "iat": now.timestamp(),
+        "exp": now + expires_delta
+    })
+    return jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+    return _encode_token(
+        data, "access", expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+
+def create_refresh_token(user_id: str, expires_delta: Optional[timedelta] = None):
+    return _encode_token(
+        {"sub": user_id}, "refresh", expires_delta or timedelta(hours=REFRESH_TOKEN_EXPIRE_HOURS)
+    )
+
+def _timestamp(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+class RevocationList:
+    """
+    In-memory view of the revoked_tokens collection, so request auth never
+    touches the database. A document revokes either a single token (`jti`)
+    or every token issued to a user before `revoked_at` (role change or
+    deactivation). The view is refreshed incrementally every few seconds.
+    """
+
+    def __init__(self, refresh_seconds: int = REVOCATION_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._jtis = {}          # jti -> expires_at timestamp
+        self._user_cutoffs = {}  # user_id -> (revoked_at, expires_at) timestamps
+        self._last_seen = None
+        self._task = None
+        self.last_refresh = None
+        self.grace_reuses = 0
+
+    def _apply(self, doc: dict):
+        expires_at = _timestamp(doc['expires_at'])
+        if doc.get('jti'):
+            self._jtis[doc['jti']] = expires_at
+        elif doc.get('user_id'):
+            revoked_at = _timestamp(doc['revoked_at'])
+            current = self._user_cutoffs.get(doc['user_id'])
+            if current is None or current[0] < revoked_at:
+                self._user_cutoffs[doc['user_id']] = (revoked_at, expires_at)
+
+    def _prune(self):
+        now = time.time()
+        self._jtis = {jti: exp for jti, exp in self._jtis.items() if exp > now}
+        self._user_cutoffs = {
+            uid: cutoff for uid, cutoff in self._user_cutoffs.items() if cutoff[1] > now
+        }
+
+    def is_revoked(self, payload: dict) -> bool:
+        return payload.get("jti") in self._jtis or self.is_user_revoked(payload)
+
+    def is_user_revoked(self, payload: dict) -> bool:
+        """True if the token predates a revocation of all of its user's tokens"""
+        cutoff = self._user_cutoffs.get(payload.get("sub"))
+        return cutoff is not None and payload.get("iat", 0) <= cutoff[0]
+
+    async def refresh(self, db):
+        query = {"expires_at": {"$gt": datetime.now(timezone.utc)}}
+        if self._last_seen is not None:
+            query["revoked_at"] = {"$gte": self._last_seen}
+        async for doc in db.revoked_tokens.find(query, {"_id": 0}).sort("revoked_at", 1):
+            self._apply(doc)
+            self._last_seen = doc['revoked_at']
+        self._prune()
+        self.last_refresh = time.time()
+
+    async def consume_token(self, db, payload: dict, reason: str = "revoked") -> bool:
+        """
+        Revoke a single token, atomically across workers. Returns False if it
+        was already revoked, i.e. this call did not get to use it, or if it
+        has no jti to revoke it by.
+        """
+        if not payload.get('jti'):
+            return False
+        doc = {
+            "jti": payload['jti'],
+            "user_id": payload.get('sub'),
+            "revoked_at": datetime.now(timezone.utc),
+            "expires_at": datetime.fromtimestamp(payload['exp'], timezone.utc),
+            "reason": reason
+        }
+        try:
+            # The unique jti index makes the insert the single point of decision
+            await db.revoked_tokens.insert_one(dict(doc))
+            consumed = True
+        except DuplicateKeyError:
+            consumed = False
+        self._apply(doc)
+        return consumed
+
+    async def rotate_refresh_token(self, db, payload: dict) -> bool:
+        """
+        Use up a refresh token; False if it can no longer be used. Tabs that
+        hit a 401 together send the same token, so reuse within
+        REFRESH_REUSE_GRACE_SECONDS of its rotation is allowed. Later reuse
+        means the token was copied and revokes every token of the user.
+        """
+        if await self.consume_token(db, payload, reason="rotated"):
+            return True
+        used = await db.revoked_tokens.find_one(
+            {"jti": payload.get('jti')}, {"_id": 0, "reason": 1, "revoked_at": 1}
+        )
+        if not used or used.get('reason') != "rotated":
+            # Revoked by logout, not by an earlier refresh
+            return False
+        if time.time() - _timestamp(used['revoked_at']) <= REFRESH_REUSE_GRACE_SECONDS:
+            self.grace_reuses += 1
+            return True
+        logger.warning(f"Refresh token reuse for user {payload['sub']}, revoking all tokens")
+        await self.revoke_user(db, payload['sub'])
+        return False
+
+    async def revoke_token(self, db, payload: dict):
+        """Revoke a single access or refresh token until it expires"""
+        if not payload.get('jti'):
+            # Tokens issued before jti existed can only be revoked along with the user's others
+            await self.revoke_user(db, payload['sub'])
+            return
+        await self.consume_token(db, payload)
+
+    async def revoke_user(self, db, user_id: str):
+        """Revoke every token issued to a user up to now"""
+        now = datetime.now(timezone.utc)
+        doc = {
+            "jti": None,
+            "user_id": user_id,
+            "revoked_at": now,
+            "expires_at": now + timedelta(hours=REFRESH_TOKEN_EXPIRE_HOURS)
+        }
+        await db.revoked_tokens.insert_one(dict(doc))
+        self._apply(doc)
+
+    async def _run(self, db):
+        while True:
+            try:
+                await self.refresh(db)
+            except Exception as e:
+                logger.error(f"Revocation list refresh failed: {str(e)}")
+            await asyncio.sleep(self.refresh_seconds)
+
+    def start(self, db):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(db))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "revoked_tokens": len(self._jtis),
+            "revoked_users": len(self._user_cutoffs),
+            "refresh_seconds": self.refresh_seconds,
+            "refresh_grace_reuses": self.grace_reuses,
+            "seconds_since_refresh": round(time.time() - self.last_refresh, 1) if self.last_refresh else None,
+        }
+
+revocation_list = RevocationList()
 
 def decode_token(token: str) -> dict:
+    key = hashlib.sha256(token.encode()).hexdigest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return dict(payload)
+
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        return payload
+        token_cache.set(key, payload, expires_at=payload.get("exp"))
+        return dict(payload)
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -44,8 +361,14 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     token = credentials.credentials
     payload = decode_token(token)
     user_id = payload.get("sub")
-    if user_id is None:
+    if user_id is None or payload.get("type", "access") != "access":
         raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+    if revocation_list.is_revoked(payload):
+        raise HTTPException(
+            status_code=401,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return payload
 
 def require_role(required_roles: list):
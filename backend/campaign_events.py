@@ -0,0 +1,163 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Set
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+CAMPAIGN_STREAM_INTERVAL = float(os.environ.get('CAMPAIGN_STREAM_INTERVAL', 1.0))
+CAMPAIGN_STREAM_KEEPALIVE = float(os.environ.get('CAMPAIGN_STREAM_KEEPALIVE', 15.0))
+CAMPAIGN_STREAM_MAX_PER_CAMPAIGN = int(os.environ.get('CAMPAIGN_STREAM_MAX_PER_CAMPAIGN', 1000))
+CAMPAIGN_STREAM_MAX_TOTAL = int(os.environ.get('CAMPAIGN_STREAM_MAX_TOTAL', 5000))
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+class ProgressPublisher:
+    """
+    In-process fan-out of campaign progress to Server-Sent Events streams.
+
+    Writers call `publish()` with the campaign's new totals, or without
+    them to have `load_totals` read them when the event is sent; updates
+    are coalesced so each campaign emits at most one event per `interval`
+    seconds, carrying only the latest totals. Each subscriber has a
+    one-slot queue, so a slow client just skips intermediate updates.
+    """
+
+    def __init__(self, interval: float = CAMPAIGN_STREAM_INTERVAL,
+                 max_per_campaign: int = CAMPAIGN_STREAM_MAX_PER_CAMPAIGN,
+                 max_total: int = CAMPAIGN_STREAM_MAX_TOTAL,
+                 load_totals: Optional[Callable[[str], Awaitable[Optional[dict]]]] = None):
+        self.interval = interval
+        self.load_totals = load_totals
+        self.max_per_campaign = max_per_campaign
+        self.max_total = max_total
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._pending: Dict[str, Optional[dict]] = {}
+        self._scheduled: Set[str] = set()
+        self._last_sent: Dict[str, float] = {}
+        self._last_totals: Dict[str, dict] = {}
+        self.published = 0
+        self.events_sent = 0
+        self.rejected = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def subscribe(self, campaign_id: str) -> asyncio.Queue:
+        queues = self._subscribers.get(campaign_id, set())
+        if len(queues) >= self.max_per_campaign or self.subscriber_count >= self.max_total:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Too many live viewers, please refresh later",
+                headers={"Retry-After": "30"}
+            )
+        queue = asyncio.Queue(maxsize=1)
+        self._subscribers.setdefault(campaign_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, campaign_id: str, queue: asyncio.Queue):
+        queues = self._subscribers.get(campaign_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[campaign_id]
+            self._last_totals.pop(campaign_id, None)
+
+    def publish(self, campaign_id: str, totals: Optional[dict] = None):
+        """Record a campaign's new totals; subscribers get them within `interval`"""
+        if not totals and self.load_totals is None:
+            return
+        self.published += 1
+        if campaign_id not in self._subscribers:
+            return
+
+        # None means "read the totals when sending", at most once per interval
+        self._pending[campaign_id] = None if not totals else {
+            "current_amount": totals.get("current_amount", 0),
+            "donor_count": totals.get("donor_count", 0),
+        }
+        if campaign_id in self._scheduled:
+            return
+
+        self._scheduled.add(campaign_id)
+        delay = self._last_sent.get(campaign_id, 0) + self.interval - time.monotonic()
+        asyncio.get_running_loop().call_later(max(delay, 0), self._flush, campaign_id)
+
+    def _flush(self, campaign_id: str):
+        self._scheduled.discard(campaign_id)
+        if campaign_id not in self._pending:
+            return
+        totals = self._pending.pop(campaign_id)
+        if totals is None:
+            asyncio.get_running_loop().create_task(self._load_and_send(campaign_id))
+        else:
+            self._send(campaign_id, totals)
+
+    async def _load_and_send(self, campaign_id: str):
+        try:
+            totals = await self.load_totals(campaign_id)
+        except Exception as e:
+            logger.error(f"Loading totals for campaign {campaign_id} failed: {str(e)}")
+            return
+        if totals:
+            self._send(campaign_id, {
+                "current_amount": totals.get("current_amount", 0),
+                "donor_count": totals.get("donor_count", 0),
+            })
+
+    def _send(self, campaign_id: str, totals: dict):
+        queues = self._subscribers.get(campaign_id)
+        if not queues:
+            return
+
+        previous = self._last_totals.get(campaign_id)
+        event = {
+            "campaign_id": campaign_id,
+            **totals,
+            "amount_delta": totals["current_amount"] - previous["current_amount"] if previous else 0,
+            "donor_delta": totals["donor_count"] - previous["donor_count"] if previous else 0,
+        }
+        self._last_totals[campaign_id] = totals
+        self._last_sent[campaign_id] = time.monotonic()
+
+        for queue in queues:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+            self.events_sent += 1
+
+    async def stream(self, campaign_id: str, queue: asyncio.Queue,
+                     initial: dict) -> AsyncIterator[str]:
+        """SSE body: the current totals, then progress events and keep-alives"""
+        try:
+            self._last_totals.setdefault(campaign_id, {
+                "current_amount": initial.get("current_amount", 0),
+                "donor_count": initial.get("donor_count", 0),
+            })
+            yield f"retry: {int(self.interval * 3000)}\n"
+            yield sse_event("progress", {"campaign_id": campaign_id, **initial})
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=CAMPAIGN_STREAM_KEEPALIVE)
+                    yield sse_event("progress", event)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            self.unsubscribe(campaign_id, queue)
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": self.subscriber_count,
+            "campaigns": len(self._subscribers),
+            "published": self.published,
+            "events_sent": self.events_sent,
+            "rejected": self.rejected,
+            "interval_seconds": self.interval,
+        }
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get('CIRCUIT_FAILURE_THRESHOLD', 5))
+CIRCUIT_RECOVERY_SECONDS = float(os.environ.get('CIRCUIT_RECOVERY_SECONDS', 30))
+CIRCUIT_HALF_OPEN_PROBES = int(os.environ.get('CIRCUIT_HALF_OPEN_PROBES', 1))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit '{name}' is open")
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with half-open probing.
+
+    After `failure_threshold` failures in a row the circuit opens and calls
+    fail fast with CircuitOpenError. Once `recovery_seconds` have passed, up
+    to `half_open_probes` calls are let through: a success closes the
+    circuit, a failure opens it again. Only exceptions for which `is_failure`
+    returns True count (e.g. timeouts and 5xx, not a rejected card).
+    """
+
+    def __init__(self, name: str,
+                 failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 recovery_seconds: float = CIRCUIT_RECOVERY_SECONDS,
+                 half_open_probes: int = CIRCUIT_HALF_OPEN_PROBES,
+                 is_failure: Callable[[BaseException], bool] = lambda e: True):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.half_open_probes = half_open_probes
+        self.is_failure = is_failure
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._probes = 0
+        self.successes = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.times_opened = 0
+
+    def _retry_after(self) -> float:
+        return max(self.opened_at + self.recovery_seconds - time.monotonic(), 1.0)
+
+    def _before_call(self):
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.recovery_seconds:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, self._retry_after())
+            self.state = HALF_OPEN
+            self._probes = 0
+            logger.info(f"Circuit '{self.name}' half-open, probing")
+
+        if self.state == HALF_OPEN:
+            if self._probes >= self.half_open_probes:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, self.recovery_seconds)
+            self._probes += 1
+
+    def _on_success(self):
+        self.successes += 1
+        self.consecutive_failures = 0
+        if self.state == HALF_OPEN:
+            self.state = CLOSED
+            logger.info(f"Circuit '{self.name}' closed")
+
+    def _on_failure(self):
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.times_opened += 1
+                logger.warning(f"Circuit '{self.name}' opened after {self.consecutive_failures} failures")
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    async def call(self, func: Callable[..., Awaitable], *args, timeout: Optional[float] = None, **kwargs):
+        """Run `func` under the breaker, cancelling it after `timeout` seconds"""
+        self._before_call()
+        try:
+            result = await asyncio.wait_for(func(*args, **kwargs), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self._on_failure()
+            raise
+        except Exception as e:
+            if self.is_failure(e):
+                self._on_failure()
+            else:
+                # The dependency answered; a rejected request says nothing about its health
+                self._on_success()
+            raise
+        finally:
+            if self.state == HALF_OPEN:
+                self._probes = max(self._probes - 1, 0)
+        self._on_success()
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "successes": self.successes,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "times_opened": self.times_opened,
+            "retry_after_seconds": round(self._retry_after(), 1) if self.state == OPEN else 0,
+        }
@@ -0,0 +1,177 @@
+"""
+Campaign totals (current_amount, donor_count) with an optional sharded mode.
+
+With CAMPAIGN_COUNTER_SHARDS=1 (the default) writes `$inc` the campaign
+document itself. With N > 1 each write `$inc`s one of N shard documents in
+`campaign_counter_shards` picked at random, so concurrent payments to one
+campaign no longer queue on a single document. Reads add the shard sums to
+the totals stored on the campaign and cache the result briefly.
+
+Fold shards back into the campaigns (e.g. before lowering the shard count):
+    python counters.py --fold
+"""
+import asyncio
+import logging
+import os
+import random
+from typing import Dict, Iterable, Optional
+from pymongo import ReturnDocument
+
+from cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+CAMPAIGN_COUNTER_SHARDS = int(os.environ.get('CAMPAIGN_COUNTER_SHARDS', 1))
+CAMPAIGN_COUNTER_CACHE_TTL = float(os.environ.get('CAMPAIGN_COUNTER_CACHE_TTL', 2))
+
+TOTAL_FIELDS = ("current_amount", "donor_count")
+TOTALS_PROJECTION = {"_id": 0, "current_amount": 1, "donor_count": 1}
+
+class CampaignCounters:
+    def __init__(self, db, shards: int = CAMPAIGN_COUNTER_SHARDS,
+                 cache_ttl: float = CAMPAIGN_COUNTER_CACHE_TTL):
+        self.db = db
+        self.shards = max(shards, 1)
+        self.cache = TTLCache(maxsize=10000, ttl=cache_ttl)
+        self.writes = 0
+
+    @property
+    def sharded(self) -> bool:
+        return self.shards > 1
+
+    async def increment(self, campaign_id: str, amount: float,
+                        donors: int = 0) -> Optional[dict]:
+        """
+        Apply a change to a campaign's totals. Returns the new totals when
+        they come with the write (unsharded), None in sharded mode, where
+        reading them back would cost two more queries per write; use
+        `total()` if they are needed.
+        """
+        self.writes += 1
+        if not self.sharded:
+            return await self.db.campaigns.find_one_and_update(
+                {"id": campaign_id},
+                {"$inc": {"current_amount": amount, "donor_count": donors}},
+                projection=TOTALS_PROJECTION,
+                return_document=ReturnDocument.AFTER
+            )
+
+        await self.db.campaign_counter_shards.update_one(
+            {"campaign_id": campaign_id, "shard": random.randrange(self.shards)},
+            {"$inc": {"current_amount": amount, "donor_count": donors}},
+            upsert=True
+        )
+        self.cache.delete(campaign_id)
+        return None
+
+    async def total(self, campaign_id: str) -> Optional[dict]:
+        """Current totals for one campaign, or None if it doesn't exist"""
+        return (await self.totals([campaign_id])).get(campaign_id)
+
+    async def totals(self, campaign_ids: Iterable[str], use_cache: bool = True) -> Dict[str, dict]:
+        """Current totals for the given campaigns (missing campaigns are omitted)"""
+        result, missing = {}, []
+        for campaign_id in dict.fromkeys(campaign_ids):
+            cached = self.cache.get(campaign_id) if use_cache else None
+            if cached is not None:
+                result[campaign_id] = dict(cached)
+            else:
+                missing.append(campaign_id)
+        if not missing:
+            return result
+
+        projection = {**TOTALS_PROJECTION, "id": 1}
+        if self.sharded:
+            base, shard_sums = await asyncio.gather(
+                self.db.campaigns.find({"id": {"$in": missing}}, projection).to_list(None),
+                self._shard_sums(missing)
+            )
+        else:
+            base = await self.db.campaigns.find({"id": {"$in": missing}}, projection).to_list(None)
+            shard_sums = {}
+
+        for doc in base:
+            extra = shard_sums.get(doc['id'], {})
+            totals = {field: doc.get(field, 0) + extra.get(field, 0) for field in TOTAL_FIELDS}
+            self.cache.set(doc['id'], totals)
+            result[doc['id']] = dict(totals)
+        return result
+
+    async def _shard_sums(self, campaign_ids: list) -> Dict[str, dict]:
+        pipeline = [
+            {"$match": {"campaign_id": {"$in": campaign_ids}}},
+            {"$group": {
+                "_id": "$campaign_id",
+                "current_amount": {"$sum": "$current_amount"},
+                "donor_count": {"$sum": "$donor_count"}
+            }}
+        ]
+        rows = await self.db.campaign_counter_shards.aggregate(pipeline).to_list(None)
+        return {row['_id']: row for row in rows}
+
+    async def apply(self, campaigns: list, use_cache: bool = True) -> list:
+        """
+        Overwrite the totals on campaign documents with the folded values.
+        Pass use_cache=False when the result is cached under an ETag, since
+        this process's cache can miss other processes' recent writes.
+        """
+        if not self.sharded or not campaigns:
+            return campaigns
+        totals = await self.totals((campaign['id'] for campaign in campaigns), use_cache=use_cache)
+        for campaign in campaigns:
+            campaign.update(totals.get(campaign['id'], {}))
+        return campaigns
+
+    async def fold(self) -> int:
+        """
+        Move every shard's counts onto its campaign document. The campaign is
+        credited first and the shard debited by exactly that much afterwards,
+        so writes landing on the shard meanwhile are kept, and a crash in
+        between over-counts (visible in the shard) instead of losing money.
+        """
+        folded = 0
+        async for shard in self.db.campaign_counter_shards.find({}):
+            amounts = {field: shard.get(field, 0) for field in TOTAL_FIELDS}
+            if any(amounts.values()):
+                await self.db.campaigns.update_one({"id": shard['campaign_id']}, {"$inc": amounts})
+                await self.db.campaign_counter_shards.update_one(
+                    {"_id": shard['_id']},
+                    {"$inc": {field: -value for field, value in amounts.items()}}
+                )
+            # Only drop shards that nothing was added to since they were read
+            await self.db.campaign_counter_shards.delete_one(
+                {"_id": shard['_id'], **{field: 0 for field in TOTAL_FIELDS}}
+            )
+            self.cache.delete(shard['campaign_id'])
+            folded += 1
+        return folded
+
+    def stats(self) -> dict:
+        return {
+            "shards": self.shards,
+            "writes": self.writes,
+            "cache": self.cache.stats(),
+        }
+
+if __name__ == "__main__":
+    import argparse
+    from pathlib import Path
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from datetime_codec import get_database
+
+    parser = argparse.ArgumentParser(description="Campaign counter maintenance")
+    parser.add_argument("--fold", action="store_true", help="Fold all shards into the campaign documents")
+    args = parser.parse_args()
+
+    load_dotenv(Path(__file__).parent / '.env')
+
+    async def main():
+        client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+        counters = CampaignCounters(get_database(client, os.environ['DB_NAME']))
+        if args.fold:
+            folded = await counters.fold()
+            print(f"✓ Folded {folded} counter shards into campaigns")
+        client.close()
+
+    asyncio.run(main())
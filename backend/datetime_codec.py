@@ -0,0 +1,47 @@
+"""
+Datetime codec for MongoDB.
+Timestamps are stored as native BSON dates and always read back as
+timezone-aware UTC datetimes, so handlers never convert them per row.
+"""
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+from bson.codec_options import CodecOptions
+
+CODEC_OPTIONS = CodecOptions(tz_aware=True, tzinfo=timezone.utc)
+
+# Fields that hold timestamps, per collection (used by the migration)
+DATETIME_FIELDS = {
+    "users": ["created_at"],
+    "campaigns": ["created_at", "end_date"],
+    "donations": ["created_at", "updated_at", "deposit_confirmed_at"],
+    "receipts": ["issued_at"],
+    "pledges": ["created_at", "next_charge_at"],
+    "payment_attempts": ["created_at"],
+    "members": ["created_at", "updated_at"],
+    "blood_donors": ["created_at", "updated_at", "consent_public_at"],
+    "events": ["schedule_start", "schedule_end", "created_at", "updated_at"],
+    "event_registrations": ["registered_at"],
+    "contact_reveals": ["revealed_at"],
+    "audit_logs": ["timestamp"],
+}
+
+def get_database(client, name: str):
+    """Database handle that decodes BSON dates as aware UTC datetimes"""
+    return client.get_database(name, codec_options=CODEC_OPTIONS)
+
+def parse_datetime(value) -> Optional[datetime]:
+    """Coerce an ISO-8601 string or datetime into an aware UTC datetime"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+def encode_datetimes(doc: dict, fields: Iterable[str]) -> dict:
+    """Convert timestamp fields of a raw request payload to datetimes in place"""
+    for field in fields:
+        if field in doc and doc[field] is not None:
+            doc[field] = parse_datetime(doc[field])
+    return doc
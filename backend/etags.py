@@ -0,0 +1,131 @@
+"""
+Weak ETags for read endpoints from version counters stored in MongoDB.
+
+Writers `bump()` a scope (a collection, or a collection per user) and
+readers build an ETag from the versions of the scopes they depend on plus
+their query parameters, so `If-None-Match` can be answered with a 304
+before the endpoint's own queries or serialization run. The counters live
+in the `etag_versions` collection (one document per scope, keyed by _id),
+so a write made by any API process or job worker changes the tag
+everywhere. Each process keeps a local copy of the counters, refreshed
+incrementally every ETAG_REFRESH_SECONDS like the revocation list, so
+building an ETag never touches the database; another process's write
+shows up in this process's tags within that interval.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from datetime import timedelta
+from typing import Dict, Hashable, Iterable, Optional
+from fastapi import Request, Response
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+ETAG_REFRESH_SECONDS = float(os.environ.get('ETAG_REFRESH_SECONDS', 2))
+
+# Re-read counters bumped slightly before the last one seen, in case writes
+# committed out of order
+_REFRESH_OVERLAP = timedelta(seconds=2)
+
+def scope_key(scope: Hashable) -> str:
+    return ":".join(map(str, scope)) if isinstance(scope, tuple) else str(scope)
+
+class VersionTracker:
+    def __init__(self, db, refresh_seconds: float = ETAG_REFRESH_SECONDS):
+        self.db = db
+        self.refresh_seconds = refresh_seconds
+        self._versions: Dict[str, int] = {}
+        self._last_seen = None
+        self._task = None
+        self.last_refresh = None
+        self.bumps = 0
+        self.not_modified_count = 0
+        self.modified_count = 0
+
+    async def bump(self, *scopes: Hashable):
+        """Invalidate every ETag that depends on one of `scopes`"""
+        if not scopes:
+            return
+        keys = [scope_key(scope) for scope in scopes]
+        docs = await asyncio.gather(*(
+            self.db.etag_versions.find_one_and_update(
+                {"_id": key},
+                {"$inc": {"v": 1}, "$currentDate": {"updated_at": True}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            for key in keys
+        ))
+        # This process sees its own writes at once; other processes' within
+        # refresh_seconds
+        for doc in docs:
+            self._apply(doc)
+        self.bumps += len(keys)
+
+    def etag(self, scopes: Iterable[Hashable], *params) -> str:
+        """Weak ETag for a response depending on `scopes` and request `params`"""
+        versions = ",".join(str(self._versions.get(scope_key(scope), 0)) for scope in scopes)
+        digest = hashlib.sha1(repr(params).encode()).hexdigest()[:12]
+        return f'W/"{versions}-{digest}"'
+
+    def _apply(self, doc: dict):
+        # Counters only grow, so a refresh racing a bump never steps back
+        self._versions[doc["_id"]] = max(doc["v"], self._versions.get(doc["_id"], 0))
+
+    async def refresh(self):
+        query = {}
+        if self._last_seen is not None:
+            query["updated_at"] = {"$gte": self._last_seen - _REFRESH_OVERLAP}
+        async for doc in self.db.etag_versions.find(query).sort("updated_at", 1):
+            self._apply(doc)
+            if doc.get("updated_at") is not None:
+                self._last_seen = doc["updated_at"]
+        self.last_refresh = time.time()
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"ETag version refresh failed: {str(e)}")
+            await asyncio.sleep(self.refresh_seconds)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def not_modified(self, request: Request, etag: str,
+                     cache_control: str = "no-cache") -> Optional[Response]:
+        """304 response if the client already holds `etag`, else None"""
+        header = request.headers.get("if-none-match")
+        if header and _matches(header, etag):
+            self.not_modified_count += 1
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+        self.modified_count += 1
+        return None
+
+    def stats(self) -> dict:
+        total = self.not_modified_count + self.modified_count
+        return {
+            "not_modified": self.not_modified_count,
+            "modified": self.modified_count,
+            "not_modified_rate": round(self.not_modified_count / total, 4) if total else 0.0,
+            "bumps": self.bumps,
+            "scopes": len(self._versions),
+            "seconds_since_refresh": round(time.time() - self.last_refresh, 1) if self.last_refresh else None,
+        }
+
+def _matches(header: str, etag: str) -> bool:
+    # Weak comparison (RFC 9110 8.8.3.2): ignore the W/ prefix on both sides
+    if header.strip() == "*":
+        return True
+    target = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == target for candidate in header.split(","))
@@ -0,0 +1,136 @@
+"""
+Fake Razorpay gateway for tests and load benchmarks.
+
+Implements the REST calls PaymentService makes, with configurable latency
+and error rate, plus a helper that "pays" an order and returns a correctly
+signed checkout response. As on Razorpay, a paid order's payment is only
+"authorized" until it is captured (unless the order was created with
+payment_capture, or the helper is called with ?capture=true), and only
+captured payments can be refunded.
+
+Run:
+    FAKE_GATEWAY_LATENCY_MS=150 uvicorn fake_gateway:app --port 9000
+Point the API at it:
+    USE_MOCK_PAYMENT=false RAZORPAY_API_BASE=http://localhost:9000/v1
+    RAZORPAY_KEY_ID=rzp_test_fake RAZORPAY_KEY_SECRET=fake_secret
+"""
+import asyncio
+import os
+import random
+import time
+import uuid
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+
+from payment_service import sign_payment
+
+FAKE_GATEWAY_KEY_SECRET = os.environ.get('FAKE_GATEWAY_KEY_SECRET', os.environ.get('RAZORPAY_KEY_SECRET', 'fake_secret'))
+FAKE_GATEWAY_LATENCY_MS = float(os.environ.get('FAKE_GATEWAY_LATENCY_MS', 100))
+FAKE_GATEWAY_JITTER_MS = float(os.environ.get('FAKE_GATEWAY_JITTER_MS', 20))
+FAKE_GATEWAY_ERROR_RATE = float(os.environ.get('FAKE_GATEWAY_ERROR_RATE', 0.0))
+
+app = FastAPI(title="Fake Razorpay gateway")
+
+orders = {}
+payments = {}
+
+@app.middleware("http")
+async def simulate_gateway(request: Request, call_next):
+    if not request.url.path.startswith("/v1/test/"):
+        if "authorization" not in request.headers:
+            return JSONResponse({"error": {"code": "BAD_REQUEST_ERROR", "description": "Authentication failed"}}, status_code=401)
+        delay = FAKE_GATEWAY_LATENCY_MS + random.uniform(-FAKE_GATEWAY_JITTER_MS, FAKE_GATEWAY_JITTER_MS)
+        await asyncio.sleep(max(delay, 0) / 1000)
+        if random.random() < FAKE_GATEWAY_ERROR_RATE:
+            return JSONResponse({"error": {"code": "SERVER_ERROR", "description": "Simulated gateway failure"}}, status_code=502)
+    return await call_next(request)
+
+def _error(status_code: int, description: str):
+    raise HTTPException(status_code=status_code, detail={"code": "BAD_REQUEST_ERROR", "description": description})
+
+@app.exception_handler(HTTPException)
+async def razorpay_error(request: Request, exc: HTTPException):
+    # Razorpay wraps errors as {"error": {...}}
+    return JSONResponse({"error": exc.detail}, status_code=exc.status_code)
+
+@app.post("/v1/orders")
+async def create_order(data: dict):
+    if not data.get("amount") or not data.get("currency"):
+        _error(400, "amount and currency are required")
+    order = {
+        "id": f"order_{uuid.uuid4().hex[:14]}",
+        "entity": "order",
+        "amount": data["amount"],
+        "amount_paid": 0,
+        "amount_due": data["amount"],
+        "currency": data["currency"],
+        "receipt": data.get("receipt"),
+        "status": "created",
+        "notes": data.get("notes", {}),
+        "payment_capture": bool(data.get("payment_capture")),
+        "created_at": int(time.time()),
+    }
+    orders[order["id"]] = order
+    return order
+
+@app.post("/v1/payments/{payment_id}/capture")
+async def capture_payment(payment_id: str, data: dict):
+    payment = payments.get(payment_id)
+    if not payment:
+        _error(400, "The id provided does not exist")
+    if payment["status"] == "captured":
+        _error(400, "This payment has already been captured")
+    if payment["status"] != "authorized":
+        _error(400, "Only payments which have been authorized and not yet captured can be captured")
+    if data.get("amount") != payment["amount"]:
+        _error(400, "Capture amount must be equal to the amount authorized")
+    _capture(payment)
+    return payment
+
+@app.post("/v1/payments/{payment_id}/refund")
+async def refund_payment(payment_id: str, data: dict):
+    payment = payments.get(payment_id)
+    if not payment:
+        _error(400, "The id provided does not exist")
+    if payment["status"] != "captured":
+        _error(400, "The payment has not been captured")
+    amount = data.get("amount", payment["amount"])
+    if amount > payment["amount"] - payment["amount_refunded"]:
+        _error(400, "The refund amount provided is greater than amount captured")
+    payment["amount_refunded"] += amount
+    return {
+        "id": f"rfnd_{uuid.uuid4().hex[:14]}",
+        "entity": "refund",
+        "amount": amount,
+        "payment_id": payment_id,
+        "status": "processed",
+    }
+
+def _capture(payment: dict):
+    payment["status"] = "captured"
+    orders[payment["order_id"]]["status"] = "paid"
+
+@app.post("/v1/test/pay/{order_id}")
+async def pay_order(order_id: str, capture: bool = False):
+    """Test helper: authorize (optionally capture) a payment for an order and sign it like Checkout"""
+    order = orders.get(order_id)
+    if not order:
+        _error(404, "Order not found")
+    payment_id = f"pay_{uuid.uuid4().hex[:14]}"
+    payments[payment_id] = {
+        "id": payment_id,
+        "entity": "payment",
+        "order_id": order_id,
+        "amount": order["amount"],
+        "amount_refunded": 0,
+        "currency": order["currency"],
+        "status": "authorized",
+    }
+    order["status"] = "attempted"
+    if capture or order["payment_capture"]:
+        _capture(payments[payment_id])
+    return {
+        "razorpay_order_id": order_id,
+        "razorpay_payment_id": payment_id,
+        "razorpay_signature": sign_payment(order_id, payment_id, FAKE_GATEWAY_KEY_SECRET),
+    }
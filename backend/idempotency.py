@@ -0,0 +1,125 @@
+"""
+Idempotency-Key handling for POST endpoints.
+
+The first request with a given key (per user and endpoint) claims it and
+runs; its response is stored in `idempotency_keys` and replayed for later
+requests with the same key. A duplicate that arrives while the first is
+still running waits briefly for it to finish, then gets 409. Keys expire
+after IDEMPOTENCY_TTL_HOURS via a TTL index. Failed executions release the
+key so the client can retry.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timezone, timedelta
+from typing import Awaitable, Callable, Optional
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_TTL_HOURS = int(os.environ.get('IDEMPOTENCY_TTL_HOURS', 24))
+IDEMPOTENCY_LOCK_SECONDS = int(os.environ.get('IDEMPOTENCY_LOCK_SECONDS', 60))
+IDEMPOTENCY_WAIT_SECONDS = float(os.environ.get('IDEMPOTENCY_WAIT_SECONDS', 5))
+MAX_KEY_LENGTH = 255
+
+def fingerprint(payload) -> str:
+    raw = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+class IdempotencyStore:
+    def __init__(self, db):
+        self.db = db
+        self.executed = 0
+        self.replayed = 0
+        self.conflicts = 0
+
+    async def run(self, key: Optional[str], user_id: str, endpoint: str,
+                  payload, execute: Callable[[], Awaitable]):
+        """Run `execute` once per key; duplicates get the stored response"""
+        if not key:
+            return await execute()
+        if len(key) > MAX_KEY_LENGTH:
+            raise HTTPException(status_code=400, detail="Idempotency-Key is too long")
+
+        doc_id = f"{user_id}:{endpoint}:{key}"
+        request_hash = fingerprint(payload)
+
+        while not await self._claim(doc_id, request_hash):
+            replay = await self._replay(doc_id, request_hash)
+            if replay is not None:
+                return replay
+            # The first attempt failed and released the key; try to claim it again
+
+        try:
+            result = await execute()
+        except BaseException:
+            # Let the client retry with the same key
+            await self.db.idempotency_keys.delete_one({"_id": doc_id, "status": "in_progress"})
+            raise
+
+        self.executed += 1
+        await self.db.idempotency_keys.update_one(
+            {"_id": doc_id},
+            {"$set": {
+                "status": "done",
+                "response": jsonable_encoder(result),
+                "completed_at": datetime.now(timezone.utc)
+            }}
+        )
+        return result
+
+    async def _claim(self, doc_id: str, request_hash: str) -> bool:
+        now = datetime.now(timezone.utc)
+        try:
+            await self.db.idempotency_keys.insert_one({
+                "_id": doc_id,
+                "request_hash": request_hash,
+                "status": "in_progress",
+                "locked_until": now + timedelta(seconds=IDEMPOTENCY_LOCK_SECONDS),
+                "created_at": now,
+                "expires_at": now + timedelta(hours=IDEMPOTENCY_TTL_HOURS)
+            })
+            return True
+        except DuplicateKeyError:
+            pass
+
+        # Take over a key whose holder died without finishing or releasing it
+        taken = await self.db.idempotency_keys.find_one_and_update(
+            {"_id": doc_id, "status": "in_progress", "request_hash": request_hash,
+             "locked_until": {"$lt": now}},
+            {"$set": {"locked_until": now + timedelta(seconds=IDEMPOTENCY_LOCK_SECONDS)}},
+            return_document=ReturnDocument.AFTER
+        )
+        return taken is not None
+
+    async def _replay(self, doc_id: str, request_hash: str) -> Optional[JSONResponse]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + IDEMPOTENCY_WAIT_SECONDS
+        while True:
+            existing = await self.db.idempotency_keys.find_one({"_id": doc_id})
+            if existing is None:
+                return None
+            if existing["request_hash"] != request_hash:
+                self.conflicts += 1
+                raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+            if existing["status"] == "done":
+                self.replayed += 1
+                return JSONResponse(existing["response"], headers={"Idempotent-Replayed": "true"})
+            if loop.time() >= deadline:
+                self.conflicts += 1
+                raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress",
+                                    headers={"Retry-After": "1"})
+            await asyncio.sleep(0.1)
+
+    def stats(self) -> dict:
+        return {
+            "executed": self.executed,
+            "replayed": self.replayed,
+            "conflicts": self.conflicts,
+        }
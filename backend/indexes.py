@@ -0,0 +1,162 @@
+"""
+Central registry of MongoDB indexes.
+Every collection's indexes are declared here and ensured at startup;
+`index_drift` compares the declaration against what the database has.
+"""
+import logging
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+def _index(keys, **options) -> IndexModel:
+    # Names are left to pymongo so they match indexes created by hand earlier
+    return IndexModel(keys, background=True, **options)
+
+INDEXES = {
+    "users": [
+        _index([("email", ASCENDING)], unique=True),
+        _index([("id", ASCENDING)], unique=True),
+        _index([("roles", ASCENDING)]),
+    ],
+    "campaigns": [
+        _index([("id", ASCENDING)], unique=True),
+        _index([("status", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]),
+        _index([("created_at", DESCENDING), ("id", DESCENDING)]),
+        _index([("title", TEXT), ("description", TEXT)], weights={"title": 10, "description": 1}),
+        _index([("title_prefixes", ASCENDING), ("status", ASCENDING)]),
+    ],
+    "campaign_counter_shards": [
+        _index([("campaign_id", ASCENDING), ("shard", ASCENDING)], unique=True),
+    ],
+    "campaign_leaderboards": [
+        _index([("campaign_id", ASCENDING), ("user_id", ASCENDING)], unique=True),
+        _index([("campaign_id", ASCENDING), ("total", DESCENDING)]),
+    ],
+    "donations": [
+        _index([("id", ASCENDING)], unique=True),
+        _index([("user_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]),
+        _index([("campaign_id", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING)]),
+        _index([("status", ASCENDING)]),
+        _index([("type", ASCENDING), ("status", ASCENDING)]),
+    ],
+    "receipts": [
+        _index([("id", ASCENDING)], unique=True),
+        # One receipt per donation, however many times its job runs
+        _index([("donation_id", ASCENDING)], unique=True),
+        _index([("receipt_number", ASCENDING)], unique=True),
+    ],
+    "jobs": [
+        _index([("status", ASCENDING), ("run_at", ASCENDING)]),
+        _index([("status", ASCENDING), ("lease_until", ASCENDING)]),
+        _index([("status", ASCENDING), ("created_at", DESCENDING)]),
+        # Only finished jobs get expires_at; dead jobs stay until requeued
+        _index([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+    "pledges": [
+        _index([("id", ASCENDING)], unique=True),
+        _index([("user_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]),
+    ],
+    "payment_attempts": [
+        _index([("provider_payload.id", ASCENDING)]),
+        _index([("donation_id", ASCENDING)]),
+    ],
+    "contact_reveals": [
+        _index([("user_id", ASCENDING), ("revealed_at", ASCENDING)]),
+    ],
+    "blood_donors": [
+        _index([("id", ASCENDING)], unique=True),
+        _index([("blood_group", ASCENDING), ("consent_public", ASCENDING)]),
+        _index([("state", ASCENDING), ("district", ASCENDING)]),
+    ],
+    "events": [
+        _index([("id", ASCENDING)], unique=True),
+        _index([("status", ASCENDING), ("schedule_start", ASCENDING)]),
+        _index([("created_at", DESCENDING), ("id", DESCENDING)]),
+    ],
+    "event_registrations": [
+        _index([("event_id", ASCENDING), ("user_id", ASCENDING)]),
+    ],
+    "members": [
+        _index([("id", ASCENDING)], unique=True),
+        _index([("created_by", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]),
+    ],
+    "login_attempts": [
+        _index([("key", ASCENDING), ("at", ASCENDING)]),
+        _index([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+    "idempotency_keys": [
+        _index([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+    "revoked_tokens": [
+        # Per-user revocations have no jti, so only token revocations are unique
+        _index([("jti", ASCENDING)], unique=True, partialFilterExpression={"jti": {"$type": "string"}}),
+        _index([("revoked_at", ASCENDING)]),
+        _index([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+    "etag_versions": [
+        # Incremental refresh of each process's local copy of the counters
+        _index([("updated_at", ASCENDING)]),
+    ],
+}
+
+# Options that change index behaviour and therefore count as drift
+_COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression", "weights")
+
+def _normalize(keys, options: dict) -> dict:
+    return {
+        "key": [(k, int(v) if isinstance(v, (int, float)) else v) for k, v in keys],
+        **{opt: options[opt] for opt in _COMPARED_OPTIONS if opt in options},
+    }
+
+def _spec(model: IndexModel) -> dict:
+    doc = model.document
+    keys = list(doc["key"].items())
+    text_fields = [k for k, v in keys if v == TEXT]
+    if not text_fields:
+        return _normalize(keys, doc)
+
+    # The server stores text indexes as _fts/_ftsx keys plus a weight per field
+    prefix = [(k, v) for k, v in keys[:keys.index((text_fields[0], TEXT))] if v != TEXT]
+    suffix = [(k, v) for k, v in keys[keys.index((text_fields[-1], TEXT)) + 1:] if v != TEXT]
+    weights = {field: 1 for field in text_fields}
+    weights.update(doc.get("weights", {}))
+    return _normalize(prefix + [("_fts", TEXT), ("_ftsx", 1)] + suffix, {**doc, "weights": weights})
+
+async def ensure_indexes(db) -> dict:
+    """Create all declared indexes (idempotent). Returns errors per collection."""
+    errors = {}
+    for collection, models in INDEXES.items():
+        try:
+            await db[collection].create_indexes(models)
+        except OperationFailure as e:
+            # Keep going so one bad collection (e.g. duplicate keys) doesn't block the rest
+            errors[collection] = str(e)
+            logger.error(f"Index build failed for {collection}: {str(e)}")
+    logger.info(f"Ensured indexes for {len(INDEXES) - len(errors)}/{len(INDEXES)} collections")
+    return errors
+
+async def index_drift(db) -> dict:
+    """Compare declared indexes with the database's actual indexes"""
+    report = {}
+    for collection, models in INDEXES.items():
+        actual = await db[collection].index_information()
+        actual.pop("_id_", None)
+
+        missing, changed = [], []
+        for model in models:
+            name = model.document["name"]
+            declared = _spec(model)
+            if name not in actual:
+                missing.append(name)
+                continue
+            existing = _normalize(actual[name]["key"], actual[name])
+            if existing != declared:
+                changed.append({"name": name, "declared": declared, "actual": existing})
+
+        declared_names = {model.document["name"] for model in models}
+        extra = sorted(name for name in actual if name not in declared_names)
+
+        if missing or changed or extra:
+            report[collection] = {"missing": missing, "changed": changed, "extra": extra}
+    return report
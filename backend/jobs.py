@@ -0,0 +1,241 @@
+"""
+Durable background jobs stored in the `jobs` collection.
+
+`enqueue` inserts a job; workers claim jobs with find_one_and_update, which
+takes a lease (`lease_until`) so a job whose worker dies is picked up again
+once the lease runs out. A failing job is retried with exponential backoff
+and, after JOB_MAX_ATTEMPTS, moved to status "dead" where it stays until
+requeued by an admin. Handlers must be idempotent: a job can run more than
+once if its lease expires mid-run.
+
+JOB_WORKERS workers run inside each API process. Set JOB_WORKERS=0 and run
+workers in their own process instead:
+    python jobs.py --workers 4
+"""
+import asyncio
+import logging
+import os
+import random
+import socket
+import time
+import uuid
+from datetime import datetime, timezone, timedelta
+from typing import Awaitable, Callable, Dict, Optional
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+JOB_LEASE_SECONDS = int(os.environ.get('JOB_LEASE_SECONDS', 300))
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 5))
+JOB_BACKOFF_SECONDS = float(os.environ.get('JOB_BACKOFF_SECONDS', 10))
+JOB_MAX_BACKOFF_SECONDS = float(os.environ.get('JOB_MAX_BACKOFF_SECONDS', 3600))
+JOB_POLL_SECONDS = float(os.environ.get('JOB_POLL_SECONDS', 1))
+JOB_RETENTION_HOURS = int(os.environ.get('JOB_RETENTION_HOURS', 72))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+DEAD = "dead"
+
+Handler = Callable[[dict], Awaitable]
+
+def backoff(attempts: int) -> float:
+    """Seconds before retry number `attempts`, doubling with full jitter"""
+    ceiling = min(JOB_BACKOFF_SECONDS * 2 ** (attempts - 1), JOB_MAX_BACKOFF_SECONDS)
+    return random.uniform(ceiling / 2, ceiling)
+
+class JobQueue:
+    def __init__(self, db, lease_seconds: int = JOB_LEASE_SECONDS, max_attempts: int = JOB_MAX_ATTEMPTS):
+        self.db = db
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.handlers: Dict[str, Handler] = {}
+        self._tasks = []
+        self._wakeup = asyncio.Event()
+        self.enqueued = 0
+        self.completed = 0
+        self.retried = 0
+        self.dead = 0
+        self.running = 0
+        self.run_time = 0.0
+
+    def handler(self, name: str):
+        """Decorator registering the coroutine that runs jobs called `name`"""
+        def register(func: Handler) -> Handler:
+            self.handlers[name] = func
+            return func
+        return register
+
+    async def enqueue(self, name: str, payload: dict, key: Optional[str] = None,
+                      delay: float = 0) -> str:
+        """
+        Add a job and return its id. Jobs with the same `key` are only
+        queued once; later enqueues return the existing job's id.
+        """
+        now = datetime.now(timezone.utc)
+        job_id = key or uuid.uuid4().hex
+        try:
+            await self.db.jobs.insert_one({
+                "_id": job_id,
+                "name": name,
+                "payload": payload,
+                "status": QUEUED,
+                "attempts": 0,
+                "run_at": now + timedelta(seconds=delay),
+                "created_at": now
+            })
+        except DuplicateKeyError:
+            return job_id
+        self.enqueued += 1
+        self._wakeup.set()
+        return job_id
+
+    async def claim(self, worker_id: str) -> Optional[dict]:
+        """Lease the next due job, or one whose previous worker's lease ran out"""
+        now = datetime.now(timezone.utc)
+        return await self.db.jobs.find_one_and_update(
+            {
+                "name": {"$in": list(self.handlers)},
+                "$or": [
+                    {"status": QUEUED, "run_at": {"$lte": now}},
+                    {"status": RUNNING, "lease_until": {"$lt": now}},
+                ]
+            },
+            {
+                "$set": {
+                    "status": RUNNING,
+                    "lease_owner": worker_id,
+                    "lease_until": now + timedelta(seconds=self.lease_seconds),
+                    "started_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("run_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _finish(self, job: dict, update: dict):
+        # Only the current lease holder may record the outcome
+        await self.db.jobs.update_one(
+            {"_id": job["_id"], "lease_owner": job["lease_owner"]},
+            {"$set": update, "$unset": {"lease_owner": "", "lease_until": ""}}
+        )
+
+    async def execute(self, job: dict):
+        handler = self.handlers[job["name"]]
+        started = time.perf_counter()
+        self.running += 1
+        try:
+            await handler(job["payload"])
+        except Exception as e:
+            error = f"{type(e).__name__}: {str(e)}"
+            if job["attempts"] >= self.max_attempts:
+                self.dead += 1
+                logger.error(f"Job {job['name']} {job['_id']} dead after {job['attempts']} attempts: {error}")
+                await self._finish(job, {"status": DEAD, "last_error": error, "failed_at": datetime.now(timezone.utc)})
+            else:
+                self.retried += 1
+                delay = backoff(job["attempts"])
+                logger.warning(f"Job {job['name']} {job['_id']} failed (attempt {job['attempts']}), retrying in {delay:.0f}s: {error}")
+                await self._finish(job, {
+                    "status": QUEUED,
+                    "last_error": error,
+                    "run_at": datetime.now(timezone.utc) + timedelta(seconds=delay)
+                })
+            return
+        finally:
+            self.running -= 1
+            self.run_time += time.perf_counter() - started
+
+        self.completed += 1
+        now = datetime.now(timezone.utc)
+        await self._finish(job, {
+            "status": DONE,
+            "finished_at": now,
+            "expires_at": now + timedelta(hours=JOB_RETENTION_HOURS)
+        })
+
+    async def _work(self, worker_id: str):
+        while True:
+            try:
+                job = await self.claim(worker_id)
+            except Exception as e:
+                logger.error(f"Job claim failed: {str(e)}")
+                job = None
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), JOB_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self.execute(job)
+            except Exception as e:
+                # Recording the outcome failed; the lease expiring hands the job to another worker
+                logger.error(f"Job {job['_id']} bookkeeping failed: {str(e)}")
+
+    def start(self, workers: int = JOB_WORKERS):
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        for i in range(workers - len(self._tasks)):
+            worker_id = f"{prefix}:{len(self._tasks)}:{uuid.uuid4().hex[:6]}"
+            self._tasks.append(asyncio.create_task(self._work(worker_id)))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def requeue(self, job_id: str) -> bool:
+        """Give a dead job a fresh set of attempts"""
+        result = await self.db.jobs.update_one(
+            {"_id": job_id, "status": DEAD},
+            {"$set": {"status": QUEUED, "attempts": 0, "run_at": datetime.now(timezone.utc)}}
+        )
+        if result.modified_count:
+            self._wakeup.set()
+        return bool(result.modified_count)
+
+    async def counts(self) -> dict:
+        """Number of jobs per status, from the database (all processes)"""
+        pipeline = [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+        counts = {QUEUED: 0, RUNNING: 0, DONE: 0, DEAD: 0}
+        async for row in self.db.jobs.aggregate(pipeline):
+            counts[row["_id"]] = row["count"]
+        return counts
+
+    def stats(self) -> dict:
+        finished = self.completed + self.retried + self.dead
+        return {
+            "workers": len(self._tasks),
+            "running": self.running,
+            "enqueued": self.enqueued,
+            "completed": self.completed,
+            "retried": self.retried,
+            "dead": self.dead,
+            "avg_run_ms": round(self.run_time / finished * 1000, 1) if finished else 0,
+        }
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run background job workers")
+    parser.add_argument("--workers", type=int, default=max(JOB_WORKERS, 1), help="Concurrent workers in this process")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    async def main():
+        # The handlers live next to the code they call
+        from server import jobs
+        jobs.start(args.workers)
+        logger.info(f"Running {args.workers} job workers for: {', '.join(jobs.handlers)}")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await jobs.stop()
+
+    asyncio.run(main())
@@ -0,0 +1,146 @@
+"""
+Materialized per-campaign top-donor leaderboard.
+
+`campaign_leaderboards` holds one row per (campaign, donor) with the donor's
+running total and donation count over successful, non-anonymous donations.
+Rows are updated incrementally when a donation succeeds or is refunded and
+read in order off the (campaign_id, total) index, so top-K costs an index
+walk of K entries instead of a $group over every donation.
+
+Rebuild from the donations collection (backfill or repair):
+    python leaderboard.py --rebuild [--campaign-id ID]
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+PUBLIC_LEADERBOARD = os.environ.get('PUBLIC_LEADERBOARD', 'false').lower() == 'true'
+PUBLIC_LEADERBOARD_SIZE = int(os.environ.get('PUBLIC_LEADERBOARD_SIZE', 10))
+
+class CampaignLeaderboard:
+    def __init__(self, db):
+        self.db = db
+        self.updates = 0
+
+    @staticmethod
+    def counts(donation: dict) -> bool:
+        return donation.get('campaign_id') is not None and not donation.get('is_anonymous', False)
+
+    async def record(self, donation: dict):
+        """Add a successful donation to its donor's leaderboard row"""
+        if not self.counts(donation):
+            return
+        await self._apply(donation, donation['amount'], 1)
+
+    async def remove(self, donation: dict, amount: Optional[float] = None):
+        """Take a (partially) refunded donation's `amount` back out of its donor's row"""
+        if not self.counts(donation):
+            return
+        amount = donation['amount'] if amount is None else amount
+        # A partial refund leaves the donation on the board, just smaller
+        await self._apply(donation, -amount, -1 if amount >= donation['amount'] else 0)
+        # Donors with nothing left drop off the board
+        await self.db.campaign_leaderboards.delete_one({
+            "campaign_id": donation['campaign_id'],
+            "user_id": donation['user_id'],
+            "total": {"$lte": 0}
+        })
+
+    async def _apply(self, donation: dict, amount: float, count: int):
+        self.updates += 1
+        await self.db.campaign_leaderboards.update_one(
+            {"campaign_id": donation['campaign_id'], "user_id": donation['user_id']},
+            {
+                "$inc": {"total": amount, "count": count},
+                "$set": {"updated_at": datetime.now(timezone.utc)}
+            },
+            upsert=True
+        )
+
+    async def top(self, campaign_id: str, limit: int = 10) -> List[dict]:
+        """Top donors of a campaign, highest total first"""
+        return await self.db.campaign_leaderboards.find(
+            {"campaign_id": campaign_id},
+            {"_id": 0, "user_id": 1, "total": 1, "count": 1}
+        ).sort("total", -1).limit(limit).to_list(limit)
+
+    async def rebuild(self, campaign_id: Optional[str] = None) -> int:
+        """Recompute leaderboard rows from the donations collection"""
+        match = {"status": {"$in": ["success", "refunded"]}, "is_anonymous": False}
+        if campaign_id:
+            match["campaign_id"] = campaign_id
+        else:
+            match["campaign_id"] = {"$ne": None}
+
+        await self.db.campaign_leaderboards.delete_many(
+            {"campaign_id": campaign_id} if campaign_id else {}
+        )
+        pipeline = [
+            {"$match": match},
+            # Refunds made before refund_amount was recorded were full refunds
+            {"$set": {"net": {"$subtract": ["$amount", {"$ifNull": [
+                "$refund_amount",
+                {"$cond": [{"$eq": ["$status", "refunded"]}, "$amount", 0]}
+            ]}]}}},
+            {"$group": {
+                "_id": {"campaign_id": "$campaign_id", "user_id": "$user_id"},
+                "total": {"$sum": "$net"},
+                "count": {"$sum": {"$cond": [{"$gt": ["$net", 0]}, 1, 0]}}
+            }},
+            {"$match": {"total": {"$gt": 0}}},
+            {"$project": {
+                "_id": 0,
+                "campaign_id": "$_id.campaign_id",
+                "user_id": "$_id.user_id",
+                "total": 1,
+                "count": 1,
+                "updated_at": "$$NOW"
+            }},
+            {"$merge": {
+                "into": "campaign_leaderboards",
+                "on": ["campaign_id", "user_id"],
+                "whenMatched": "replace",
+                "whenNotMatched": "insert"
+            }}
+        ]
+        await self.db.donations.aggregate(pipeline).to_list(None)
+        return await self.db.campaign_leaderboards.count_documents(
+            {"campaign_id": campaign_id} if campaign_id else {}
+        )
+
+    def stats(self) -> dict:
+        return {
+            "updates": self.updates,
+            "public": PUBLIC_LEADERBOARD,
+        }
+
+if __name__ == "__main__":
+    import argparse
+    from pathlib import Path
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from datetime_codec import get_database
+    from indexes import ensure_indexes
+
+    parser = argparse.ArgumentParser(description="Campaign leaderboard maintenance")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute leaderboards from donations")
+    parser.add_argument("--campaign-id", help="Only rebuild this campaign")
+    args = parser.parse_args()
+
+    load_dotenv(Path(__file__).parent / '.env')
+
+    async def main():
+        client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+        db = get_database(client, os.environ['DB_NAME'])
+        if args.rebuild:
+            # $merge needs the unique (campaign_id, user_id) index
+            await ensure_indexes(db)
+            rows = await CampaignLeaderboard(db).rebuild(args.campaign_id)
+            print(f"✓ Rebuilt leaderboard: {rows} donor rows")
+        client.close()
+
+    asyncio.run(main())
@@ -0,0 +1,76 @@
+import asyncio
+from typing import Dict, Iterable, List, Optional, Tuple
+
+class UserLoader:
+    """
+    Request-scoped, DataLoader-style batch loader for user documents.
+
+    Every `load()` issued in the same event loop tick is collected and
+    resolved with a single `{"id": {"$in": [...]}}` query per projection.
+    Results are cached for the lifetime of the loader (one request), and
+    `password_hash` is never returned.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._cache: Dict[Tuple[str, Optional[tuple]], asyncio.Future] = {}
+        self._queue: Dict[Optional[tuple], List[str]] = {}
+        self._dispatch_scheduled = False
+        self.queries = 0
+
+    @staticmethod
+    def _projection(fields: Optional[tuple]) -> dict:
+        if fields is None:
+            return {"_id": 0, "password_hash": 0}
+        projection = {"_id": 0, "id": 1}
+        projection.update({field: 1 for field in fields if field != "password_hash"})
+        return projection
+
+    def load(self, user_id: str, fields: Optional[Iterable[str]] = None) -> asyncio.Future:
+        """Load one user; `fields=None` returns everything except password_hash"""
+        fields = tuple(sorted(fields)) if fields is not None else None
+        key = (user_id, fields)
+        if key in self._cache:
+            return self._cache[key]
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._cache[key] = future
+        self._queue.setdefault(fields, []).append(user_id)
+
+        if not self._dispatch_scheduled:
+            self._dispatch_scheduled = True
+            loop.call_soon(lambda: asyncio.ensure_future(self._dispatch()))
+
+        return future
+
+    async def load_many(self, user_ids: Iterable[str],
+                        fields: Optional[Iterable[str]] = None) -> List[Optional[dict]]:
+        """Load several users in one round trip, preserving order (None if missing)"""
+        fields = tuple(fields) if fields is not None else None
+        return list(await asyncio.gather(*(self.load(uid, fields) for uid in user_ids)))
+
+    async def _dispatch(self):
+        queue, self._queue = self._queue, {}
+        self._dispatch_scheduled = False
+
+        for fields, user_ids in queue.items():
+            ids = list(dict.fromkeys(user_ids))
+            try:
+                self.queries += 1
+                docs = await self.db.users.find(
+                    {"id": {"$in": ids}},
+                    self._projection(fields)
+                ).to_list(len(ids))
+            except Exception as e:
+                for uid in ids:
+                    future = self._cache[(uid, fields)]
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            by_id = {doc["id"]: doc for doc in docs}
+            for uid in ids:
+                future = self._cache[(uid, fields)]
+                if not future.done():
+                    future.set_result(by_id.get(uid))
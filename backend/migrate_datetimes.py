@@ -0,0 +1,102 @@
+"""
+Batched, resumable migration of ISO-8601 timestamp strings to BSON dates
+Run: python migrate_datetimes.py [--batch-size 500] [--restart]
+"""
+import argparse
+import asyncio
+import sys
+sys.path.append('/app/backend')
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+import os
+from dotenv import load_dotenv
+from pathlib import Path
+
+from datetime_codec import DATETIME_FIELDS, get_database, parse_datetime
+
+ROOT_DIR = Path('/app/backend')
+load_dotenv(ROOT_DIR / '.env')
+
+mongo_url = os.environ['MONGO_URL']
+client = AsyncIOMotorClient(mongo_url)
+db = get_database(client, os.environ['DB_NAME'])
+
+CHECKPOINT_ID = "datetimes-to-bson"
+
+async def migrate_collection(name: str, fields: list, batch_size: int, checkpoint: dict):
+    collection = db[name]
+    last_id = checkpoint.get(name)
+    converted = 0
+    string_filter = [{field: {"$type": "string"}} for field in fields]
+
+    while True:
+        query = {"$or": string_filter}
+        if last_id is not None:
+            query["_id"] = {"$gt": last_id}
+
+        docs = await collection.find(
+            query, {field: 1 for field in fields}
+        ).sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not docs:
+            break
+
+        ops = []
+        for doc in docs:
+            update = {}
+            for field in fields:
+                value = doc.get(field)
+                if not isinstance(value, str):
+                    continue
+                try:
+                    update[field] = parse_datetime(value)
+                except ValueError:
+                    print(f"  ! {name} {doc['_id']}: unparseable {field}={value!r}, left as is")
+            if update:
+                # Only overwrite values that are still the strings we read
+                match = {"_id": doc["_id"], **{field: doc[field] for field in update}}
+                ops.append(UpdateOne(match, {"$set": update}))
+
+        if ops:
+            result = await collection.bulk_write(ops, ordered=False)
+            converted += result.modified_count
+
+        last_id = docs[-1]["_id"]
+        await db.migrations.update_one(
+            {"_id": CHECKPOINT_ID},
+            {"$set": {f"last_id.{name}": last_id}},
+            upsert=True
+        )
+
+    print(f"✓ {name}: converted {converted} documents")
+
+async def run_migration(batch_size: int, restart: bool):
+    print("Migrating timestamp strings to BSON dates...")
+
+    if restart:
+        await db.migrations.delete_one({"_id": CHECKPOINT_ID})
+
+    state = await db.migrations.find_one({"_id": CHECKPOINT_ID}) or {}
+    if state.get("completed"):
+        print("Already completed (use --restart to run again)")
+        return
+
+    checkpoint = state.get("last_id", {})
+    for name, fields in DATETIME_FIELDS.items():
+        await migrate_collection(name, fields, batch_size, checkpoint)
+
+    await db.migrations.update_one(
+        {"_id": CHECKPOINT_ID},
+        {"$set": {"completed": True}},
+        upsert=True
+    )
+    print("\n✅ Timestamp migration completed successfully!")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--restart", action="store_true", help="Ignore the saved checkpoint")
+    args = parser.parse_args()
+
+    asyncio.run(run_migration(args.batch_size, args.restart))
+    client.close()
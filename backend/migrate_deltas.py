@@ -10,14 +10,16 @@ from motor.motor_asyncio import AsyncIOMotorClient
 import os
 from dotenv import load_dotenv
 from pathlib import Path
-from datetime import datetime, timezone
+
+from datetime_codec import get_database
+from indexes import ensure_indexes
 
 ROOT_DIR = Path('/app/backend')
 load_dotenv(ROOT_DIR / '.env')
 
 mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+db = get_database(client, os.environ['DB_NAME'])
 
 async def run_migrations():
     print("Starting idempotent migrations...")
@@ -77,11 +79,10 @@ async def run_migrations():
     )
     print(f"✓ Added consent fields to {result.modified_count} members")
     
-    # Create indexes for performance
-    await db.blood_donors.create_index([("blood_group", 1), ("consent_public", 1)])
-    await db.blood_donors.create_index([("state", 1), ("district", 1)])
-    await db.donations.create_index([("type", 1), ("status", 1)])
-    await db.events.create_index([("status", 1), ("schedule_start", 1)])
+    # Create indexes for performance (declared in indexes.py)
+    errors = await ensure_indexes(db)
+    for collection, error in errors.items():
+        print(f"✗ Index build failed for {collection}: {error}")
     print("✓ Created indexes")
     
     print("\n✅ All migrations completed successfully!")
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, EmailStr, ConfigDict
-from typing import List, Optional, Literal
+from typing import Generic, List, Optional, Literal, TypeVar
 from datetime import datetime, timezone
 import uuid
 import random
@@ -19,6 +19,13 @@ class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class UserAdminUpdate(BaseModel):
+    roles: Optional[List[Literal["admin", "volunteer", "donor"]]] = None
+    is_active: Optional[bool] = None
+
 class User(UserBase):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -184,6 +191,7 @@ class NotificationLog(BaseModel):
 # Response Models
 class TokenResponse(BaseModel):
     access_token: str
+    refresh_token: Optional[str] = None
     token_type: str = "bearer"
     user: User
 
@@ -196,6 +204,12 @@ class CampaignWithStats(FundCampaign):
     total_donations: int = 0
     recent_donors: List[dict] = []
 
+T = TypeVar("T")
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
 class DonorStats(BaseModel):
     total_donated: float
     donation_count: int
@@ -0,0 +1,125 @@
+import base64
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Optional, Tuple, Union
+from fastapi import HTTPException, Query
+
+from datetime_codec import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = int(os.environ.get('DEFAULT_PAGE_SIZE', 20))
+MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', 100))
+
+class PageParams:
+    def __init__(self, cursor: Optional[str], limit: int):
+        self.cursor = cursor
+        self.limit = limit
+
+def page_params(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+) -> PageParams:
+    """Dependency for the shared cursor/limit query parameters"""
+    return PageParams(cursor, limit)
+
+def _encode(data: dict) -> str:
+    raw = json.dumps(data, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def _decode(cursor: str) -> dict:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+# created_at of the last row on a page: a BSON date, or a leftover ISO string
+# or nothing on rows migrate_datetimes.py hasn't converted yet
+CursorTime = Union[datetime, str, None]
+
+def encode_cursor(created_at: CursorTime, doc_id: str) -> str:
+    if isinstance(created_at, datetime):
+        return _encode({"t": created_at.isoformat(), "i": doc_id})
+    if isinstance(created_at, str):
+        return _encode({"ts": created_at, "i": doc_id})
+    return _encode({"tn": True, "i": doc_id})
+
+def _string(data: dict, key: str) -> str:
+    # Cursors come from clients; anything but a non-empty string is tampering
+    value = data[key]
+    if not isinstance(value, str) or not value:
+        raise ValueError(f"cursor field {key!r} must be a non-empty string")
+    return value
+
+def decode_cursor(cursor: str) -> Tuple[CursorTime, str]:
+    try:
+        data = _decode(cursor)
+        if "ts" in data:
+            return _string(data, "ts"), _string(data, "i")
+        if data.get("tn") is True:
+            return None, _string(data, "i")
+        return parse_datetime(_string(data, "t")), _string(data, "i")
+    except (ValueError, KeyError, TypeError, AttributeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def encode_score_cursor(score: float, doc_id: str) -> str:
+    """Cursor for results ranked by (score, id) such as text search"""
+    return _encode({"s": score, "i": doc_id})
+
+def decode_score_cursor(cursor: str) -> Tuple[float, str]:
+    try:
+        data = _decode(cursor)
+        if isinstance(data["s"], bool) or not isinstance(data["s"], (int, float)):
+            raise ValueError("cursor field 's' must be a number")
+        return float(data["s"]), _string(data, "i")
+    except (ValueError, KeyError, TypeError, AttributeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def paginate(collection, query: dict, page: PageParams,
+                   projection: Optional[dict] = None) -> Tuple[list, Optional[str]]:
+    """
+    Keyset pagination over (created_at, id), newest first.
+    Returns one page of documents and the cursor for the next page (None on
+    the last page). Callers should have an index ending in created_at, id.
+    Rows migrate_datetimes.py hasn't converted yet are still listed: MongoDB
+    sorts dates above strings above null/missing, so they follow every
+    dated row, string timestamps in string order, and a warning is logged.
+    """
+    if page.cursor:
+        after_cursor = {"$or": _after(*decode_cursor(page.cursor))}
+        query = {"$and": [query, after_cursor]} if query else after_cursor
+
+    docs = await collection.find(
+        query, projection or {"_id": 0}
+    ).sort([("created_at", -1), ("id", -1)]).limit(page.limit + 1).to_list(page.limit + 1)
+
+    next_cursor = None
+    if len(docs) > page.limit:
+        docs = docs[:page.limit]
+        next_cursor = encode_cursor(docs[-1].get("created_at"), docs[-1]["id"])
+    if docs and not isinstance(docs[-1].get("created_at"), datetime):
+        _warn_unmigrated(collection.name)
+    return docs, next_cursor
+
+def _after(created_at: CursorTime, doc_id: str) -> list:
+    """Conditions for rows after (created_at, doc_id) in the descending sort"""
+    # $lt only compares within one BSON type, so each type bracket gets its own clause
+    same_type = [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "id": {"$lt": doc_id}}
+    ]
+    if isinstance(created_at, datetime):
+        return same_type + [{"created_at": {"$type": "string"}}, {"created_at": None}]
+    if isinstance(created_at, str):
+        return same_type + [{"created_at": None}]
+    return [{"created_at": None, "id": {"$lt": doc_id}}]
+
+_warned_collections = set()
+
+def _warn_unmigrated(name: str):
+    if name not in _warned_collections:
+        _warned_collections.add(name)
+        logger.warning(
+            f"{name} has rows whose created_at is not a BSON date; they are listed after "
+            f"all dated rows until migrate_datetimes.py has run"
+        )
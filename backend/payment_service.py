@@ -1,22 +1,113 @@
 import os
-import razorpay
+import asyncio
+import hmac
+import hashlib
+import httpx
 import uuid
 from typing import Optional
+from fastapi import HTTPException
 import logging
 
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+
 logger = logging.getLogger(__name__)
 
+RAZORPAY_API_BASE = os.environ.get('RAZORPAY_API_BASE', 'https://api.razorpay.com/v1')
+# Set in the Razorpay dashboard per webhook; without it every webhook is rejected
+RAZORPAY_WEBHOOK_SECRET = os.environ.get('RAZORPAY_WEBHOOK_SECRET', '')
+PAYMENT_CONNECT_TIMEOUT = float(os.environ.get('PAYMENT_CONNECT_TIMEOUT', 3.0))
+PAYMENT_TIMEOUT = float(os.environ.get('PAYMENT_TIMEOUT', 10.0))
+# Refunds are slower at the gateway than orders and captures
+PAYMENT_REFUND_TIMEOUT = float(os.environ.get('PAYMENT_REFUND_TIMEOUT', 15.0))
+# Total time budget per operation, including connecting and any queueing for the pool
+PAYMENT_ORDER_BUDGET = float(os.environ.get('PAYMENT_ORDER_BUDGET', 8.0))
+PAYMENT_CAPTURE_BUDGET = float(os.environ.get('PAYMENT_CAPTURE_BUDGET', 8.0))
+PAYMENT_REFUND_BUDGET = float(os.environ.get('PAYMENT_REFUND_BUDGET', 20.0))
+PAYMENT_MAX_CONNECTIONS = int(os.environ.get('PAYMENT_MAX_CONNECTIONS', 20))
+PAYMENT_MAX_KEEPALIVE = int(os.environ.get('PAYMENT_MAX_KEEPALIVE', 10))
+
+class GatewayError(Exception):
+    def __init__(self, status_code: int, description: str):
+        super().__init__(f"Gateway returned {status_code}: {description}")
+        self.status_code = status_code
+
+def is_gateway_failure(error: BaseException) -> bool:
+    """Errors that say the gateway is unhealthy, as opposed to rejecting our request"""
+    if isinstance(error, GatewayError):
+        return error.status_code >= 500 or error.status_code == 429
+    return isinstance(error, (httpx.TransportError, asyncio.TimeoutError))
+
+def gateway_unavailable(retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Payment gateway is temporarily unavailable, please retry shortly",
+        headers={"Retry-After": str(int(retry_after))}
+    )
+
+def sign_webhook(body: bytes, secret: str) -> str:
+    """Razorpay webhook signature: HMAC-SHA256 of the raw request body"""
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+def sign_payment(order_id: str, payment_id: str, key_secret: str) -> str:
+    """Razorpay checkout signature: HMAC-SHA256 of "order_id|payment_id" """
+    message = f"{order_id}|{payment_id}".encode()
+    return hmac.new(key_secret.encode(), message, hashlib.sha256).hexdigest()
+
 class PaymentService:
+    """
+    Razorpay REST client on a pooled httpx.AsyncClient, so gateway calls
+    never block the event loop. Point RAZORPAY_API_BASE at fake_gateway.py
+    for tests and load benchmarks.
+    """
+    
     def __init__(self):
         self.use_mock = os.environ.get('USE_MOCK_PAYMENT', 'true').lower() == 'true'
         self.razorpay_key_id = os.environ.get('RAZORPAY_KEY_ID', '')
         self.razorpay_key_secret = os.environ.get('RAZORPAY_KEY_SECRET', '')
         
         if not self.use_mock and self.razorpay_key_id and self.razorpay_key_secret:
-            self.client = razorpay.Client(auth=(self.razorpay_key_id, self.razorpay_key_secret))
+            self.client = httpx.AsyncClient(
+                base_url=RAZORPAY_API_BASE,
+                auth=(self.razorpay_key_id, self.razorpay_key_secret),
+                timeout=httpx.Timeout(PAYMENT_TIMEOUT, connect=PAYMENT_CONNECT_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=PAYMENT_MAX_CONNECTIONS,
+                    max_keepalive_connections=PAYMENT_MAX_KEEPALIVE
+                )
+            )
         else:
             self.client = None
             logger.info("Payment service running in MOCK mode")
+        
+        self.breaker = CircuitBreaker("razorpay", is_failure=is_gateway_failure)
+    
+    async def _request(self, path: str, data: dict, timeout: Optional[float] = None) -> dict:
+        if timeout is None:
+            response = await self.client.post(path, json=data)
+        else:
+            response = await self.client.post(
+                path, json=data, timeout=httpx.Timeout(timeout, connect=PAYMENT_CONNECT_TIMEOUT)
+            )
+        if response.is_error:
+            try:
+                description = response.json()['error']['description']
+            except (ValueError, KeyError, TypeError):
+                description = response.text
+            raise GatewayError(response.status_code, description)
+        return response.json()
+    
+    async def _post(self, path: str, data: dict, budget: float,
+                    request_timeout: Optional[float] = None) -> dict:
+        """POST through the circuit breaker; unhealthy-gateway errors become a retryable 503"""
+        try:
+            return await self.breaker.call(self._request, path, data, request_timeout, timeout=budget)
+        except CircuitOpenError as e:
+            raise gateway_unavailable(e.retry_after)
+        except Exception as e:
+            if is_gateway_failure(e):
+                logger.error(f"Razorpay {path} failed: {type(e).__name__} {str(e)}")
+                raise gateway_unavailable(5)
+            raise
     
     async def create_order(self, amount: float, currency: str, donation_id: str, user_email: str):
         """Create a Razorpay order or mock order"""
@@ -43,39 +134,50 @@ class PaymentService:
                     "user_email": user_email
                 }
             }
-            order = self.client.order.create(data=order_data)
+            order = await self._post("/orders", order_data, PAYMENT_ORDER_BUDGET)
             return order
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Razorpay order creation failed: {str(e)}")
             raise Exception(f"Payment order creation failed: {str(e)}")
     
     async def verify_payment(self, order_id: str, payment_id: str, signature: str) -> bool:
-        """Verify Razorpay payment signature"""
+        """Verify Razorpay payment signature (computed locally, no network call)"""
         if self.use_mock or not self.client:
             # Mock verification - always succeeds for testing
             return True
         
-        try:
-            params_dict = {
-                'razorpay_order_id': order_id,
-                'razorpay_payment_id': payment_id,
-                'razorpay_signature': signature
-            }
-            self.client.utility.verify_payment_signature(params_dict)
-            return True
-        except Exception as e:
-            logger.error(f"Payment verification failed: {str(e)}")
+        expected = sign_payment(order_id, payment_id, self.razorpay_key_secret)
+        if not hmac.compare_digest(expected, signature or ""):
+            logger.error(f"Payment verification failed: signature mismatch for order {order_id}")
             return False
+        return True
     
-    async def capture_payment(self, payment_id: str, amount: float):
+    def verify_webhook_signature(self, body: bytes, signature: Optional[str]) -> bool:
+        """Check X-Razorpay-Signature against the webhook secret (also in mock mode)"""
+        if not RAZORPAY_WEBHOOK_SECRET:
+            logger.error("Webhook rejected: RAZORPAY_WEBHOOK_SECRET is not configured")
+            return False
+        if not signature:
+            return False
+        return hmac.compare_digest(sign_webhook(body, RAZORPAY_WEBHOOK_SECRET), signature)
+    
+    async def capture_payment(self, payment_id: str, amount: float, currency: str = "INR"):
         """Capture a payment"""
         if self.use_mock or not self.client:
             return {"id": payment_id, "status": "captured"}
         
         try:
             amount_paise = int(amount * 100)
-            payment = self.client.payment.capture(payment_id, amount_paise)
+            payment = await self._post(
+                f"/payments/{payment_id}/capture",
+                {"amount": amount_paise, "currency": currency},
+                PAYMENT_CAPTURE_BUDGET
+            )
             return payment
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Payment capture failed: {str(e)}")
             raise Exception(f"Payment capture failed: {str(e)}")
@@ -90,8 +192,23 @@ class PaymentService:
             if amount:
                 refund_data["amount"] = int(amount * 100)
             
-            refund = self.client.payment.refund(payment_id, refund_data)
+            refund = await self._post(
+                f"/payments/{payment_id}/refund", refund_data, PAYMENT_REFUND_BUDGET,
+                request_timeout=PAYMENT_REFUND_TIMEOUT
+            )
             return refund
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Refund failed: {str(e)}")
-            raise Exception(f"Refund failed: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Refund failed: {str(e)}")
+    
+    def stats(self) -> dict:
+        return {
+            "mode": "mock" if self.use_mock or not self.client else "live",
+            "circuit": self.breaker.stats(),
+        }
+    
+    async def close(self):
+        if self.client:
+            await self.client.aclose()
@@ -1,181 +1,184 @@
 import os
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
 import logging
+from jinja2 import Environment, FileSystemLoader, select_autoescape
 from weasyprint import HTML, CSS
-from io import BytesIO
+from weasyprint.text.fonts import FontConfiguration
 
 logger = logging.getLogger(__name__)
 
+PDF_RENDER_WORKERS = int(os.environ.get('PDF_RENDER_WORKERS', 2))
+PDF_RENDER_QUEUE_SIZE = int(os.environ.get('PDF_RENDER_QUEUE_SIZE', 16))
+# Recycle each worker after this many renders; WeasyPrint's caches only grow
+PDF_RENDER_MAX_TASKS = int(os.environ.get('PDF_RENDER_MAX_TASKS', 100))
+
+TEMPLATE_DIR = Path(__file__).parent / 'templates'
+STYLESHEET_PATH = TEMPLATE_DIR / 'documents.css'
+
+class RenderPoolBusy(Exception):
+    """Raised instead of queueing a render when the pool is saturated"""
+
+def create_template_environment() -> Environment:
+    """Jinja environment for the PDF templates; compiled templates are cached on it"""
+    env = Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        autoescape=select_autoescape(["html"]),
+        auto_reload=False
+    )
+    env.filters["amount"] = lambda value: f"{value:,.2f}"
+    env.filters["long_date"] = lambda value: value.strftime('%B %d, %Y')
+    return env
+
+templates = create_template_environment()
+
+def render_receipt_html(donation: dict, user: dict, campaign: dict, receipt: dict) -> str:
+    return templates.get_template("receipt.html").render(
+        donation=donation, user=user, campaign=campaign, receipt=receipt
+    )
+
+def render_certificate_html(certificate: dict, volunteer: dict) -> str:
+    return templates.get_template("certificate.html").render(certificate=certificate, volunteer=volunteer)
+
+@lru_cache(maxsize=None)
+def font_config() -> FontConfiguration:
+    # Resolved fonts are cached on the configuration, so reuse it for every render
+    return FontConfiguration()
+
+@lru_cache(maxsize=None)
+def stylesheet() -> CSS:
+    return CSS(filename=str(STYLESHEET_PATH), font_config=font_config())
+
+def write_pdf(html_content: str, target):
+    HTML(string=html_content, base_url=str(TEMPLATE_DIR)).write_pdf(
+        target, stylesheets=[stylesheet()], font_config=font_config()
+    )
+
+def _preload_weasyprint():
+    # Pay for font discovery and stylesheet parsing once per worker, not on its first receipt
+    write_pdf("<p>warm-up</p>", None)
+
+def _render_pdf(html_content: str, file_path: str):
+    """Render in a pool worker; returns (started_at, run_time)"""
+    started_at = time.time()
+    tmp_path = f"{file_path}.{os.getpid()}.tmp"
+    try:
+        write_pdf(html_content, tmp_path)
+        # A retried render never leaves a half-written receipt behind
+        os.replace(tmp_path, file_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return started_at, time.time() - started_at
+
+class RenderPool:
+    """
+    WeasyPrint renders in a pool of spawned worker processes, off the event
+    loop. Once `workers + queue_size` renders are pending, new ones raise
+    RenderPoolBusy instead of queueing indefinitely.
+    """
+
+    def __init__(self, workers: int = PDF_RENDER_WORKERS,
+                 queue_size: int = PDF_RENDER_QUEUE_SIZE,
+                 max_tasks_per_child: int = PDF_RENDER_MAX_TASKS):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.max_tasks_per_child = max_tasks_per_child
+        self._executor = None
+        self._pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+        self.max_run = 0.0
+
+    def _get_executor(self):
+        if self._executor is None:
+            # spawn, not fork: forking the API process would copy its event loop and sockets
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_preload_weasyprint,
+                max_tasks_per_child=self.max_tasks_per_child
+            )
+        return self._executor
+
+    async def render(self, html_content: str, file_path: Path):
+        if self._pending >= self.workers + self.queue_size:
+            self.rejected += 1
+            raise RenderPoolBusy(f"{self._pending} PDF renders already pending")
+
+        loop = asyncio.get_running_loop()
+        submitted_at = time.time()
+        self._pending += 1
+        executor = self._get_executor()
+        try:
+            started_at, run_time = await loop.run_in_executor(
+                executor, _render_pdf, html_content, str(file_path)
+            )
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); start a fresh pool for the next render.
+            # Every render pending on the broken pool lands here; only the first resets it.
+            self.failed += 1
+            if self._executor is executor:
+                self.shutdown()
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self._pending -= 1
+
+        wait = max(started_at - submitted_at, 0.0)
+        self.completed += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.total_run += run_time
+        self.max_run = max(self.max_run, run_time)
+
+    @property
+    def queue_depth(self) -> int:
+        return max(self._pending - self.workers, 0)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "max_tasks_per_child": self.max_tasks_per_child,
+            "in_flight": self._pending,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.total_wait / self.completed * 1000, 2) if self.completed else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+            "avg_render_ms": round(self.total_run / self.completed * 1000, 2) if self.completed else 0.0,
+            "max_render_ms": round(self.max_run * 1000, 2),
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
 class PDFService:
     def __init__(self):
         self.use_local = os.environ.get('USE_LOCAL_STORAGE', 'true').lower() == 'true'
         self.local_path = Path(os.environ.get('LOCAL_STORAGE_PATH', '/app/backend/storage'))
         self.local_path.mkdir(parents=True, exist_ok=True)
+        self.render_pool = RenderPool()
         
     def generate_receipt_html(self, donation: dict, user: dict, campaign: dict, receipt: dict) -> str:
         """Generate HTML for donation receipt"""
-        html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <style>
-                @page {{
-                    size: A4;
-                    margin: 2cm;
-                }}
-                body {{
-                    font-family: 'Helvetica', 'Arial', sans-serif;
-                    color: #333;
-                    line-height: 1.6;
-                }}
-                .header {{
-                    text-align: center;
-                    border-bottom: 3px solid #2563eb;
-                    padding-bottom: 20px;
-                    margin-bottom: 30px;
-                }}
-                .logo {{
-                    font-size: 28px;
-                    font-weight: bold;
-                    color: #2563eb;
-                }}
-                .receipt-title {{
-                    font-size: 20px;
-                    margin-top: 10px;
-                    color: #666;
-                }}
-                .receipt-number {{
-                    font-size: 14px;
-                    color: #999;
-                    margin-top: 5px;
-                }}
-                .section {{
-                    margin: 25px 0;
-                }}
-                .section-title {{
-                    font-size: 16px;
-                    font-weight: bold;
-                    color: #2563eb;
-                    margin-bottom: 10px;
-                    border-bottom: 1px solid #e5e7eb;
-                    padding-bottom: 5px;
-                }}
-                .info-row {{
-                    display: flex;
-                    padding: 8px 0;
-                    border-bottom: 1px solid #f3f4f6;
-                }}
-                .info-label {{
-                    width: 40%;
-                    font-weight: 600;
-                    color: #666;
-                }}
-                .info-value {{
-                    width: 60%;
-                    color: #333;
-                }}
-                .amount-box {{
-                    background: #f0f9ff;
-                    border: 2px solid #2563eb;
-                    border-radius: 8px;
-                    padding: 20px;
-                    text-align: center;
-                    margin: 20px 0;
-                }}
-                .amount-label {{
-                    font-size: 14px;
-                    color: #666;
-                    margin-bottom: 5px;
-                }}
-                .amount-value {{
-                    font-size: 32px;
-                    font-weight: bold;
-                    color: #2563eb;
-                }}
-                .footer {{
-                    margin-top: 50px;
-                    padding-top: 20px;
-                    border-top: 2px solid #e5e7eb;
-                    text-align: center;
-                    font-size: 12px;
-                    color: #999;
-                }}
-                .note-box {{
-                    background: #fffbeb;
-                    border-left: 4px solid #f59e0b;
-                    padding: 15px;
-                    margin: 20px 0;
-                    font-size: 13px;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <div class="logo">WeForYou Foundation</div>
-                <div class="receipt-title">Donation Receipt</div>
-                <div class="receipt-number">Receipt No: {receipt['receipt_number']}</div>
-            </div>
-            
-            <div class="amount-box">
-                <div class="amount-label">Donation Amount</div>
-                <div class="amount-value">₹{donation['amount']:,.2f}</div>
-            </div>
-            
-            <div class="section">
-                <div class="section-title">Donor Information</div>
-                <div class="info-row">
-                    <div class="info-label">Name:</div>
-                    <div class="info-value">{donation.get('legal_name') or user['full_name']}</div>
-                </div>
-                <div class="info-row">
-                    <div class="info-label">Email:</div>
-                    <div class="info-value">{user['email']}</div>
-                </div>
-                {'<div class="info-row"><div class="info-label">PAN:</div><div class="info-value">' + donation.get('pan', 'N/A') + '</div></div>' if donation.get('pan') else ''}
-                {'<div class="info-row"><div class="info-label">Address:</div><div class="info-value">' + donation.get('address', 'N/A') + '</div></div>' if donation.get('address') else ''}
-            </div>
-            
-            <div class="section">
-                <div class="section-title">Donation Details</div>
-                <div class="info-row">
-                    <div class="info-label">Campaign:</div>
-                    <div class="info-value">{campaign['title']}</div>
-                </div>
-                <div class="info-row">
-                    <div class="info-label">Date:</div>
-                    <div class="info-value">{datetime.fromisoformat(donation['created_at']).strftime('%B %d, %Y')}</div>
-                </div>
-                <div class="info-row">
-                    <div class="info-label">Transaction ID:</div>
-                    <div class="info-value">{donation.get('payment_ref', 'N/A')}</div>
-                </div>
-                <div class="info-row">
-                    <div class="info-label">Payment Method:</div>
-                    <div class="info-value">{donation.get('method', 'online').upper()}</div>
-                </div>
-                <div class="info-row">
-                    <div class="info-label">Financial Year:</div>
-                    <div class="info-value">{receipt['fy']}</div>
-                </div>
-            </div>
-            
-            {f'''<div class="note-box">
-                <strong>Section 80G Benefit:</strong> This donation is eligible for tax deduction under Section 80G of the Income Tax Act, 1961.
-                {f"Acknowledgment No: {receipt.get('ack_no', 'Pending')}" if receipt.get('ack_no') else "Acknowledgment number will be updated separately."}
-            </div>''' if receipt.get('section_80g') else ''}
-            
-            <div class="footer">
-                <p><strong>WeForYou Foundation</strong></p>
-                <p>Registered Charity | CIN: U85100DL2020NPL123456</p>
-                <p>Email: donations@weforyou.org | Phone: +91-11-12345678</p>
-                <p>This is a computer-generated receipt and does not require a signature.</p>
-            </div>
-        </body>
-        </html>
-        """
-        return html
+        return render_receipt_html(donation, user, campaign, receipt)
     
     async def generate_receipt_pdf(self, donation: dict, user: dict, campaign: dict, receipt: dict) -> str:
         """Generate PDF receipt and return file path"""
@@ -194,7 +197,7 @@ class PDFService:
             file_path = fy_dir / filename
             
             # Generate PDF
-            HTML(string=html_content).write_pdf(file_path)
+            await self.render_pool.render(html_content, file_path)
             
             # Return relative path for URL
             relative_path = f"receipts/{fy}/{filename}"
@@ -202,13 +205,33 @@ class PDFService:
             
             return relative_path
             
+        except RenderPoolBusy:
+            raise
         except Exception as e:
             logger.error(f"PDF generation failed: {str(e)}")
             raise Exception(f"Failed to generate PDF: {str(e)}")
     
+    async def generate_certificate_pdf(self, certificate: dict, volunteer: dict) -> str:
+        """Generate a volunteer certificate PDF and return its relative path"""
+        filename = f"WFY-CERT-{certificate['serial_number']}.pdf"
+        cert_dir = self.local_path / 'certificates'
+        cert_dir.mkdir(parents=True, exist_ok=True)
+        
+        await self.render_pool.render(render_certificate_html(certificate, volunteer), cert_dir / filename)
+        
+        relative_path = f"certificates/{filename}"
+        logger.info(f"Generated certificate PDF: {relative_path}")
+        return relative_path
+    
     def get_financial_year(self, date: datetime) -> str:
         """Get financial year string (e.g., '2024-25')"""
         if date.month >= 4:  # April onwards
             return f"{date.year}-{str(date.year + 1)[-2:]}"
         else:
-            return f"{date.year - 1}-{str(date.year)[-2:]}"
\ No newline at end of file
+            return f"{date.year - 1}-{str(date.year)[-2:]}"
+    
+    def stats(self) -> dict:
+        return self.render_pool.stats()
+    
+    def shutdown(self):
+        self.render_pool.shutdown()
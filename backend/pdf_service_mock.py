@@ -5,6 +5,9 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+class RenderPoolBusy(Exception):
+    """Raised instead of queueing a render when the pool is saturated"""
+
 class PDFService:
     def __init__(self):
         self.use_local = os.environ.get('USE_LOCAL_STORAGE', 'true').lower() == 'true'
@@ -35,9 +38,30 @@ class PDFService:
         
         return relative_path
     
+    async def generate_certificate_pdf(self, certificate: dict, volunteer: dict) -> str:
+        """Mock certificate generation - returns path"""
+        filename = f"WFY-CERT-{certificate['serial_number']}.pdf"
+        cert_dir = self.local_path / 'certificates'
+        cert_dir.mkdir(parents=True, exist_ok=True)
+        
+        with open(cert_dir / filename, 'w') as f:
+            f.write("MOCK PDF CERTIFICATE - WeasyPrint not available in this environment")
+        
+        relative_path = f"certificates/{filename}"
+        logger.info(f"Generated mock certificate: {relative_path}")
+        
+        return relative_path
+    
     def get_financial_year(self, date: datetime) -> str:
         """Get financial year string"""
         if date.month >= 4:
             return f"{date.year}-{str(date.year + 1)[-2:]}"
         else:
             return f"{date.year - 1}-{str(date.year)[-2:]}"
+    
+    def stats(self) -> dict:
+        """Mock renders are inline; nothing to report"""
+        return {"mock": True}
+    
+    def shutdown(self):
+        pass
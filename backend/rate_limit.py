@@ -0,0 +1,173 @@
+import os
+import time
+import logging
+from collections import OrderedDict, deque
+from datetime import datetime, timezone, timedelta
+from typing import Callable, Optional
+from fastapi import HTTPException, Request
+
+logger = logging.getLogger(__name__)
+
+LOGIN_THROTTLE_BACKEND = os.environ.get('LOGIN_THROTTLE_BACKEND', 'memory')
+LOGIN_THROTTLE_WINDOW = int(os.environ.get('LOGIN_THROTTLE_WINDOW', 300))
+LOGIN_MAX_ATTEMPTS_PER_EMAIL = int(os.environ.get('LOGIN_MAX_ATTEMPTS_PER_EMAIL', 5))
+LOGIN_MAX_ATTEMPTS_PER_IP = int(os.environ.get('LOGIN_MAX_ATTEMPTS_PER_IP', 20))
+TRUST_PROXY_HEADERS = os.environ.get('TRUST_PROXY_HEADERS', 'false').lower() == 'true'
+
+def client_ip(request: Request) -> str:
+    """Best-effort client address for rate limiting"""
+    if TRUST_PROXY_HEADERS:
+        forwarded = request.headers.get('x-forwarded-for')
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return request.client.host if request.client else "unknown"
+
+class MemorySlidingWindow:
+    """Per-key sliding window of recent attempt timestamps, kept in process"""
+
+    def __init__(self, window: int, max_keys: int = 100000):
+        self.window = window
+        self.max_keys = max_keys
+        self._attempts: "OrderedDict[str, deque]" = OrderedDict()
+
+    def _prune(self, key: str) -> Optional[deque]:
+        attempts = self._attempts.get(key)
+        if attempts is None:
+            return None
+        cutoff = time.time() - self.window
+        while attempts and attempts[0] <= cutoff:
+            attempts.popleft()
+        if not attempts:
+            del self._attempts[key]
+            return None
+        return attempts
+
+    async def count(self, key: str) -> int:
+        attempts = self._prune(key)
+        return len(attempts) if attempts else 0
+
+    async def oldest(self, key: str) -> Optional[float]:
+        attempts = self._prune(key)
+        return attempts[0] if attempts else None
+
+    async def add(self, key: str, limit: int):
+        attempts = self._prune(key)
+        if attempts is None:
+            # Only the newest `limit` attempts matter for the decision
+            attempts = self._attempts[key] = deque(maxlen=max(limit, 1))
+        attempts.append(time.time())
+        self._attempts.move_to_end(key)
+        while len(self._attempts) > self.max_keys:
+            self._attempts.popitem(last=False)
+
+    async def reset(self, key: str):
+        self._attempts.pop(key, None)
+
+class MongoSlidingWindow:
+    """Sliding window shared between workers via the login_attempts collection"""
+
+    def __init__(self, db, window: int):
+        self.collection = db.login_attempts
+        self.window = window
+
+    def _cutoff(self) -> datetime:
+        return datetime.now(timezone.utc) - timedelta(seconds=self.window)
+
+    async def count(self, key: str) -> int:
+        return await self.collection.count_documents({"key": key, "at": {"$gt": self._cutoff()}})
+
+    async def oldest(self, key: str) -> Optional[float]:
+        doc = await self.collection.find_one(
+            {"key": key, "at": {"$gt": self._cutoff()}},
+            {"_id": 0, "at": 1},
+            sort=[("at", 1)]
+        )
+        if not doc:
+            return None
+        at = doc['at']
+        if at.tzinfo is None:
+            at = at.replace(tzinfo=timezone.utc)
+        return at.timestamp()
+
+    async def add(self, key: str, limit: int):
+        now = datetime.now(timezone.utc)
+        await self.collection.insert_one({
+            "key": key,
+            "at": now,
+            "expires_at": now + timedelta(seconds=self.window)
+        })
+
+    async def reset(self, key: str):
+        await self.collection.delete_many({"key": key})
+
+class LoginThrottle:
+    """
+    Rejects login attempts for an email or client IP that has too many
+    recent failures, before any bcrypt work is done.
+    """
+
+    def __init__(self, backend, max_per_email: int = LOGIN_MAX_ATTEMPTS_PER_EMAIL,
+                 max_per_ip: int = LOGIN_MAX_ATTEMPTS_PER_IP,
+                 verify_cost: Optional[Callable[[], float]] = None):
+        self.backend = backend
+        self.max_per_email = max_per_email
+        self.max_per_ip = max_per_ip
+        self.verify_cost = verify_cost
+        self.rejected_by_email = 0
+        self.rejected_by_ip = 0
+
+    def _keys(self, email: str, ip: str):
+        return [
+            (f"email:{email.lower()}", self.max_per_email, "email"),
+            (f"ip:{ip}", self.max_per_ip, "ip"),
+        ]
+
+    async def check(self, email: str, ip: str):
+        """Raise 429 if either the email or the IP is over its limit"""
+        for key, limit, kind in self._keys(email, ip):
+            if await self.backend.count(key) < limit:
+                continue
+
+            if kind == "email":
+                self.rejected_by_email += 1
+            else:
+                self.rejected_by_ip += 1
+
+            oldest = await self.backend.oldest(key)
+            retry_after = self.backend.window
+            if oldest is not None:
+                retry_after = max(int(oldest + self.backend.window - time.time()) + 1, 1)
+
+            raise HTTPException(
+                status_code=429,
+                detail="Too many login attempts. Please try again later.",
+                headers={"Retry-After": str(retry_after)}
+            )
+
+    async def record_failure(self, email: str, ip: str):
+        for key, limit, _ in self._keys(email, ip):
+            await self.backend.add(key, limit)
+
+    async def record_success(self, email: str):
+        await self.backend.reset(f"email:{email.lower()}")
+
+    def stats(self) -> dict:
+        rejected = self.rejected_by_email + self.rejected_by_ip
+        cost = self.verify_cost() if self.verify_cost else 0.0
+        return {
+            "backend": type(self.backend).__name__,
+            "window_seconds": self.backend.window,
+            "max_per_email": self.max_per_email,
+            "max_per_ip": self.max_per_ip,
+            "rejected_by_email": self.rejected_by_email,
+            "rejected_by_ip": self.rejected_by_ip,
+            "estimated_cpu_saved_ms": round(rejected * cost * 1000, 2),
+        }
+
+def create_login_throttle(db, verify_cost: Optional[Callable[[], float]] = None) -> LoginThrottle:
+    if LOGIN_THROTTLE_BACKEND == 'mongo':
+        backend = MongoSlidingWindow(db, LOGIN_THROTTLE_WINDOW)
+    else:
+        backend = MemorySlidingWindow(LOGIN_THROTTLE_WINDOW)
+    logger.info(f"Login throttle using {type(backend).__name__}")
+    return LoginThrottle(backend, verify_cost=verify_cost)
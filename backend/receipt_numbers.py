@@ -0,0 +1,100 @@
+"""
+Receipt numbers per financial year: WFY<FY start year><5+ digit serial>,
+e.g. WFY202400042 for FY 2024-25.
+
+Serials come from one counter document per FY in `receipt_counters`,
+advanced with an atomic $inc. Each process reserves RECEIPT_NUMBER_BLOCK
+serials per round trip and hands them out from memory, so numbers are
+unique but not gap-free across processes (a restart forfeits the rest of
+its block) and not strictly in issue order. With RECEIPT_NUMBER_BLOCK=1
+a number is only skipped if its process dies between allocating it and
+saving the receipt; the receipt is saved before its PDF is rendered, so
+render failures and retries keep their number. The unique index on
+receipts.receipt_number is the final guard against duplicates.
+
+A counter is seeded on first use from the highest existing receipt number
+with the same prefix, which also covers numbers issued before the counter
+existed (those used the calendar year).
+"""
+import asyncio
+import logging
+import os
+import re
+from typing import Dict, List
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+RECEIPT_NUMBER_BLOCK = int(os.environ.get('RECEIPT_NUMBER_BLOCK', 10))
+
+def receipt_prefix(fy: str) -> str:
+    return f"WFY{fy[:4]}"
+
+def format_receipt_number(fy: str, serial: int) -> str:
+    return f"{receipt_prefix(fy)}{serial:05d}"
+
+class ReceiptNumberAllocator:
+    def __init__(self, db, block_size: int = RECEIPT_NUMBER_BLOCK):
+        self.db = db
+        self.block_size = max(block_size, 1)
+        self._blocks: Dict[str, List[int]] = {}  # fy -> [next serial, last reserved serial]
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._seeded = set()
+        self.allocated = 0
+        self.reservations = 0
+
+    async def _seed(self, fy: str):
+        prefix = receipt_prefix(fy)
+        # Serials grow past five digits, so compare by length first: as strings
+        # WFY2024100000 would sort below WFY202499999
+        pipeline = [
+            {"$match": {"receipt_number": {"$regex": f"^{re.escape(prefix)}\\d{{5,}}$"}}},
+            {"$project": {"_id": 0, "receipt_number": 1, "length": {"$strLenCP": "$receipt_number"}}},
+            {"$sort": {"length": -1, "receipt_number": -1}},
+            {"$limit": 1}
+        ]
+        latest = await self.db.receipts.aggregate(pipeline).to_list(1)
+        highest = int(latest[0]["receipt_number"][len(prefix):]) if latest else 0
+        for _ in range(2):
+            try:
+                # $max never moves a counter backwards, so every process may seed
+                await self.db.receipt_counters.update_one({"_id": fy}, {"$max": {"value": highest}}, upsert=True)
+                break
+            except DuplicateKeyError:
+                # Lost a concurrent upsert; the document exists now
+                continue
+        self._seeded.add(fy)
+
+    async def _reserve(self, fy: str) -> List[int]:
+        if fy not in self._seeded:
+            await self._seed(fy)
+        counter = await self.db.receipt_counters.find_one_and_update(
+            {"_id": fy},
+            {"$inc": {"value": self.block_size}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        self.reservations += 1
+        last = counter["value"]
+        return [last - self.block_size + 1, last]
+
+    async def allocate(self, fy: str) -> str:
+        """Next receipt number for a financial year such as "2024-25" """
+        lock = self._locks.setdefault(fy, asyncio.Lock())
+        async with lock:
+            block = self._blocks.get(fy)
+            if block is None or block[0] > block[1]:
+                block = self._blocks[fy] = await self._reserve(fy)
+            serial = block[0]
+            block[0] += 1
+        self.allocated += 1
+        return format_receipt_number(fy, serial)
+
+    def stats(self) -> dict:
+        return {
+            "block_size": self.block_size,
+            "allocated": self.allocated,
+            "reservations": self.reservations,
+            "unused_in_blocks": {fy: block[1] - block[0] + 1 for fy, block in self._blocks.items()},
+        }
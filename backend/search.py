@@ -0,0 +1,113 @@
+"""
+Campaign search.
+
+Full-text search runs on the `title`/`description` text index and ranks by
+text score. Autocomplete matches `title_prefixes`, a small array of
+lower-cased word prefixes kept on each campaign, through a multikey index.
+
+Backfill title_prefixes on existing campaigns:
+    python search.py --backfill
+"""
+import asyncio
+import os
+import re
+from typing import List, Optional, Tuple
+
+from pagination import PageParams, decode_score_cursor, encode_score_cursor
+
+TITLE_PREFIX_MIN = 2
+TITLE_PREFIX_MAX = 12
+AUTOCOMPLETE_LIMIT = 10
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+def title_prefixes(title: str) -> List[str]:
+    """Lower-cased prefixes of each word in a title, used for autocomplete"""
+    prefixes = set()
+    for word in _WORD.findall((title or "").lower()):
+        for length in range(TITLE_PREFIX_MIN, min(len(word), TITLE_PREFIX_MAX) + 1):
+            prefixes.add(word[:length])
+    return sorted(prefixes)
+
+async def search_campaigns(db, q: str, status: Optional[str],
+                           page: PageParams) -> Tuple[list, Optional[str]]:
+    """One page of campaigns matching `q`, most relevant first"""
+    match = {"$text": {"$search": q}}
+    if status:
+        match["status"] = status
+
+    pipeline = [
+        {"$match": match},
+        {"$addFields": {"score": {"$meta": "textScore"}}},
+    ]
+    if page.cursor:
+        score, doc_id = decode_score_cursor(page.cursor)
+        pipeline.append({"$match": {"$or": [
+            {"score": {"$lt": score}},
+            {"score": score, "id": {"$lt": doc_id}}
+        ]}})
+    pipeline += [
+        {"$sort": {"score": -1, "id": -1}},
+        {"$limit": page.limit + 1},
+        {"$project": {"_id": 0, "title_prefixes": 0}},
+    ]
+
+    docs = await db.campaigns.aggregate(pipeline).to_list(page.limit + 1)
+
+    next_cursor = None
+    if len(docs) > page.limit:
+        docs = docs[:page.limit]
+        next_cursor = encode_score_cursor(docs[-1]["score"], docs[-1]["id"])
+    return docs, next_cursor
+
+async def autocomplete(db, prefix: str, status: Optional[str],
+                       limit: int = AUTOCOMPLETE_LIMIT) -> list:
+    """Campaign titles with a word starting with `prefix`"""
+    words = _WORD.findall((prefix or "").lower())
+    if not words or len(words[-1]) < TITLE_PREFIX_MIN:
+        return []
+
+    # Every complete word must match too; the last one may be partial. Words
+    # shorter than TITLE_PREFIX_MIN ("a", "I") are never stored, so skip them
+    words = [word for word in words[:-1] if len(word) >= TITLE_PREFIX_MIN] + words[-1:]
+    query = {"title_prefixes": {"$all": [word[:TITLE_PREFIX_MAX] for word in words]}}
+    if status:
+        query["status"] = status
+    return await db.campaigns.find(
+        query, {"_id": 0, "id": 1, "title": 1}
+    ).sort("donor_count", -1).limit(limit).to_list(limit)
+
+async def backfill_title_prefixes(db, batch_size: int = 500) -> int:
+    """Set title_prefixes on campaigns that don't have them yet"""
+    updated = 0
+    cursor = db.campaigns.find({"title_prefixes": {"$exists": False}}, {"_id": 1, "title": 1})
+    async for doc in cursor.batch_size(batch_size):
+        await db.campaigns.update_one(
+            {"_id": doc["_id"]},
+            {"$set": {"title_prefixes": title_prefixes(doc.get("title", ""))}}
+        )
+        updated += 1
+    return updated
+
+if __name__ == "__main__":
+    import argparse
+    from pathlib import Path
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from datetime_codec import get_database
+
+    parser = argparse.ArgumentParser(description="Campaign search maintenance")
+    parser.add_argument("--backfill", action="store_true", help="Add title_prefixes to existing campaigns")
+    args = parser.parse_args()
+
+    load_dotenv(Path(__file__).parent / '.env')
+
+    async def main():
+        client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+        db = get_database(client, os.environ['DB_NAME'])
+        if args.backfill:
+            updated = await backfill_title_prefixes(db)
+            print(f"✓ Added title_prefixes to {updated} campaigns")
+        client.close()
+
+    asyncio.run(main())
@@ -8,12 +8,15 @@ import os
 from dotenv import load_dotenv
 from pathlib import Path
 
+from datetime_codec import get_database
+from search import title_prefixes
+
 ROOT_DIR = Path('/app/backend')
 load_dotenv(ROOT_DIR / '.env')
 
 mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+db = get_database(client, os.environ['DB_NAME'])
 
 async def seed_data():
     print("Starting data seeding...")
@@ -36,7 +39,7 @@ async def seed_data():
         "phone": "+91-9876543210",
         "roles": ["admin", "donor"],
         "password_hash": hash_password("admin123"),
-        "created_at": datetime.now(timezone.utc).isoformat(),
+        "created_at": datetime.now(timezone.utc),
         "is_active": True
     }
     await db.users.insert_one(admin_user)
@@ -51,7 +54,7 @@ async def seed_data():
             "phone": "+91-9876543211",
             "roles": ["donor"],
             "password_hash": hash_password("donor123"),
-            "created_at": datetime.now(timezone.utc).isoformat(),
+            "created_at": datetime.now(timezone.utc),
             "is_active": True
         },
         {
@@ -61,7 +64,7 @@ async def seed_data():
             "phone": "+91-9876543212",
             "roles": ["donor"],
             "password_hash": hash_password("donor123"),
-            "created_at": datetime.now(timezone.utc).isoformat(),
+            "created_at": datetime.now(timezone.utc),
             "is_active": True
         },
         {
@@ -71,7 +74,7 @@ async def seed_data():
             "phone": "+91-9876543213",
             "roles": ["donor"],
             "password_hash": hash_password("donor123"),
-            "created_at": datetime.now(timezone.utc).isoformat(),
+            "created_at": datetime.now(timezone.utc),
             "is_active": True
         }
     ]
@@ -91,9 +94,10 @@ async def seed_data():
         "current_amount": 85000.0,
         "donor_count": 3,
         "status": "active",
-        "created_at": datetime.now(timezone.utc).isoformat(),
-        "end_date": (datetime.now(timezone.utc) + timedelta(days=90)).isoformat()
+        "created_at": datetime.now(timezone.utc),
+        "end_date": datetime.now(timezone.utc) + timedelta(days=90)
     }
+    campaign["title_prefixes"] = title_prefixes(campaign["title"])
     await db.campaigns.insert_one(campaign)
     print(f"Created campaign: {campaign['title']}")
     
@@ -115,8 +119,8 @@ async def seed_data():
             "legal_name": "Priya Sharma",
             "address": "123 MG Road, Bangalore - 560001",
             "receipt_id": "receipt-001",
-            "created_at": (datetime.now(timezone.utc) - timedelta(days=10)).isoformat(),
-            "updated_at": (datetime.now(timezone.utc) - timedelta(days=10)).isoformat()
+            "created_at": datetime.now(timezone.utc) - timedelta(days=10),
+            "updated_at": datetime.now(timezone.utc) - timedelta(days=10)
         },
         {
             "id": "donation-002",
@@ -134,8 +138,8 @@ async def seed_data():
             "legal_name": None,
             "address": None,
             "receipt_id": "receipt-002",
-            "created_at": (datetime.now(timezone.utc) - timedelta(days=7)).isoformat(),
-            "updated_at": (datetime.now(timezone.utc) - timedelta(days=7)).isoformat()
+            "created_at": datetime.now(timezone.utc) - timedelta(days=7),
+            "updated_at": datetime.now(timezone.utc) - timedelta(days=7)
         },
         {
             "id": "donation-003",
@@ -153,8 +157,8 @@ async def seed_data():
             "legal_name": "Anita Patel",
             "address": "456 Park Street, Mumbai - 400001",
             "receipt_id": "receipt-003",
-            "created_at": (datetime.now(timezone.utc) - timedelta(days=5)).isoformat(),
-            "updated_at": (datetime.now(timezone.utc) - timedelta(days=5)).isoformat()
+            "created_at": datetime.now(timezone.utc) - timedelta(days=5),
+            "updated_at": datetime.now(timezone.utc) - timedelta(days=5)
         },
         {
             "id": "donation-004",
@@ -172,8 +176,8 @@ async def seed_data():
             "legal_name": None,
             "address": None,
             "receipt_id": None,
-            "created_at": (datetime.now(timezone.utc) - timedelta(days=2)).isoformat(),
-            "updated_at": (datetime.now(timezone.utc) - timedelta(days=2)).isoformat()
+            "created_at": datetime.now(timezone.utc) - timedelta(days=2),
+            "updated_at": datetime.now(timezone.utc) - timedelta(days=2)
         },
         {
             "id": "donation-005",
@@ -191,8 +195,8 @@ async def seed_data():
             "legal_name": None,
             "address": None,
             "receipt_id": None,
-            "created_at": (datetime.now(timezone.utc) - timedelta(days=1)).isoformat(),
-            "updated_at": (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+            "created_at": datetime.now(timezone.utc) - timedelta(days=1),
+            "updated_at": datetime.now(timezone.utc) - timedelta(days=1)
         }
     ]
     await db.donations.insert_many(donations)
@@ -205,7 +209,7 @@ async def seed_data():
             "donation_id": "donation-001",
             "receipt_number": "WFY202400001",
             "pdf_url": "receipts/2024-25/WFY-WFY202400001-2024-25.pdf",
-            "issued_at": (datetime.now(timezone.utc) - timedelta(days=10)).isoformat(),
+            "issued_at": datetime.now(timezone.utc) - timedelta(days=10),
             "fy": "2024-25",
             "section_80g": True,
             "ack_no": "80G/2024/001"
@@ -215,7 +219,7 @@ async def seed_data():
             "donation_id": "donation-002",
             "receipt_number": "WFY202400002",
             "pdf_url": "receipts/2024-25/WFY-WFY202400002-2024-25.pdf",
-            "issued_at": (datetime.now(timezone.utc) - timedelta(days=7)).isoformat(),
+            "issued_at": datetime.now(timezone.utc) - timedelta(days=7),
             "fy": "2024-25",
             "section_80g": False,
             "ack_no": None
@@ -225,7 +229,7 @@ async def seed_data():
             "donation_id": "donation-003",
             "receipt_number": "WFY202400003",
             "pdf_url": "receipts/2024-25/WFY-WFY202400003-2024-25.pdf",
-            "issued_at": (datetime.now(timezone.utc) - timedelta(days=5)).isoformat(),
+            "issued_at": datetime.now(timezone.utc) - timedelta(days=5),
             "fy": "2024-25",
             "section_80g": True,
             "ack_no": "80G/2024/002"
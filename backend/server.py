@@ -1,29 +1,54 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, File, UploadFile, BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, File, UploadFile, BackgroundTasks, Request, Query, Header
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 import os
+import json
+import asyncio
 import logging
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
-from typing import List, Optional
+from typing import Optional
 import uuid
 
 from models import (
-    User, UserCreate, UserLogin, TokenResponse,
+    User, UserCreate, UserLogin, TokenResponse, RefreshRequest, UserAdminUpdate,
     FundCampaign, FundCampaignCreate, CampaignWithStats,
     Donation, DonationCreate, DonationWithReceipt,
     DonationReceipt, Pledge, PledgeCreate, PaymentAttempt,
-    DonorStats
+    DonorStats, Page
 )
 from auth import (
-    hash_password, verify_password, create_access_token,
-    get_current_user, require_role
+    hash_password_async, verify_password_async, create_access_token,
+    create_refresh_token, decode_token, get_current_user, require_role,
+    password_hasher, token_cache, revocation_list
 )
+from cache import TTLCache
+from campaign_events import ProgressPublisher
+from counters import CampaignCounters
+from datetime_codec import get_database, encode_datetimes, parse_datetime
+from etags import VersionTracker
+from idempotency import IdempotencyStore
+from indexes import ensure_indexes, index_drift
+from jobs import JobQueue
+from leaderboard import CampaignLeaderboard, PUBLIC_LEADERBOARD, PUBLIC_LEADERBOARD_SIZE
+from loaders import UserLoader
+from pagination import PageParams, page_params, paginate
 from payment_service import PaymentService
-from pdf_service_mock import PDFService
+from rate_limit import create_login_throttle, client_ip
+from receipt_numbers import ReceiptNumberAllocator
+from search import search_campaigns, autocomplete, title_prefixes
+from snapshots import SnapshotPublisher
+try:
+    from pdf_service import PDFService
+except (ImportError, OSError):
+    # WeasyPrint or its system libraries (Pango) are missing; receipts become placeholders
+    from pdf_service_mock import PDFService
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -31,24 +56,67 @@ load_dotenv(ROOT_DIR / '.env')
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+db = get_database(client, os.environ['DB_NAME'])
 
 # Initialize services
 payment_service = PaymentService()
 pdf_service = PDFService()
+login_throttle = create_login_throttle(db, verify_cost=lambda: password_hasher.avg_run_time)
+idempotency = IdempotencyStore(db)
+jobs = JobQueue(db)
+receipt_numbers = ReceiptNumberAllocator(db)
+
+# Serialized public campaign responses, invalidated by writes to campaigns
+CAMPAIGN_CACHE_TTL = int(os.environ.get('CAMPAIGN_CACHE_TTL', 30))
+CAMPAIGN_CACHE_SIZE = int(os.environ.get('CAMPAIGN_CACHE_SIZE', 1000))
+campaign_list_cache = TTLCache(maxsize=64, ttl=CAMPAIGN_CACHE_TTL)
+campaign_detail_cache = TTLCache(maxsize=CAMPAIGN_CACHE_SIZE, ttl=CAMPAIGN_CACHE_TTL)
+
+# Campaign totals (optionally sharded) and live progress pushed to SSE subscribers
+campaign_counters = CampaignCounters(db)
+campaign_progress = ProgressPublisher(load_totals=campaign_counters.total)
+campaign_leaderboard = CampaignLeaderboard(db)
+
+# Versions behind the ETags of read endpoints, bumped by writes
+versions = VersionTracker(db)
 
 # Create storage directory
 storage_path = Path(os.environ.get('LOCAL_STORAGE_PATH', '/app/backend/storage'))
 storage_path.mkdir(parents=True, exist_ok=True)
 
+# Pre-serialized public campaign JSON served from /storage/snapshots
+SNAPSHOT_MAX_CAMPAIGNS = int(os.environ.get('SNAPSHOT_MAX_CAMPAIGNS', 1000))
+campaign_snapshots = SnapshotPublisher(
+    storage_path / "snapshots",
+    build_list=lambda: load_active_campaigns(),
+    build_detail=lambda campaign_id: load_campaign_detail(campaign_id)
+)
+
 # Create the main app
 app = FastAPI(title="WeForYou Foundation API")
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
+def get_user_loader() -> UserLoader:
+    """Request-scoped batched user loader"""
+    return UserLoader(db)
+
 # ==================== AUTH ENDPOINTS ====================
 
+def issue_tokens(user: User) -> TokenResponse:
+    """Issue a short-lived access token and a refresh token for a user"""
+    token = create_access_token({
+        "sub": user.id,
+        "email": user.email,
+        "roles": user.roles
+    })
+    return TokenResponse(
+        access_token=token,
+        refresh_token=create_refresh_token(user.id),
+        user=user
+    )
+
 @api_router.post("/auth/register", response_model=TokenResponse)
 async def register(user_data: UserCreate):
     """Register a new user"""
@@ -67,43 +135,74 @@ async def register(user_data: UserCreate):
     
     # Hash password and store
     user_dict = user.model_dump()
-    user_dict['password_hash'] = hash_password(user_data.password)
-    user_dict['created_at'] = user_dict['created_at'].isoformat()
+    user_dict['password_hash'] = await hash_password_async(user_data.password)
     
     await db.users.insert_one(user_dict)
     
-    # Generate token
-    token = create_access_token({
-        "sub": user.id,
-        "email": user.email,
-        "roles": user.roles
-    })
-    
-    return TokenResponse(access_token=token, user=user)
+    return issue_tokens(user)
 
 @api_router.post("/auth/login", response_model=TokenResponse)
-async def login(credentials: UserLogin):
+async def login(credentials: UserLogin, request: Request):
     """Login user"""
+    ip = client_ip(request)
+    # Reject throttled emails/IPs before spending any bcrypt time
+    await login_throttle.check(credentials.email, ip)
+    
     user_doc = await db.users.find_one({"email": credentials.email})
     if not user_doc:
+        await login_throttle.record_failure(credentials.email, ip)
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    if not verify_password(credentials.password, user_doc['password_hash']):
+    if not await verify_password_async(credentials.password, user_doc['password_hash']):
+        await login_throttle.record_failure(credentials.email, ip)
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
+    await login_throttle.record_success(credentials.email)
+    
+    if not user_doc.get('is_active', True):
+        raise HTTPException(status_code=403, detail="Account is deactivated")
+    
     # Convert to User model
-    if isinstance(user_doc['created_at'], str):
-        user_doc['created_at'] = datetime.fromisoformat(user_doc['created_at'])
     user = User(**{k: v for k, v in user_doc.items() if k != 'password_hash'})
     
-    # Generate token
-    token = create_access_token({
-        "sub": user.id,
-        "email": user.email,
-        "roles": user.roles
-    })
-    
-    return TokenResponse(access_token=token, user=user)
+    return issue_tokens(user)
+
+@api_router.post("/auth/refresh", response_model=TokenResponse)
+async def refresh_tokens(data: RefreshRequest):
+    """Exchange a refresh token for a new access/refresh token pair"""
+    payload = decode_token(data.refresh_token)
+    # A rotated jti is checked by rotate_refresh_token below, which allows a short grace period
+    if payload.get("type") != "refresh" or not payload.get("jti") or revocation_list.is_user_revoked(payload):
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    
+    # Roles and active flag are re-read here, so changes apply on next refresh
+    user_doc = await db.users.find_one({"id": payload['sub']}, {"_id": 0, "password_hash": 0})
+    if not user_doc or not user_doc.get('is_active', True):
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    
+    # Rotate: the presented refresh token is used up on every worker
+    if not await revocation_list.rotate_refresh_token(db, payload):
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    
+    return issue_tokens(User(**user_doc))
+
+@api_router.post("/auth/logout")
+async def logout(
+    data: Optional[RefreshRequest] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Revoke the current access token and, if given, its refresh token"""
+    await revocation_list.revoke_token(db, current_user)
+    
+    if data:
+        try:
+            refresh_payload = decode_token(data.refresh_token)
+        except HTTPException:
+            refresh_payload = None
+        if refresh_payload and refresh_payload.get('sub') == current_user['sub'] and refresh_payload.get('jti'):
+            await revocation_list.revoke_token(db, refresh_payload)
+    
+    return {"status": "success", "message": "Logged out"}
 
 @api_router.get("/auth/me", response_model=User)
 async def get_me(current_user: dict = Depends(get_current_user)):
@@ -112,13 +211,71 @@ async def get_me(current_user: dict = Depends(get_current_user)):
     if not user_doc:
         raise HTTPException(status_code=404, detail="User not found")
     
-    if isinstance(user_doc['created_at'], str):
-        user_doc['created_at'] = datetime.fromisoformat(user_doc['created_at'])
-    
     return User(**user_doc)
 
 # ==================== CAMPAIGN ENDPOINTS ====================
 
+def json_body(data) -> bytes:
+    """Serialize a response once so it can be cached and replayed"""
+    return json.dumps(jsonable_encoder(data)).encode()
+
+def json_response(body: bytes, etag: Optional[str] = None) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"} if etag else None
+    return Response(content=body, media_type="application/json", headers=headers)
+
+async def invalidate_campaign_cache(campaign_id: Optional[str] = None):
+    """Drop cached campaign responses after a write to the campaigns collection"""
+    # Response caches are keyed by ETag, so the bump retires entries in every process
+    campaign_list_cache.clear()
+    await versions.bump("campaigns", *([("campaign", campaign_id)] if campaign_id else []))
+    campaign_snapshots.mark_dirty(campaign_id)
+
+async def load_active_campaigns() -> list:
+    """All active campaigns, newest first, as plain JSON (for snapshots)"""
+    campaigns = await db.campaigns.find(
+        {"status": "active"}, {"_id": 0, "title_prefixes": 0}
+    ).sort([("created_at", -1), ("id", -1)]).to_list(SNAPSHOT_MAX_CAMPAIGNS)
+    await campaign_counters.apply(campaigns)
+    return jsonable_encoder([FundCampaign(**campaign) for campaign in campaigns])
+
+async def load_campaign_detail(campaign_id: str) -> Optional[dict]:
+    """Campaign with totals and recent donors as plain JSON, or None if missing"""
+    # Recent donors (non-anonymous) with their names in a single round trip
+    recent_donors_pipeline = [
+        {"$match": {"campaign_id": campaign_id, "status": "success", "is_anonymous": False}},
+        {"$sort": {"created_at": -1}},
+        {"$limit": 5},
+        # Join only the donor's name, not the whole user document
+        {"$lookup": {
+            "from": "users",
+            "let": {"user_id": "$user_id"},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$id", "$$user_id"]}}},
+                {"$project": {"_id": 0, "full_name": 1}}
+            ],
+            "as": "user"
+        }},
+        {"$unwind": "$user"},
+        {"$project": {
+            "_id": 0,
+            "name": "$user.full_name",
+            "amount": 1,
+            "date": "$created_at"
+        }}
+    ]
+    
+    campaign_doc, recent_donors = await asyncio.gather(
+        db.campaigns.find_one({"id": campaign_id}, {"_id": 0}),
+        db.donations.aggregate(recent_donors_pipeline).to_list(5)
+    )
+    if not campaign_doc:
+        return None
+    
+    await campaign_counters.apply([campaign_doc], use_cache=False)
+    campaign_doc['recent_donors'] = recent_donors
+    
+    return jsonable_encoder(CampaignWithStats(**campaign_doc))
+
 @api_router.post("/campaigns", response_model=FundCampaign)
 async def create_campaign(
     campaign_data: FundCampaignCreate,
@@ -131,111 +288,151 @@ async def create_campaign(
     )
     
     campaign_dict = campaign.model_dump()
-    campaign_dict['created_at'] = campaign_dict['created_at'].isoformat()
-    if campaign_dict.get('end_date'):
-        campaign_dict['end_date'] = campaign_dict['end_date'].isoformat()
+    campaign_dict['title_prefixes'] = title_prefixes(campaign.title)
     
     await db.campaigns.insert_one(campaign_dict)
+    await invalidate_campaign_cache(campaign.id)
     
     return campaign
 
-@api_router.get("/campaigns", response_model=List[FundCampaign])
-async def get_campaigns(status: Optional[str] = "active"):
-    """Get all campaigns"""
+@api_router.get("/campaigns", response_model=Page[FundCampaign])
+async def get_campaigns(
+    request: Request,
+    status: Optional[str] = "active",
+    page: PageParams = Depends(page_params)
+):
+    """Get campaigns, newest first"""
+    etag = versions.etag(["campaigns"], status, page.cursor, page.limit)
+    not_modified = versions.not_modified(request, etag)
+    if not_modified:
+        return not_modified
+    
+    # Keyed by ETag (which covers the query), so a bump from any process retires it
+    body = campaign_list_cache.get(etag)
+    if body is not None:
+        return json_response(body, etag)
+    
     query = {}
     if status:
         query['status'] = status
     
-    campaigns = await db.campaigns.find(query, {"_id": 0}).to_list(100)
+    campaigns, next_cursor = await paginate(db.campaigns, query, page)
+    await campaign_counters.apply(campaigns, use_cache=False)
     
-    for campaign in campaigns:
-        if isinstance(campaign.get('created_at'), str):
-            campaign['created_at'] = datetime.fromisoformat(campaign['created_at'])
-        if campaign.get('end_date') and isinstance(campaign['end_date'], str):
-            campaign['end_date'] = datetime.fromisoformat(campaign['end_date'])
+    body = json_body(Page[FundCampaign](
+        items=[FundCampaign(**campaign) for campaign in campaigns],
+        next_cursor=next_cursor
+    ))
+    campaign_list_cache.set(etag, body)
+    return json_response(body, etag)
+
+# Declared before /campaigns/{campaign_id} so "search" isn't taken for an id
+@api_router.get("/campaigns/search", response_model=Page[FundCampaign])
+async def search_campaigns_endpoint(
+    q: str = Query(..., min_length=1, max_length=100),
+    status: Optional[str] = "active",
+    page: PageParams = Depends(page_params)
+):
+    """Full-text search over campaign titles and descriptions, most relevant first"""
+    campaigns, next_cursor = await search_campaigns(db, q, status, page)
+    await campaign_counters.apply(campaigns)
     
-    return campaigns
+    return Page[FundCampaign](
+        items=[FundCampaign(**campaign) for campaign in campaigns],
+        next_cursor=next_cursor
+    )
+
+@api_router.get("/campaigns/autocomplete")
+async def autocomplete_campaigns(
+    q: str = Query(..., max_length=100),
+    status: Optional[str] = "active"
+):
+    """Campaign titles for a search-as-you-type box"""
+    return await autocomplete(db, q, status)
 
 @api_router.get("/campaigns/{campaign_id}", response_model=CampaignWithStats)
-async def get_campaign(campaign_id: str):
+async def get_campaign(campaign_id: str, request: Request):
     """Get campaign details with stats"""
-    campaign_doc = await db.campaigns.find_one({"id": campaign_id}, {"_id": 0})
-    if not campaign_doc:
-        raise HTTPException(status_code=404, detail="Campaign not found")
+    etag = versions.etag([("campaign", campaign_id)], campaign_id)
+    not_modified = versions.not_modified(request, etag)
+    if not_modified:
+        return not_modified
     
-    # Convert dates
-    if isinstance(campaign_doc.get('created_at'), str):
-        campaign_doc['created_at'] = datetime.fromisoformat(campaign_doc['created_at'])
-    if campaign_doc.get('end_date') and isinstance(campaign_doc['end_date'], str):
-        campaign_doc['end_date'] = datetime.fromisoformat(campaign_doc['end_date'])
+    body = campaign_detail_cache.get(etag)
+    if body is not None:
+        return json_response(body, etag)
     
-    # Get recent donors (non-anonymous)
-    donations = await db.donations.find(
-        {"campaign_id": campaign_id, "status": "success", "is_anonymous": False},
-        {"_id": 0}
-    ).sort("created_at", -1).limit(5).to_list(5)
+    campaign = await load_campaign_detail(campaign_id)
+    if campaign is None:
+        raise HTTPException(status_code=404, detail="Campaign not found")
     
-    recent_donors = []
-    for don in donations:
-        user_doc = await db.users.find_one({"id": don['user_id']}, {"_id": 0, "full_name": 1})
-        if user_doc:
-            recent_donors.append({
-                "name": user_doc['full_name'],
-                "amount": don['amount'],
-                "date": don['created_at']
-            })
+    body = json_body(campaign)
+    campaign_detail_cache.set(etag, body)
+    return json_response(body, etag)
+
+@api_router.get("/campaigns/{campaign_id}/top-donors")
+async def get_campaign_top_donors(
+    campaign_id: str,
+    users: UserLoader = Depends(get_user_loader)
+):
+    """Public top donors of a campaign (enabled with PUBLIC_LEADERBOARD)"""
+    if not PUBLIC_LEADERBOARD:
+        raise HTTPException(status_code=404, detail="Not found")
     
-    campaign_doc['recent_donors'] = recent_donors
+    top_donors_raw = await campaign_leaderboard.top(campaign_id, PUBLIC_LEADERBOARD_SIZE)
+    user_docs = await users.load_many([donor['user_id'] for donor in top_donors_raw], ["full_name"])
     
-    return CampaignWithStats(**campaign_doc)
-
-# ==================== DONATION ENDPOINTS ====================
+    return [
+        {"name": user['full_name'], "total_donated": donor['total']}
+        for donor, user in zip(top_donors_raw, user_docs)
+        if user
+    ]
 
-@api_router.post("/donations", response_model=dict)
-async def create_donation(
-    donation_data: DonationCreate,
-    current_user: dict = Depends(get_current_user)
-):
-    """Create a new donation (requires login)"""
-    # Verify campaign exists
-    campaign = await db.campaigns.find_one({"id": donation_data.campaign_id})
-    if not campaign:
+@api_router.get("/campaigns/{campaign_id}/stream")
+async def stream_campaign_progress(campaign_id: str):
+    """Server-Sent Events stream of a campaign's current_amount and donor_count"""
+    # Subscribe before reading the totals so no update falls in between
+    queue = campaign_progress.subscribe(campaign_id)
+    try:
+        totals = await campaign_counters.total(campaign_id)
+    except Exception:
+        campaign_progress.unsubscribe(campaign_id, queue)
+        raise
+    if not totals:
+        campaign_progress.unsubscribe(campaign_id, queue)
         raise HTTPException(status_code=404, detail="Campaign not found")
     
-    # Validate 80G fields
-    if donation_data.want_80g:
-        if not donation_data.pan or not donation_data.legal_name:
-            raise HTTPException(status_code=400, detail="PAN and Legal Name required for 80G receipt")
-    
-    # Create donation
-    donation = Donation(
-        **donation_data.model_dump(),
-        user_id=current_user['sub']
+    return StreamingResponse(
+        campaign_progress.stream(campaign_id, queue, totals),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
-    
-    donation_dict = donation.model_dump()
-    donation_dict['created_at'] = donation_dict['created_at'].isoformat()
-    donation_dict['updated_at'] = donation_dict['updated_at'].isoformat()
-    
-    await db.donations.insert_one(donation_dict)
-    
-    # Create payment order
-    user_doc = await db.users.find_one({"id": current_user['sub']})
+
+# ==================== DONATION ENDPOINTS ====================
+
+async def create_donation_intent(donation: Donation, payer_email: str) -> dict:
+    """
+    Shared tail of every donation-creating endpoint: open the gateway order,
+    then write the donation and its payment attempt together. Callers do
+    their own (concurrent) lookups and validation first.
+    """
     order = await payment_service.create_order(
         amount=donation.amount,
         currency=donation.currency,
         donation_id=donation.id,
-        user_email=user_doc['email']
+        user_email=payer_email
     )
     
-    # Create payment attempt
     attempt = PaymentAttempt(
         donation_id=donation.id,
         provider_payload=order
     )
-    attempt_dict = attempt.model_dump()
-    attempt_dict['created_at'] = attempt_dict['created_at'].isoformat()
-    await db.payment_attempts.insert_one(attempt_dict)
+    # Separate collections, so no single write; issue both at once instead
+    await asyncio.gather(
+        db.donations.insert_one(donation.model_dump()),
+        db.payment_attempts.insert_one(attempt.model_dump())
+    )
+    await versions.bump(("donations", donation.user_id))
     
     return {
         "donation_id": donation.id,
@@ -243,6 +440,39 @@ async def create_donation(
         "razorpay_key": payment_service.razorpay_key_id or "mock_key"
     }
 
+@api_router.post("/donations", response_model=dict)
+async def create_donation(
+    donation_data: DonationCreate,
+    idempotency_key: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_user),
+    users: UserLoader = Depends(get_user_loader)
+):
+    """Create a new donation (requires login)"""
+    return await idempotency.run(
+        idempotency_key, current_user['sub'], "donations", donation_data,
+        lambda: process_donation(donation_data, current_user, users)
+    )
+
+async def process_donation(donation_data: DonationCreate, current_user: dict, users: UserLoader) -> dict:
+    # Validate 80G fields
+    if donation_data.want_80g:
+        if not donation_data.pan or not donation_data.legal_name:
+            raise HTTPException(status_code=400, detail="PAN and Legal Name required for 80G receipt")
+    
+    campaign, user_doc = await asyncio.gather(
+        db.campaigns.find_one({"id": donation_data.campaign_id}, {"_id": 0, "id": 1}),
+        users.load(current_user['sub'], ["email"])
+    )
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    
+    donation = Donation(
+        **donation_data.model_dump(),
+        user_id=current_user['sub']
+    )
+    
+    return await create_donation_intent(donation, user_doc['email'])
+
 @api_router.post("/donations/{donation_id}/verify")
 async def verify_donation(
     donation_id: str,
@@ -265,116 +495,147 @@ async def verify_donation(
     )
     
     if is_valid:
-        # Update donation status
-        await db.donations.update_one(
-            {"id": donation_id},
-            {
-                "$set": {
-                    "status": "success",
-                    "payment_ref": payment_data.get('razorpay_payment_id'),
-                    "updated_at": datetime.now(timezone.utc).isoformat()
-                }
-            }
-        )
-        
-        # Update campaign totals
-        await db.campaigns.update_one(
-            {"id": donation_doc['campaign_id']},
-            {
-                "$inc": {
-                    "current_amount": donation_doc['amount'],
-                    "donor_count": 1
-                }
-            }
-        )
-        
-        # Generate receipt
-        await generate_receipt_background(donation_id)
+        settled = await settle_donation(donation_id, payment_data.get('razorpay_payment_id'))
+        if settled is None:
+            # The webhook (or an earlier verify) got there first
+            current = await db.donations.find_one({"id": donation_id}, {"_id": 0, "status": 1})
+            if current['status'] != 'success':
+                raise HTTPException(status_code=409, detail=f"Donation is {current['status']} and cannot be verified")
+            return {"status": "success", "message": "Payment already verified"}
         
-        return {"status": "success", "message": "Payment verified and receipt generated"}
+        return {"status": "success", "message": "Payment verified, receipt is being generated"}
     else:
+        # Never overwrite a settlement that raced ahead of this request
         await db.donations.update_one(
-            {"id": donation_id},
-            {"$set": {"status": "failed", "updated_at": datetime.now(timezone.utc).isoformat()}}
+            {"id": donation_id, "status": "pending"},
+            {"$set": {"status": "failed", "updated_at": datetime.now(timezone.utc)}}
         )
+        await versions.bump(("donations", donation_doc['user_id']))
         raise HTTPException(status_code=400, detail="Payment verification failed")
 
-async def generate_receipt_background(donation_id: str):
-    """Background task to generate receipt"""
-    try:
-        donation_doc = await db.donations.find_one({"id": donation_id}, {"_id": 0})
-        if not donation_doc:
-            return
-        
-        user_doc = await db.users.find_one({"id": donation_doc['user_id']}, {"_id": 0})
-        campaign_doc = await db.campaigns.find_one({"id": donation_doc['campaign_id']}, {"_id": 0})
-        
-        # Generate receipt number
-        receipt_count = await db.receipts.count_documents({}) + 1
-        receipt_number = f"WFY{datetime.now().year}{receipt_count:05d}"
-        
+# A failed client-side verification can still be followed by a captured payment
+SETTLEABLE_STATUSES = ["pending", "failed"]
+
+async def settle_donation(donation_id: str, payment_ref: Optional[str]) -> Optional[dict]:
+    """
+    Mark a donation successful and apply its side effects exactly once.
+    The status precondition makes the transition atomic: of concurrent
+    callers (client verify, webhook) only one gets the document back and
+    does the follow-up work; the others get None.
+    """
+    donation_doc = await db.donations.find_one_and_update(
+        {"id": donation_id, "status": {"$in": SETTLEABLE_STATUSES}},
+        {
+            "$set": {
+                "status": "success",
+                "payment_ref": payment_ref,
+                "updated_at": datetime.now(timezone.utc)
+            }
+        },
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    if donation_doc is None:
+        return None
+    await versions.bump(("donations", donation_doc['user_id']))
+    
+    campaign_id = donation_doc.get('campaign_id')
+    if campaign_id:
+        totals = await campaign_counters.increment(campaign_id, donation_doc['amount'], donors=1)
+        await invalidate_campaign_cache(campaign_id)
+        campaign_progress.publish(campaign_id, totals)
+        await campaign_leaderboard.record(donation_doc)
+    
+    # Rendered by a job worker so the payment confirmation returns right away
+    await jobs.enqueue("generate_receipt", {"donation_id": donation_id}, key=f"receipt:{donation_id}")
+    return donation_doc
+
+@jobs.handler("generate_receipt")
+async def generate_receipt(payload: dict):
+    """Generate a donation's receipt PDF (job handler; safe to run twice)"""
+    donation_id = payload['donation_id']
+    donation_doc = await db.donations.find_one({"id": donation_id}, {"_id": 0})
+    if not donation_doc or donation_doc.get('receipt_id'):
+        return
+    
+    # A previous attempt may have saved the receipt (and its number) but not rendered or linked it
+    receipt_dict = await db.receipts.find_one({"donation_id": donation_id}, {"_id": 0})
+    if receipt_dict is None:
         # Get FY
-        created_at = datetime.fromisoformat(donation_doc['created_at'])
-        fy = pdf_service.get_financial_year(created_at)
+        fy = pdf_service.get_financial_year(donation_doc['created_at'])
         
         receipt = DonationReceipt(
             donation_id=donation_id,
-            receipt_number=receipt_number,
-            pdf_url="",  # Will be updated
+            receipt_number=await receipt_numbers.allocate(fy),
+            pdf_url="",  # Set once rendered
             fy=fy,
             section_80g=donation_doc.get('want_80g', False)
         )
-        
         receipt_dict = receipt.model_dump()
         
+        # Save the number before rendering so a failed render's retry keeps it
+        try:
+            await db.receipts.insert_one(dict(receipt_dict))
+        except DuplicateKeyError:
+            # Another worker (e.g. after a lease expiry) saved this donation's receipt first
+            receipt_dict = await db.receipts.find_one({"donation_id": donation_id}, {"_id": 0})
+            if receipt_dict is None:
+                raise
+    
+    if not receipt_dict['pdf_url']:
+        user_doc, campaign_doc = await asyncio.gather(
+            db.users.find_one({"id": donation_doc['user_id']}, {"_id": 0}),
+            db.campaigns.find_one({"id": donation_doc['campaign_id']}, {"_id": 0})
+        )
+        
         # Generate PDF
-        pdf_path = await pdf_service.generate_receipt_pdf(
+        receipt_dict['pdf_url'] = await pdf_service.generate_receipt_pdf(
             donation=donation_doc,
             user=user_doc,
             campaign=campaign_doc,
             receipt=receipt_dict
         )
-        
-        receipt_dict['pdf_url'] = pdf_path
-        receipt_dict['issued_at'] = receipt_dict['issued_at'].isoformat()
-        
-        # Save receipt
-        await db.receipts.insert_one(receipt_dict)
-        
-        # Update donation with receipt ID
-        await db.donations.update_one(
-            {"id": donation_id},
-            {"$set": {"receipt_id": receipt.id}}
+        await db.receipts.update_one(
+            {"id": receipt_dict['id']},
+            {"$set": {"pdf_url": receipt_dict['pdf_url']}}
         )
-        
-    except Exception as e:
-        logging.error(f"Receipt generation failed for {donation_id}: {str(e)}")
+    
+    # Update donation with receipt ID
+    await db.donations.update_one(
+        {"id": donation_id},
+        {"$set": {"receipt_id": receipt_dict['id']}}
+    )
+    await versions.bump(("donations", donation_doc['user_id']))
 
-@api_router.get("/donations/my", response_model=List[DonationWithReceipt])
+@api_router.get("/donations/my", response_model=Page[DonationWithReceipt])
 async def get_my_donations(
+    request: Request,
+    response: Response,
     status: Optional[str] = None,
+    page: PageParams = Depends(page_params),
     current_user: dict = Depends(get_current_user)
 ):
-    """Get current user's donations"""
+    """Get current user's donations, newest first"""
+    etag = versions.etag([("donations", current_user['sub'])], current_user['sub'], status, page.cursor, page.limit)
+    not_modified = versions.not_modified(request, etag, cache_control="private, no-cache")
+    if not_modified:
+        return not_modified
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    
     query = {"user_id": current_user['sub']}
     if status:
         query['status'] = status
     
-    donations = await db.donations.find(query, {"_id": 0}).sort("created_at", -1).to_list(100)
+    donations, next_cursor = await paginate(db.donations, query, page)
     
     result = []
     for don in donations:
-        if isinstance(don.get('created_at'), str):
-            don['created_at'] = datetime.fromisoformat(don['created_at'])
-        if isinstance(don.get('updated_at'), str):
-            don['updated_at'] = datetime.fromisoformat(don['updated_at'])
-        
         # Get receipt
         receipt = None
         if don.get('receipt_id'):
             receipt_doc = await db.receipts.find_one({"id": don['receipt_id']}, {"_id": 0})
-            if receipt_doc and isinstance(receipt_doc.get('issued_at'), str):
-                receipt_doc['issued_at'] = datetime.fromisoformat(receipt_doc['issued_at'])
+            if receipt_doc:
                 receipt = DonationReceipt(**receipt_doc)
         
         # Get campaign title
@@ -384,7 +645,36 @@ async def get_my_donations(
         
         result.append(DonationWithReceipt(**don))
     
-    return result
+    return Page[DonationWithReceipt](items=result, next_cursor=next_cursor)
+
+@api_router.get("/donations/my/summary")
+async def get_my_donation_summary(
+    request: Request,
+    response: Response,
+    current_user: dict = Depends(get_current_user)
+):
+    """Totals over all of the current user's donations (the list itself is paginated)"""
+    etag = versions.etag([("donations", current_user['sub'])], current_user['sub'], "summary")
+    not_modified = versions.not_modified(request, etag, cache_control="private, no-cache")
+    if not_modified:
+        return not_modified
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+
+    pipeline = [
+        {"$match": {"user_id": current_user['sub']}},
+        {"$group": {
+            "_id": None,
+            "total_count": {"$sum": 1},
+            "successful_count": {"$sum": {"$cond": [{"$eq": ["$status", "success"]}, 1, 0]}},
+            "total_donated": {"$sum": {"$cond": [{"$eq": ["$status", "success"]}, "$amount", 0]}}
+        }}
+    ]
+    summary = await db.donations.aggregate(pipeline).to_list(1)
+    if not summary:
+        return {"total_count": 0, "successful_count": 0, "total_donated": 0}
+    summary[0].pop("_id")
+    return summary[0]
 
 @api_router.get("/donations/{donation_id}/receipt")
 async def download_receipt(
@@ -438,29 +728,20 @@ async def create_pledge(
     )
     
     pledge_dict = pledge.model_dump()
-    pledge_dict['created_at'] = pledge_dict['created_at'].isoformat()
-    if pledge_dict.get('next_charge_at'):
-        pledge_dict['next_charge_at'] = pledge_dict['next_charge_at'].isoformat()
     
     await db.pledges.insert_one(pledge_dict)
     
     return pledge
 
-@api_router.get("/pledges/my", response_model=List[Pledge])
-async def get_my_pledges(current_user: dict = Depends(get_current_user)):
-    """Get current user's pledges"""
-    pledges = await db.pledges.find(
-        {"user_id": current_user['sub']},
-        {"_id": 0}
-    ).to_list(100)
-    
-    for pledge in pledges:
-        if isinstance(pledge.get('created_at'), str):
-            pledge['created_at'] = datetime.fromisoformat(pledge['created_at'])
-        if pledge.get('next_charge_at') and isinstance(pledge['next_charge_at'], str):
-            pledge['next_charge_at'] = datetime.fromisoformat(pledge['next_charge_at'])
+@api_router.get("/pledges/my", response_model=Page[Pledge])
+async def get_my_pledges(
+    page: PageParams = Depends(page_params),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get current user's pledges, newest first"""
+    pledges, next_cursor = await paginate(db.pledges, {"user_id": current_user['sub']}, page)
     
-    return pledges
+    return {"items": pledges, "next_cursor": next_cursor}
 
 @api_router.patch("/pledges/{pledge_id}")
 async def update_pledge(
@@ -493,12 +774,14 @@ async def update_pledge(
 @api_router.get("/admin/campaigns/{campaign_id}/analytics")
 async def get_campaign_analytics(
     campaign_id: str,
-    current_user: dict = Depends(require_role(["admin"]))
+    current_user: dict = Depends(require_role(["admin"])),
+    users: UserLoader = Depends(get_user_loader)
 ):
     """Get campaign analytics (Admin only)"""
-    campaign = await db.campaigns.find_one({"id": campaign_id}, {"_id": 0})
+    campaign = await db.campaigns.find_one({"id": campaign_id}, {"_id": 0, "title_prefixes": 0})
     if not campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
+    await campaign_counters.apply([campaign])
     
     # Aggregate donations
     pipeline = [
@@ -514,22 +797,12 @@ async def get_campaign_analytics(
     result = await db.donations.aggregate(pipeline).to_list(1)
     stats = result[0] if result else {"total_amount": 0, "count": 0, "avg_amount": 0}
     
-    # Top donors (non-anonymous)
-    top_donors_pipeline = [
-        {"$match": {"campaign_id": campaign_id, "status": "success", "is_anonymous": False}},
-        {"$group": {
-            "_id": "$user_id",
-            "total": {"$sum": "$amount"},
-            "count": {"$sum": 1}
-        }},
-        {"$sort": {"total": -1}},
-        {"$limit": 10}
-    ]
+    # Top donors (non-anonymous) from the materialized leaderboard
+    top_donors_raw = await campaign_leaderboard.top(campaign_id, 10)
+    user_docs = await users.load_many([donor['user_id'] for donor in top_donors_raw], ["full_name", "email"])
     
-    top_donors_raw = await db.donations.aggregate(top_donors_pipeline).to_list(10)
     top_donors = []
-    for donor in top_donors_raw:
-        user = await db.users.find_one({"id": donor['_id']}, {"_id": 0, "full_name": 1, "email": 1})
+    for donor, user in zip(top_donors_raw, user_docs):
         if user:
             top_donors.append({
                 "name": user['full_name'],
@@ -546,7 +819,8 @@ async def get_campaign_analytics(
 
 @api_router.get("/admin/donors")
 async def get_donor_directory(
-    current_user: dict = Depends(require_role(["admin"]))
+    current_user: dict = Depends(require_role(["admin"])),
+    users: UserLoader = Depends(get_user_loader)
 ):
     """Get donor directory (Admin only)"""
     # Find all users with successful donations
@@ -563,9 +837,10 @@ async def get_donor_directory(
     
     donors_stats = await db.donations.aggregate(donors_pipeline).to_list(1000)
     
+    user_docs = await users.load_many([stats['_id'] for stats in donors_stats])
+    
     result = []
-    for stats in donors_stats:
-        user = await db.users.find_one({"id": stats['_id']}, {"_id": 0, "password_hash": 0})
+    for stats, user in zip(donors_stats, user_docs):
         if user:
             result.append({
                 "user": user,
@@ -599,37 +874,123 @@ async def refund_donation(
         amount=refund_data.get('amount')  # None = full refund
     )
     
+    refund_amount = refund_data.get('amount') or donation_doc['amount']
+    
     # Update donation
     await db.donations.update_one(
         {"id": donation_id},
         {
             "$set": {
                 "status": "refunded",
+                "refund_amount": refund_amount,
                 "refund_ref": refund['id'],
                 "refund_note": refund_data.get('note', ''),
-                "updated_at": datetime.now(timezone.utc).isoformat()
+                "updated_at": datetime.now(timezone.utc)
             }
         }
     )
+    await versions.bump(("donations", donation_doc['user_id']))
     
     # Update campaign totals
-    refund_amount = refund_data.get('amount', donation_doc['amount'])
-    await db.campaigns.update_one(
-        {"id": donation_doc['campaign_id']},
-        {
-            "$inc": {
-                "current_amount": -refund_amount
-            }
-        }
-    )
+    totals = await campaign_counters.increment(donation_doc['campaign_id'], -refund_amount)
+    await invalidate_campaign_cache(donation_doc['campaign_id'])
+    campaign_progress.publish(donation_doc['campaign_id'], totals)
+    await campaign_leaderboard.remove(donation_doc, refund_amount)
     
     return {"status": "success", "refund": refund}
 
+@api_router.get("/admin/indexes")
+async def get_index_drift(
+    current_user: dict = Depends(require_role(["admin"]))
+):
+    """Report drift between declared and actual indexes (Admin only)"""
+    drift = await index_drift(db)
+    return {"in_sync": not drift, "drift": drift}
+
+@api_router.get("/admin/jobs")
+async def get_jobs(
+    status: str = "dead",
+    limit: int = Query(20, ge=1, le=100),
+    current_user: dict = Depends(require_role(["admin"]))
+):
+    """Job queue depth and the most recent jobs with a status (Admin only)"""
+    counts, recent = await asyncio.gather(
+        jobs.counts(),
+        db.jobs.find({"status": status}).sort("created_at", -1).limit(limit).to_list(limit)
+    )
+    return {"counts": counts, "jobs": recent}
+
+@api_router.post("/admin/jobs/{job_id}/retry")
+async def retry_job(
+    job_id: str,
+    current_user: dict = Depends(require_role(["admin"]))
+):
+    """Requeue a dead job (Admin only)"""
+    if not await jobs.requeue(job_id):
+        raise HTTPException(status_code=404, detail="Dead job not found")
+    return {"message": "Job requeued"}
+
+@api_router.patch("/admin/users/{user_id}")
+async def update_user_access(
+    user_id: str,
+    update: UserAdminUpdate,
+    current_user: dict = Depends(require_role(["admin"]))
+):
+    """Change a user's roles or active flag and revoke their existing tokens (Admin only)"""
+    update_data = update.model_dump(exclude_none=True)
+    if not update_data:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+    
+    result = await db.users.update_one({"id": user_id}, {"$set": update_data})
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Outstanding access/refresh tokens carry the old roles
+    await revocation_list.revoke_user(db, user_id)
+    
+    return {"status": "success"}
+
+@api_router.get("/admin/metrics")
+async def get_metrics(
+    current_user: dict = Depends(require_role(["admin"]))
+):
+    """Get in-process performance metrics (Admin only)"""
+    return {
+        "password_hasher": password_hasher.stats(),
+        "idempotency": idempotency.stats(),
+        "jobs": jobs.stats(),
+        "receipt_numbers": receipt_numbers.stats(),
+        "pdf_renderer": pdf_service.stats(),
+        "payment_gateway": payment_service.stats(),
+        "token_cache": token_cache.stats(),
+        "login_throttle": login_throttle.stats(),
+        "revocation_list": revocation_list.stats(),
+        "campaign_list_cache": campaign_list_cache.stats(),
+        "campaign_detail_cache": campaign_detail_cache.stats(),
+        "campaign_counters": campaign_counters.stats(),
+        "campaign_progress": campaign_progress.stats(),
+        "campaign_leaderboard": campaign_leaderboard.stats(),
+        "etags": versions.stats(),
+        "campaign_snapshots": campaign_snapshots.stats()
+    }
+
 # ==================== WEBHOOK ENDPOINTS ====================
 
 @api_router.post("/webhooks/razorpay")
-async def razorpay_webhook(payload: dict):
+async def razorpay_webhook(
+    request: Request,
+    x_razorpay_signature: Optional[str] = Header(None)
+):
     """Handle Razorpay webhooks (idempotent)"""
+    # The signature covers the exact bytes sent, so check it before parsing
+    body = await request.body()
+    if not payment_service.verify_webhook_signature(body, x_razorpay_signature):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid webhook payload")
+    
     event = payload.get('event')
     
     if event == 'payment.captured':
@@ -642,28 +1003,11 @@ async def razorpay_webhook(payload: dict):
         if not attempt:
             return {"status": "ignored", "reason": "order not found"}
         
-        donation_id = attempt['donation_id']
-        
-        # Check if already processed (idempotency)
-        donation = await db.donations.find_one({"id": donation_id})
-        if donation['status'] == 'success':
+        # Only the first of webhook retries / client verify settles (idempotency)
+        settled = await settle_donation(attempt['donation_id'], payment_id)
+        if settled is None:
             return {"status": "already_processed"}
         
-        # Update donation
-        await db.donations.update_one(
-            {"id": donation_id},
-            {
-                "$set": {
-                    "status": "success",
-                    "payment_ref": payment_id,
-                    "updated_at": datetime.now(timezone.utc).isoformat()
-                }
-            }
-        )
-        
-        # Generate receipt
-        await generate_receipt_background(donation_id)
-        
     return {"status": "ok"}
 
 # Include the router in the main app
@@ -692,10 +1036,17 @@ logger = logging.getLogger(__name__)
 @api_router.post("/donations/general")
 async def create_general_donation(
     amount: float,
-    current_user: dict = Depends(get_current_user)
+    idempotency_key: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_user),
+    users: UserLoader = Depends(get_user_loader)
 ):
     """Create general donation to foundation (no campaign required)"""
-    
+    return await idempotency.run(
+        idempotency_key, current_user['sub'], "donations/general", {"amount": amount},
+        lambda: process_general_donation(amount, current_user, users)
+    )
+
+async def process_general_donation(amount: float, current_user: dict, users: UserLoader) -> dict:
     donation = Donation(
         campaign_id=None,  # No campaign
         amount=amount,
@@ -704,33 +1055,9 @@ async def create_general_donation(
         type="GENERAL"
     )
     
-    donation_dict = donation.model_dump()
-    donation_dict['created_at'] = donation_dict['created_at'].isoformat()
-    donation_dict['updated_at'] = donation_dict['updated_at'].isoformat()
+    user_doc = await users.load(current_user['sub'], ["email"])
     
-    await db.donations.insert_one(donation_dict)
-    
-    user_doc = await db.users.find_one({"id": current_user['sub']})
-    order = await payment_service.create_order(
-        amount=amount,
-        currency="INR",
-        donation_id=donation.id,
-        user_email=user_doc['email']
-    )
-    
-    attempt = PaymentAttempt(
-        donation_id=donation.id,
-        provider_payload=order
-    )
-    attempt_dict = attempt.model_dump()
-    attempt_dict['created_at'] = attempt_dict['created_at'].isoformat()
-    await db.payment_attempts.insert_one(attempt_dict)
-    
-    return {
-        "donation_id": donation.id,
-        "order": order,
-        "razorpay_key": payment_service.razorpay_key_id or "mock_key"
-    }
+    return await create_donation_intent(donation, user_doc['email'])
 
 # ==================== BLOOD DONOR ENDPOINTS ====================
 
@@ -757,12 +1084,12 @@ async def create_blood_donor(
         "availability": True,
         "last_donation_date": donor_data.get('last_donation_date'),
         "consent_public": donor_data.get('consent_public', False),
-        "consent_public_at": datetime.now(timezone.utc).isoformat() if donor_data.get('consent_public') else None,
+        "consent_public_at": datetime.now(timezone.utc) if donor_data.get('consent_public') else None,
         "moderation_hidden": False,
         "contact_reveal_count": 0,
         "created_by": current_user['sub'],
-        "created_at": datetime.now(timezone.utc).isoformat(),
-        "updated_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc),
+        "updated_at": datetime.now(timezone.utc)
     }
     
     await db.blood_donors.insert_one(donor_dict)
@@ -861,8 +1188,8 @@ async def export_campaigns(
     current_user: dict = Depends(require_role(["admin"]))
 ):
     """Export campaigns data"""
-    campaigns = await db.campaigns.find({}, {"_id": 0}).to_list(10000)
-    return campaigns
+    campaigns = await db.campaigns.find({}, {"_id": 0, "title_prefixes": 0}).to_list(10000)
+    return await campaign_counters.apply(campaigns)
 
 @api_router.get("/admin/export/blood-donors")
 async def export_blood_donors(
@@ -885,8 +1212,8 @@ async def create_event(
         "id": event_id,
         "title": event_data['title'],
         "description": event_data['description'],
-        "schedule_start": event_data['schedule_start'],
-        "schedule_end": event_data.get('schedule_end'),
+        "schedule_start": parse_datetime(event_data['schedule_start']),
+        "schedule_end": parse_datetime(event_data.get('schedule_end')),
         "venue": event_data.get('venue'),
         "capacity": event_data.get('capacity'),
         "fee_enabled": event_data.get('fee_enabled', False),
@@ -895,11 +1222,12 @@ async def create_event(
         "created_by": current_user['sub'],
         "status": "LIVE",
         "registered_count": 0,
-        "created_at": datetime.now(timezone.utc).isoformat(),
-        "updated_at": datetime.now(timezone.utc).isoformat()
+        "created_at": datetime.now(timezone.utc),
+        "updated_at": datetime.now(timezone.utc)
     }
     
     await db.events.insert_one(event_dict)
+    await versions.bump("events")
     return {"status": "success", "id": event_id}
 
 @api_router.patch("/admin/events/{event_id}")
@@ -909,8 +1237,10 @@ async def update_event(
     current_user: dict = Depends(require_role(["admin"]))
 ):
     """Update event"""
-    event_data['updated_at'] = datetime.now(timezone.utc).isoformat()
+    encode_datetimes(event_data, ["schedule_start", "schedule_end"])
+    event_data['updated_at'] = datetime.now(timezone.utc)
     await db.events.update_one({"id": event_id}, {"$set": event_data})
+    await versions.bump("events")
     return {"status": "success"}
 
 @api_router.delete("/admin/events/{event_id}")
@@ -920,16 +1250,52 @@ async def delete_event(
 ):
     """Delete event"""
     await db.events.delete_one({"id": event_id})
+    await versions.bump("events")
     return {"status": "success", "message": "Event deleted"}
 
 @api_router.get("/admin/events")
 async def get_all_events_admin(
+    page: PageParams = Depends(page_params),
     current_user: dict = Depends(require_role(["admin"]))
 ):
-    """Get all events for admin"""
-    events = await db.events.find({}, {"_id": 0}).to_list(1000)
-    return events
+    """Get all events for admin, newest first"""
+    events, next_cursor = await paginate(db.events, {}, page)
+    return {"items": events, "next_cursor": next_cursor}
+
+@app.on_event("startup")
+async def ensure_db_indexes():
+    # Builds can take a while on large collections; don't hold up startup
+    asyncio.create_task(ensure_indexes(db))
+
+@app.on_event("startup")
+async def publish_campaign_snapshots():
+    asyncio.create_task(campaign_snapshots.publish_all())
+
+@app.on_event("startup")
+async def start_password_hasher():
+    password_hasher.start()
+
+@app.on_event("startup")
+async def start_revocation_sync():
+    await revocation_list.refresh(db)
+    revocation_list.start(db)
+
+@app.on_event("startup")
+async def start_etag_version_sync():
+    await versions.refresh()
+    versions.start()
+
+@app.on_event("startup")
+async def start_job_workers():
+    jobs.start()
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    await jobs.stop()
+    await revocation_list.stop()
+    await versions.stop()
+    await campaign_snapshots.stop()
+    await payment_service.close()
+    client.close()
+    password_hasher.shutdown()
+    pdf_service.shutdown()
\ No newline at end of file
@@ -12,6 +12,8 @@ from models_delta import (
     Certificate, Sponsor, SponsorCreate,
     Banner, BannerCreate, DonationType
 )
+from loaders import UserLoader
+from pagination import PageParams, page_params, paginate
 
 # ==================== MEMBER MANAGEMENT (Volunteers Only) ====================
 
@@ -27,8 +29,6 @@ async def volunteer_create_member(
     )
     
     member_dict = member.model_dump()
-    member_dict['created_at'] = member_dict['created_at'].isoformat()
-    member_dict['updated_at'] = member_dict['updated_at'].isoformat()
     
     await db.members.insert_one(member_dict)
     
@@ -36,21 +36,25 @@ async def volunteer_create_member(
 
 @api_router.get("/volunteer/members")
 async def volunteer_get_members(
+    page: PageParams = Depends(page_params),
     current_user: dict = Depends(require_role(["volunteer"]))
 ):
-    """Get volunteer's created members"""
-    members = await db.members.find(
-        {"created_by": current_user['sub']},
-        {"_id": 0}
-    ).to_list(1000)
-    
-    for member in members:
-        if isinstance(member.get('created_at'), str):
-            member['created_at'] = datetime.fromisoformat(member['created_at'])
-        if isinstance(member.get('updated_at'), str):
-            member['updated_at'] = datetime.fromisoformat(member['updated_at'])
-    
-    return members
+    """Get volunteer's created members, newest first"""
+    members, next_cursor = await paginate(db.members, {"created_by": current_user['sub']}, page)
+    
+    return {"items": members, "next_cursor": next_cursor}
+
+@api_router.get("/volunteer/members/{member_id}")
+async def volunteer_get_member(
+    member_id: str,
+    current_user: dict = Depends(require_role(["volunteer"]))
+):
+    """Get one of the volunteer's own members"""
+    member = await db.members.find_one({"id": member_id, "created_by": current_user['sub']}, {"_id": 0})
+    if not member:
+        raise HTTPException(status_code=404, detail="Member not found or access denied")
+    
+    return member
 
 @api_router.patch("/volunteer/members/{member_id}")
 async def volunteer_update_member(
@@ -63,7 +67,7 @@ async def volunteer_update_member(
     if not member:
         raise HTTPException(status_code=404, detail="Member not found or access denied")
     
-    member_data['updated_at'] = datetime.now(timezone.utc).isoformat()
+    member_data['updated_at'] = datetime.now(timezone.utc)
     
     await db.members.update_one(
         {"id": member_id},
@@ -96,10 +100,6 @@ async def create_blood_donor(
     )
     
     donor_dict = donor.model_dump()
-    donor_dict['created_at'] = donor_dict['created_at'].isoformat()
-    donor_dict['updated_at'] = donor_dict['updated_at'].isoformat()
-    if donor_dict.get('consent_public_at'):
-        donor_dict['consent_public_at'] = donor_dict['consent_public_at'].isoformat()
     
     await db.blood_donors.insert_one(donor_dict)
     
@@ -108,7 +108,7 @@ async def create_blood_donor(
         "event": "donor_consent_granted",
         "donor_id": donor.id,
         "user_id": current_user['sub'],
-        "timestamp": datetime.now(timezone.utc).isoformat()
+        "timestamp": datetime.now(timezone.utc)
     })
     
     return donor
@@ -132,11 +132,11 @@ async def toggle_donor_consent(
     
     update_data = {
         "consent_public": consent_public,
-        "updated_at": datetime.now(timezone.utc).isoformat()
+        "updated_at": datetime.now(timezone.utc)
     }
     
     if consent_public:
-        update_data['consent_public_at'] = datetime.now(timezone.utc).isoformat()
+        update_data['consent_public_at'] = datetime.now(timezone.utc)
     
     await db.blood_donors.update_one(
         {"id": donor_id},
@@ -149,7 +149,7 @@ async def toggle_donor_consent(
         "event": event,
         "donor_id": donor_id,
         "user_id": current_user['sub'],
-        "timestamp": datetime.now(timezone.utc).isoformat()
+        "timestamp": datetime.now(timezone.utc)
     })
     
     return {"status": "success", "consent_public": consent_public}
@@ -181,8 +181,6 @@ async def search_blood_donors(
     ).to_list(100)
     
     for donor in donors:
-        if isinstance(donor.get('created_at'), str):
-            donor['created_at'] = datetime.fromisoformat(donor['created_at'])
         # Mask phone partially for privacy until reveal
         if donor.get('phone'):
             donor['phone_masked'] = donor['phone'][:3] + "***" + donor['phone'][-2:]
@@ -210,7 +208,7 @@ async def reveal_donor_contact(
     today_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
     reveal_count = await db.contact_reveals.count_documents({
         "user_id": current_user['sub'],
-        "revealed_at": {"$gte": today_start.isoformat()}
+        "revealed_at": {"$gte": today_start}
     })
     
     if reveal_count >= 5:
@@ -220,7 +218,7 @@ async def reveal_donor_contact(
     await db.contact_reveals.insert_one({
         "donor_id": donor_id,
         "user_id": current_user['sub'],
-        "revealed_at": datetime.now(timezone.utc).isoformat()
+        "revealed_at": datetime.now(timezone.utc)
     })
     
     # Increment reveal count
@@ -249,7 +247,7 @@ async def admin_hide_donor(
         "event": "donor_moderation_hide",
         "donor_id": donor_id,
         "admin_id": current_user['sub'],
-        "timestamp": datetime.now(timezone.utc).isoformat()
+        "timestamp": datetime.now(timezone.utc)
     })
     
     return {"status": "success"}
@@ -271,40 +269,47 @@ async def create_event(
     )
     
     event_dict = event.model_dump()
-    event_dict['schedule_start'] = event_dict['schedule_start'].isoformat()
-    if event_dict.get('schedule_end'):
-        event_dict['schedule_end'] = event_dict['schedule_end'].isoformat()
-    event_dict['created_at'] = event_dict['created_at'].isoformat()
-    event_dict['updated_at'] = event_dict['updated_at'].isoformat()
     
     await db.events.insert_one(event_dict)
+    await versions.bump("events")
     
     return event
 
 @api_router.get("/events")
-async def get_events(status: Optional[str] = "LIVE"):
+async def get_events(request: Request, status: Optional[str] = "LIVE"):
     """Get public events"""
+    etag = versions.etag(["events"], status)
+    not_modified = versions.not_modified(request, etag)
+    if not_modified:
+        return not_modified
+    
     query = {}
     if status:
         query['status'] = status
     
     events = await db.events.find(query, {"_id": 0}).to_list(100)
     
-    for event in events:
-        if isinstance(event.get('schedule_start'), str):
-            event['schedule_start'] = datetime.fromisoformat(event['schedule_start'])
-        if event.get('schedule_end') and isinstance(event['schedule_end'], str):
-            event['schedule_end'] = datetime.fromisoformat(event['schedule_end'])
-    
-    return events
+    return json_response(json_body(events), etag)
 
 @api_router.post("/events/{event_id}/register")
 async def register_for_event(
     event_id: str,
-    current_user: dict = Depends(get_current_user)
+    idempotency_key: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_user),
+    users: UserLoader = Depends(get_user_loader)
 ):
     """Register for event (with payment if fee enabled)"""
-    event = await db.events.find_one({"id": event_id})
+    return await idempotency.run(
+        idempotency_key, current_user['sub'], "events/register", {"event_id": event_id},
+        lambda: process_event_registration(event_id, current_user, users)
+    )
+
+async def process_event_registration(event_id: str, current_user: dict, users: UserLoader) -> dict:
+    event, existing, user_doc = await asyncio.gather(
+        db.events.find_one({"id": event_id}),
+        db.event_registrations.find_one({"event_id": event_id, "user_id": current_user['sub']}),
+        users.load(current_user['sub'], ["email"])
+    )
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
     
@@ -316,7 +321,6 @@ async def register_for_event(
         raise HTTPException(status_code=400, detail="Event is full")
     
     # Check if already registered
-    existing = await db.event_registrations.find_one({"event_id": event_id, "user_id": current_user['sub']})
     if existing:
         raise HTTPException(status_code=400, detail="Already registered")
     
@@ -330,22 +334,9 @@ async def register_for_event(
             type="EVENT_FEE"
         )
         
-        donation_dict = donation.model_dump()
-        donation_dict['created_at'] = donation_dict['created_at'].isoformat()
-        donation_dict['updated_at'] = donation_dict['updated_at'].isoformat()
-        
-        await db.donations.insert_one(donation_dict)
+        # Only register once the order exists, so a gateway failure leaves nothing behind
+        intent = await create_donation_intent(donation, user_doc['email'])
         
-        # Create payment order
-        user_doc = await db.users.find_one({"id": current_user['sub']})
-        order = await payment_service.create_order(
-            amount=event['fee_amount'],
-            currency="INR",
-            donation_id=donation.id,
-            user_email=user_doc['email']
-        )
-        
-        # Create registration with pending payment
         registration = EventRegistration(
             event_id=event_id,
             user_id=current_user['sub'],
@@ -353,17 +344,9 @@ async def register_for_event(
             payment_status="PENDING",
             donation_id=donation.id
         )
+        await db.event_registrations.insert_one(registration.model_dump())
         
-        reg_dict = registration.model_dump()
-        reg_dict['registered_at'] = reg_dict['registered_at'].isoformat()
-        await db.event_registrations.insert_one(reg_dict)
-        
-        return {
-            "status": "payment_required",
-            "donation_id": donation.id,
-            "order": order,
-            "razorpay_key": payment_service.razorpay_key_id or "mock_key"
-        }
+        return {"status": "payment_required", **intent}
     else:
         # Free registration
         registration = EventRegistration(
@@ -373,7 +356,6 @@ async def register_for_event(
         )
         
         reg_dict = registration.model_dump()
-        reg_dict['registered_at'] = reg_dict['registered_at'].isoformat()
         await db.event_registrations.insert_one(reg_dict)
         
         # Increment registered count
@@ -381,6 +363,7 @@ async def register_for_event(
             {"id": event_id},
             {"$inc": {"registered_count": 1}}
         )
+        await versions.bump("events")
         
         return {"status": "success", "message": "Registered successfully"}
 
@@ -389,15 +372,26 @@ async def register_for_event(
 @api_router.post("/volunteer/donate-on-behalf")
 async def volunteer_donate_on_behalf(
     donation_data: dict,
-    current_user: dict = Depends(require_role(["volunteer"]))
+    idempotency_key: Optional[str] = Header(None),
+    current_user: dict = Depends(require_role(["volunteer"])),
+    users: UserLoader = Depends(get_user_loader)
 ):
     """Volunteer donates on behalf of a donor (volunteer pays, donor gets receipt)"""
-    campaign = await db.campaigns.find_one({"id": donation_data['campaign_id']})
+    return await idempotency.run(
+        idempotency_key, current_user['sub'], "volunteer/donate-on-behalf", donation_data,
+        lambda: process_on_behalf_donation(donation_data, current_user, users)
+    )
+
+async def process_on_behalf_donation(donation_data: dict, current_user: dict, users: UserLoader) -> dict:
+    # Campaign, member (for the receipt) and paying volunteer in one round of lookups
+    campaign, member, volunteer = await asyncio.gather(
+        db.campaigns.find_one({"id": donation_data['campaign_id']}, {"_id": 0, "id": 1}),
+        db.members.find_one({"id": donation_data['donor_member_id']}),
+        users.load(current_user['sub'], ["email"])
+    )
     if not campaign:
         raise HTTPException(status_code=404, detail="Campaign not found")
     
-    # Get member info for receipt
-    member = await db.members.find_one({"id": donation_data['donor_member_id']})
     if not member:
         raise HTTPException(status_code=404, detail="Member not found")
     
@@ -416,25 +410,11 @@ async def volunteer_donate_on_behalf(
         pan=member.get('pan') if donation_data.get('want_80g') else None
     )
     
-    donation_dict = donation.model_dump()
-    donation_dict['created_at'] = donation_dict['created_at'].isoformat()
-    donation_dict['updated_at'] = donation_dict['updated_at'].isoformat()
-    
-    await db.donations.insert_one(donation_dict)
-    
-    # Create payment order (volunteer pays)
-    volunteer = await db.users.find_one({"id": current_user['sub']})
-    order = await payment_service.create_order(
-        amount=donation_data['amount'],
-        currency="INR",
-        donation_id=donation.id,
-        user_email=volunteer['email']
-    )
+    # Volunteer pays
+    intent = await create_donation_intent(donation, volunteer['email'])
     
     return {
-        "donation_id": donation.id,
-        "order": order,
-        "razorpay_key": payment_service.razorpay_key_id or "mock_key",
+        **intent,
         "note": f"You are paying on behalf of {member['full_name']}. Receipt will be in their name."
     }
 
@@ -0,0 +1,154 @@
+"""
+Static JSON snapshots of public campaign data.
+
+The active campaign list and each campaign's detail are written under
+<storage>/snapshots as `.json` and pre-compressed `.json.gz`, so anonymous
+traffic can be served from the `/storage` mount (or by a proxy with
+gzip_static) without running a handler. Writes are debounced per campaign,
+go to a temp file first and are moved into place with os.replace, so
+readers never see a partial file. Every snapshot carries a `version`
+(milliseconds since the epoch) and `generated_at`.
+
+    /storage/snapshots/campaigns.json
+    /storage/snapshots/campaigns/<campaign_id>.json
+"""
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOTS_ENABLED = os.environ.get('SNAPSHOTS_ENABLED', 'true').lower() == 'true'
+SNAPSHOT_DEBOUNCE_SECONDS = float(os.environ.get('SNAPSHOT_DEBOUNCE_SECONDS', 2.0))
+
+def write_atomic(path: Path, data: bytes):
+    """Write `data` to `path` via a temp file in the same directory"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+class SnapshotPublisher:
+    def __init__(self, root: Path,
+                 build_list: Callable[[], Awaitable[list]],
+                 build_detail: Callable[[str], Awaitable[Optional[dict]]],
+                 debounce: float = SNAPSHOT_DEBOUNCE_SECONDS,
+                 enabled: bool = SNAPSHOTS_ENABLED):
+        self.root = root
+        self.build_list = build_list
+        self.build_detail = build_detail
+        self.debounce = debounce
+        self.enabled = enabled
+        self._dirty: Set[str] = set()
+        self._list_dirty = False
+        self._all_dirty = False
+        # One flush at a time, so a full rebuild and an incremental pass never interleave
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.files_written = 0
+        self.errors = 0
+        self.last_flush_ms = 0.0
+        self.last_version = 0
+
+    def mark_dirty(self, campaign_id: Optional[str] = None):
+        """Schedule the list (and a campaign's detail) to be rewritten"""
+        if not self.enabled:
+            return
+        self._list_dirty = True
+        if campaign_id:
+            self._dirty.add(campaign_id)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def publish_all(self):
+        """Write the list and every listed campaign's detail (used at startup)"""
+        if not self.enabled:
+            return
+        self._list_dirty = True
+        self._all_dirty = True
+        await self._flush()
+
+    async def _flush_later(self):
+        # Changes marked while a flush is running are picked up by the next pass
+        while self._list_dirty or self._dirty:
+            await asyncio.sleep(self.debounce)
+            await self._flush()
+
+    async def _flush(self):
+        async with self._lock:
+            start = time.perf_counter()
+            dirty, self._dirty = self._dirty, set()
+            list_dirty, self._list_dirty = self._list_dirty, False
+            all_dirty, self._all_dirty = self._all_dirty, False
+            try:
+                if list_dirty:
+                    campaigns = await self.build_list()
+                    await self._write(self.root / "campaigns.json", {"items": campaigns})
+                    if all_dirty:
+                        dirty |= {campaign["id"] for campaign in campaigns}
+                for campaign_id in dirty:
+                    detail = await self.build_detail(campaign_id)
+                    path = self.root / "campaigns" / f"{campaign_id}.json"
+                    if detail is None:
+                        await asyncio.to_thread(self._remove, path)
+                    else:
+                        await self._write(path, {"campaign": detail})
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Snapshot publish failed: {str(e)}")
+                # Put the work back so the next pass retries it instead of leaving stale files
+                self._dirty |= dirty
+                self._list_dirty = self._list_dirty or list_dirty
+                self._all_dirty = self._all_dirty or all_dirty
+                if self._task is None or self._task.done():
+                    self._task = asyncio.get_running_loop().create_task(self._flush_later())
+            self.last_flush_ms = round((time.perf_counter() - start) * 1000, 2)
+
+    async def _write(self, path: Path, payload: dict):
+        version = max(int(time.time() * 1000), self.last_version + 1)
+        self.last_version = version
+        document = {
+            "version": version,
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            **payload
+        }
+        await asyncio.to_thread(self._write_files, path, document)
+        self.files_written += 2
+
+    @staticmethod
+    def _write_files(path: Path, document: dict):
+        body = json.dumps(document, separators=(",", ":")).encode()
+        write_atomic(path, body)
+        write_atomic(path.with_name(path.name + ".gz"), gzip.compress(body, compresslevel=6))
+
+    @staticmethod
+    def _remove(path: Path):
+        for target in (path, path.with_name(path.name + ".gz")):
+            if target.exists():
+                target.unlink()
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "files_written": self.files_written,
+            "errors": self.errors,
+            "pending": len(self._dirty) + int(self._list_dirty),
+            "last_flush_ms": self.last_flush_ms,
+            "last_version": self.last_version,
+        }
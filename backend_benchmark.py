@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Latency benchmarks for the WeForYou API.
+
+Run against a deployment before and after a change, saving each run, then
+compare them. The default --base-url is a local server (uvicorn's default
+port); POST benchmarks create real donations, so never point them at a
+shared or production deployment:
+
+    python backend_benchmark.py campaign-detail --save before.json
+    python backend_benchmark.py campaign-detail --save after.json --baseline before.json
+
+Benchmarks marked "direct" talk to MongoDB instead of the API and need
+MONGO_URL and DB_NAME (or --mongo-url / --db-name):
+
+    python backend_benchmark.py counters --shards 8
+    python backend_benchmark.py receipt-numbers --block-size 10 --concurrency 16
+
+"receipts" renders PDFs in-process and needs the backend requirements:
+
+    python backend_benchmark.py receipts --requests 100 --warmup 5
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+import requests
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(int(round(pct / 100 * len(ordered))) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+def summarize(name, latencies, errors, elapsed):
+    """Summary of a run with latencies in milliseconds"""
+    return {
+        "name": name,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(statistics.mean(latencies), 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+def print_summary(result, baseline=None):
+    print(f"\n📊 {result['name']}")
+    print(f"  requests: {result['requests']}  errors: {result['errors']}  throughput: {result['throughput_rps']} req/s")
+    for key in ("mean_ms", "p50_ms", "p95_ms", "p99_ms"):
+        line = f"  {key:<8} {result[key]:>10.2f}"
+        if baseline and baseline.get(key):
+            change = (result[key] - baseline[key]) / baseline[key] * 100
+            line += f"   (before {baseline[key]:.2f}, {change:+.1f}%)"
+        print(line)
+
+class WeForYouBenchmark:
+    def __init__(self, base_url="http://localhost:8000",
+                 concurrency=8, requests_count=500, warmup=20):
+        self.base_url = base_url
+        self.api_url = f"{base_url}/api"
+        self.concurrency = concurrency
+        self.requests_count = requests_count
+        self.warmup = warmup
+
+    def first_campaign_id(self):
+        response = requests.get(f"{self.api_url}/campaigns")
+        response.raise_for_status()
+        campaigns = response.json()['items']
+        if not campaigns:
+            raise RuntimeError("No active campaigns to benchmark against")
+        return campaigns[0]['id']
+
+    def run(self, name, send):
+        """Call send(session) requests_count times across the worker threads"""
+        with requests.Session() as session:
+            for _ in range(self.warmup):
+                send(session)
+
+        per_worker = self.requests_count // self.concurrency
+
+        def worker(_):
+            latencies, errors = [], 0
+            with requests.Session() as session:
+                for _ in range(per_worker):
+                    start = time.perf_counter()
+                    try:
+                        response = send(session)
+                        ok = response.status_code < 400
+                    except requests.RequestException:
+                        ok = False
+                    if ok:
+                        latencies.append((time.perf_counter() - start) * 1000)
+                    else:
+                        errors += 1
+            return latencies, errors
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            results = list(pool.map(worker, range(self.concurrency)))
+        elapsed = time.perf_counter() - start
+
+        latencies = [lat for worker_latencies, _ in results for lat in worker_latencies]
+        errors = sum(worker_errors for _, worker_errors in results)
+        return summarize(name, latencies, errors, elapsed)
+
+    def bench_campaign_detail(self, args):
+        """GET /api/campaigns/{id}"""
+        campaign_id = args.campaign_id or self.first_campaign_id()
+        url = f"{self.api_url}/campaigns/{campaign_id}"
+        return self.run(f"GET /api/campaigns/{campaign_id}", lambda session: session.get(url))
+
+    def login(self, email, password):
+        response = requests.post(f"{self.api_url}/auth/login", json={"email": email, "password": password})
+        response.raise_for_status()
+        return response.json()['access_token']
+
+    def bench_donation_create(self, args):
+        """POST /api/donations (creates pending donations and mock orders)"""
+        campaign_id = args.campaign_id or self.first_campaign_id()
+        headers = {"Authorization": f"Bearer {self.login(args.email, args.password)}"}
+        url = f"{self.api_url}/donations"
+        payload = {"campaign_id": campaign_id, "amount": 100.0, "is_anonymous": True}
+        return self.run("POST /api/donations",
+                        lambda session: session.post(url, json=payload, headers=headers))
+
+    def bench_counters(self, args):
+        """Direct: campaign total increments with 1 shard versus --shards shards"""
+        single = asyncio.run(self._run_counters(args, 1))
+        sharded = asyncio.run(self._run_counters(args, args.shards))
+        sharded["baseline"] = single
+        return sharded
+
+    async def _run_counters(self, args, shards):
+        sys.path.insert(0, str(Path(__file__).parent / "backend"))
+        from motor.motor_asyncio import AsyncIOMotorClient
+        from counters import CampaignCounters
+        from datetime_codec import get_database
+
+        client = AsyncIOMotorClient(args.mongo_url)
+        db = get_database(client, args.db_name)
+        counters = CampaignCounters(db, shards=shards, cache_ttl=0)
+        campaign_id = f"benchmark-{uuid.uuid4()}"
+        await db.campaigns.insert_one({"id": campaign_id, "current_amount": 0.0, "donor_count": 0})
+
+        per_worker = self.requests_count // self.concurrency
+
+        async def worker():
+            latencies = []
+            for _ in range(per_worker):
+                start = time.perf_counter()
+                await counters.increment(campaign_id, 100.0, donors=1)
+                latencies.append((time.perf_counter() - start) * 1000)
+            return latencies
+
+        try:
+            start = time.perf_counter()
+            results = await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+            elapsed = time.perf_counter() - start
+            totals = (await counters.totals([campaign_id]))[campaign_id]
+        finally:
+            await db.campaigns.delete_one({"id": campaign_id})
+            await db.campaign_counter_shards.delete_many({"campaign_id": campaign_id})
+            client.close()
+
+        latencies = [lat for worker_latencies in results for lat in worker_latencies]
+        # Every increment must be accounted for, whatever the shard count
+        errors = per_worker * self.concurrency - totals["donor_count"]
+        return summarize(f"campaign counter increments ({shards} shard{'s' if shards > 1 else ''})",
+                         latencies, errors, elapsed)
+
+    def bench_receipt_numbers(self, args):
+        """Direct: parallel receipt number allocation, one serial per round trip versus --block-size"""
+        single = asyncio.run(self._run_receipt_numbers(args, 1))
+        blocked = asyncio.run(self._run_receipt_numbers(args, args.block_size))
+        blocked["baseline"] = single
+        return blocked
+
+    async def _run_receipt_numbers(self, args, block_size):
+        sys.path.insert(0, str(Path(__file__).parent / "backend"))
+        from motor.motor_asyncio import AsyncIOMotorClient
+        from pymongo.errors import DuplicateKeyError
+        from datetime_codec import get_database
+        from indexes import INDEXES
+        from receipt_numbers import ReceiptNumberAllocator, receipt_prefix
+
+        client = AsyncIOMotorClient(args.mongo_url)
+        db = get_database(client, args.db_name)
+        # A financial year no real receipt uses; the unique index catches any duplicate
+        fy = "9999-00"
+        await db.receipts.create_indexes(INDEXES["receipts"])
+        await db.receipts.delete_many({"receipt_number": {"$regex": f"^{receipt_prefix(fy)}"}})
+        await db.receipt_counters.delete_one({"_id": fy})
+
+        per_worker = self.requests_count // self.concurrency
+
+        async def worker():
+            # Each worker stands in for a separate process with its own blocks
+            allocator = ReceiptNumberAllocator(db, block_size=block_size)
+            latencies, duplicates = [], 0
+            for _ in range(per_worker):
+                start = time.perf_counter()
+                number = await allocator.allocate(fy)
+                latencies.append((time.perf_counter() - start) * 1000)
+                try:
+                    await db.receipts.insert_one({
+                        "id": str(uuid.uuid4()),
+                        "donation_id": f"benchmark-{uuid.uuid4()}",
+                        "receipt_number": number
+                    })
+                except DuplicateKeyError as e:
+                    # Only a clash on receipt_number means the allocator handed a number out twice
+                    if "receipt_number" not in (e.details or {}).get("keyPattern", {}):
+                        raise
+                    duplicates += 1
+            return latencies, duplicates
+
+        try:
+            start = time.perf_counter()
+            results = await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+            elapsed = time.perf_counter() - start
+        finally:
+            await db.receipts.delete_many({"receipt_number": {"$regex": f"^{receipt_prefix(fy)}"}})
+            await db.receipt_counters.delete_one({"_id": fy})
+            client.close()
+
+        latencies = [lat for worker_latencies, _ in results for lat in worker_latencies]
+        errors = sum(duplicates for _, duplicates in results)
+        return summarize(f"receipt number allocation (block of {block_size})", latencies, errors, elapsed)
+
+    def bench_receipts(self, args):
+        """Direct: receipt PDFs rendered per second without and with the compiled template, parsed stylesheet and font cache"""
+        sys.path.insert(0, str(Path(__file__).parent / "backend"))
+        import pdf_service
+        from weasyprint import HTML
+
+        now = datetime.now(timezone.utc)
+        donation = {"amount": 2500.0, "legal_name": "Priya Sharma", "pan": "ABCDE1234F",
+                    "address": "12 MG Road, Bengaluru", "created_at": now,
+                    "payment_ref": "pay_benchmark", "method": "upi"}
+        user = {"full_name": "Priya Sharma", "email": "priya.sharma@example.com"}
+        campaign = {"title": "Benchmark campaign"}
+        receipt = {"receipt_number": "WFY202400001", "fy": "2024-25", "section_80g": True}
+        css_text = pdf_service.STYLESHEET_PATH.read_text()
+
+        def uncached():
+            # What every receipt used to pay: template build, inline CSS parse, font setup
+            env = pdf_service.create_template_environment()
+            html = env.get_template("receipt.html").render(donation=donation, user=user, campaign=campaign, receipt=receipt)
+            HTML(string=html.replace("</head>", f"<style>{css_text}</style></head>")).write_pdf()
+
+        def cached():
+            pdf_service.write_pdf(pdf_service.render_receipt_html(donation, user, campaign, receipt), None)
+
+        baseline = self._run_sequential("receipt render (per-render template, CSS and fonts)", uncached)
+        result = self._run_sequential("receipt render (compiled template, shared CSS and fonts)", cached)
+        result["baseline"] = baseline
+        return result
+
+    def _run_sequential(self, name, render):
+        """Time `render` in this process, one call at a time, after warmup calls"""
+        for _ in range(self.warmup):
+            render()
+        latencies, errors = [], 0
+        start = time.perf_counter()
+        for _ in range(self.requests_count):
+            call_start = time.perf_counter()
+            try:
+                render()
+            except Exception:
+                errors += 1
+            latencies.append((time.perf_counter() - call_start) * 1000)
+        return summarize(name, latencies, errors, time.perf_counter() - start)
+
+BENCHMARKS = {
+    "campaign-detail": WeForYouBenchmark.bench_campaign_detail,
+    "counters": WeForYouBenchmark.bench_counters,
+    "donation-create": WeForYouBenchmark.bench_donation_create,
+    "receipt-numbers": WeForYouBenchmark.bench_receipt_numbers,
+    "receipts": WeForYouBenchmark.bench_receipts,
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="WeForYou API benchmarks")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--campaign-id")
+    parser.add_argument("--email", default="priya.sharma@example.com", help="Donor account for POST benchmarks")
+    parser.add_argument("--password", default="donor123")
+    parser.add_argument("--shards", type=int, default=8, help="Shard count for the counters benchmark")
+    parser.add_argument("--block-size", type=int, default=10, help="Serials reserved per round trip for the receipt-numbers benchmark")
+    parser.add_argument("--mongo-url", default=os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--db-name", default=os.environ.get("DB_NAME", "weforyou"))
+    parser.add_argument("--save", help="Write the result to this JSON file")
+    parser.add_argument("--baseline", help="Compare against a result saved earlier with --save")
+    args = parser.parse_args()
+
+    bench = WeForYouBenchmark(args.base_url, args.concurrency, args.requests, args.warmup)
+    result = BENCHMARKS[args.benchmark](bench, args)
+
+    # Benchmarks that compare two configurations carry their own baseline
+    baseline = result.pop("baseline", None)
+    if baseline:
+        print_summary(baseline)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_summary(result, baseline)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(result, f, indent=2)
+    return 0 if result['errors'] == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,8 +3,12 @@
 import requests
 import sys
 import json
+import hmac
+import hashlib
+import os
 from datetime import datetime
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 class WeForYouAPITester:
     def __init__(self, base_url="https://donation-login-only.preview.emergentagent.com"):
@@ -129,10 +133,10 @@ class WeForYouAPITester:
         """Test getting campaigns list"""
         success, response = self.make_request('GET', 'campaigns')
         
-        if success and isinstance(response, list):
-            campaign_count = len(response)
+        if success and isinstance(response.get('items'), list):
+            campaign_count = len(response['items'])
             self.log_test(f"Get Campaigns ({campaign_count} found)", True, endpoint="campaigns")
-            return response
+            return response['items']
         else:
             self.log_test("Get Campaigns", False, str(response), "campaigns")
             return []
@@ -148,6 +152,24 @@ class WeForYouAPITester:
             self.log_test("Get Campaign Detail", False, str(response), f"campaigns/{campaign_id}")
             return None
 
+    def test_conditional_get(self, campaign_id):
+        """Test that a matching If-None-Match returns 304 Not Modified"""
+        url = f"{self.api_url}/campaigns/{campaign_id}"
+        try:
+            first = requests.get(url)
+            etag = first.headers.get('ETag')
+            second = requests.get(url, headers={'If-None-Match': etag or ''})
+        except Exception as e:
+            self.log_test("Conditional GET", False, str(e), f"campaigns/{campaign_id}")
+            return False
+        
+        if etag and second.status_code == 304 and not second.content:
+            self.log_test("Conditional GET (304 Not Modified)", True, endpoint=f"campaigns/{campaign_id}")
+            return True
+        else:
+            self.log_test("Conditional GET", False, f"ETag={etag}, status={second.status_code}", f"campaigns/{campaign_id}")
+            return False
+
     def test_create_donation(self, campaign_id):
         """Test creating a donation"""
         if not self.donor_token:
@@ -205,6 +227,77 @@ class WeForYouAPITester:
             self.log_test("Verify Donation (Mock Payment)", False, str(response), f"donations/{donation_id}/verify")
             return False
 
+    def send_webhook(self, payload, secret=None):
+        """POST a Razorpay webhook signed like Razorpay does (RAZORPAY_WEBHOOK_SECRET)"""
+        body = json.dumps(payload).encode()
+        headers = {'Content-Type': 'application/json'}
+        secret = secret if secret is not None else os.environ.get('RAZORPAY_WEBHOOK_SECRET', '')
+        if secret:
+            headers['X-Razorpay-Signature'] = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        try:
+            response = requests.post(f"{self.api_url}/webhooks/razorpay", data=body, headers=headers)
+            try:
+                response_data = response.json()
+            except ValueError:
+                response_data = {"status_code": response.status_code, "text": response.text}
+            return response.status_code == 200, response_data
+        except Exception as e:
+            return False, {"error": str(e)}
+
+    def test_unsigned_webhook_rejected(self):
+        """Test that webhooks without a valid signature cannot settle donations"""
+        payload = {"event": "payment.captured", "payload": {"payment": {"entity": {"id": "pay_forged", "order_id": "order_forged"}}}}
+        unsigned_ok, _ = self.send_webhook(payload, secret="")
+        forged_ok, _ = self.send_webhook(payload, secret="not-the-secret")
+        success = not unsigned_ok and not forged_ok
+        self.log_test("Unsigned Webhook Rejected", success,
+                      "" if success else "Webhook accepted without a valid signature", "webhooks/razorpay")
+        return success
+
+    def test_concurrent_settlement(self, campaign_id):
+        """Test that verify and webhook racing on one donation count it exactly once"""
+        # Admin analytics reads the campaign uncached
+        endpoint = f"admin/campaigns/{campaign_id}/analytics"
+        donation = self.test_create_donation(campaign_id)
+        if not donation:
+            self.log_test("Concurrent Settlement", False, "Could not create donation", endpoint)
+            return False
+        
+        _, before = self.make_request('GET', endpoint, token=self.admin_token)
+        order_id = donation['order']['id']
+        payment_id = f"pay_mock_race_{int(time.time())}"
+        verify_data = {
+            "razorpay_order_id": order_id,
+            "razorpay_payment_id": payment_id,
+            "razorpay_signature": "mock_signature"
+        }
+        webhook_data = {
+            "event": "payment.captured",
+            "payload": {"payment": {"entity": {"id": payment_id, "order_id": order_id}}}
+        }
+        
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            verify = pool.submit(self.make_request, 'POST', f"donations/{donation['donation_id']}/verify",
+                                 verify_data, self.donor_token)
+            webhook = pool.submit(self.send_webhook, webhook_data)
+            (verify_ok, verify_response), (webhook_ok, webhook_response) = verify.result(), webhook.result()
+        
+        _, after = self.make_request('GET', endpoint, token=self.admin_token)
+        try:
+            amount_delta = after['campaign']['current_amount'] - before['campaign']['current_amount']
+            donor_delta = after['campaign']['donor_count'] - before['campaign']['donor_count']
+        except (KeyError, TypeError):
+            self.log_test("Concurrent Settlement", False, f"before={before} after={after}", endpoint)
+            return False
+        
+        if verify_ok and webhook_ok and amount_delta == 1000.0 and donor_delta == 1:
+            self.log_test("Concurrent Settlement (verify + webhook counted once)", True, endpoint=endpoint)
+            return True
+        else:
+            details = f"verify={verify_response}, webhook={webhook_response}, amount_delta={amount_delta}, donor_delta={donor_delta}"
+            self.log_test("Concurrent Settlement", False, details, endpoint)
+            return False
+
     def test_get_my_donations(self):
         """Test getting user's donations"""
         if not self.donor_token:
@@ -216,10 +309,10 @@ class WeForYouAPITester:
             token=self.donor_token
         )
         
-        if success and isinstance(response, list):
-            donation_count = len(response)
+        if success and isinstance(response.get('items'), list):
+            donation_count = len(response['items'])
             self.log_test(f"Get My Donations ({donation_count} found)", True, endpoint="donations/my")
-            return response
+            return response['items']
         else:
             self.log_test("Get My Donations", False, str(response), "donations/my")
             return []
@@ -261,10 +354,10 @@ class WeForYouAPITester:
             token=self.donor_token
         )
         
-        if success and isinstance(response, list):
-            pledge_count = len(response)
+        if success and isinstance(response.get('items'), list):
+            pledge_count = len(response['items'])
             self.log_test(f"Get My Pledges ({pledge_count} found)", True, endpoint="pledges/my")
-            return response
+            return response['items']
         else:
             self.log_test("Get My Pledges", False, str(response), "pledges/my")
             return []
@@ -403,6 +496,7 @@ class WeForYouAPITester:
             # Test campaign detail
             first_campaign = campaigns[0]
             campaign_detail = self.test_get_campaign_detail(first_campaign['id'])
+            self.test_conditional_get(first_campaign['id'])
             
             # Admin Tests
             print("\n👑 Admin Tests")
@@ -425,6 +519,8 @@ class WeForYouAPITester:
                     time.sleep(2)
                     self.test_get_my_donations()
             
+            self.test_concurrent_settlement(first_campaign['id'])
+            
             # Pledge Tests (only if campaign allows recurring)
             if first_campaign.get('allow_recurring', False):
                 print("\n🔄 Pledge Tests")
@@ -437,6 +533,7 @@ class WeForYouAPITester:
         # Security Tests
         print("\n🔒 Security Tests")
         self.test_unauthorized_access()
+        self.test_unsigned_webhook_rejected()
         
         return self.generate_report()
 
@@ -1,4 +1,4 @@
-import { useEffect, useState } from "react";
+import { useEffect, useRef, useState } from "react";
 import "@/App.css";
 import { BrowserRouter, Routes, Route, Navigate } from "react-router-dom";
 import axios from "axios";
@@ -29,6 +29,46 @@ import AdminSettingsPage from "@/pages/AdminSettingsPage";
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 export const API = `${BACKEND_URL}/api`;
 
+// Page through a list endpoint: load(url) fetches the first page, loadMore() follows next_cursor
+export const usePagedList = (pageSize = 20) => {
+  const [items, setItems] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const urlRef = useRef(null);
+
+  const fetchPage = async (url, cursor) => {
+    const response = await axios.get(url, {
+      params: cursor ? { limit: pageSize, cursor } : { limit: pageSize }
+    });
+    return response.data;
+  };
+
+  const load = async (url) => {
+    urlRef.current = url;
+    const data = await fetchPage(url, null);
+    // A newer load() (e.g. the next search query) wins over a slow response
+    if (urlRef.current !== url) return;
+    setItems(data.items);
+    setNextCursor(data.next_cursor);
+  };
+
+  const loadMore = async () => {
+    const url = urlRef.current;
+    if (!url || !nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const data = await fetchPage(url, nextCursor);
+      if (urlRef.current !== url) return;
+      setItems((current) => [...current, ...data.items]);
+      setNextCursor(data.next_cursor);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  return { items, setItems, hasMore: Boolean(nextCursor), loadingMore, load, loadMore };
+};
+
 // Axios interceptor for auth
 axios.interceptors.request.use((config) => {
   const token = localStorage.getItem('token');
@@ -38,6 +78,43 @@ axios.interceptors.request.use((config) => {
   return config;
 });
 
+// Access tokens are short-lived: on a 401, swap the refresh token for a new pair once
+const NO_REFRESH_PATHS = ['/auth/login', '/auth/refresh', '/auth/logout'];
+let refreshPromise = null;
+axios.interceptors.response.use(
+  (response) => response,
+  async (error) => {
+    const original = error.config;
+    const refreshToken = localStorage.getItem('refresh_token');
+    if (
+      error.response?.status !== 401 ||
+      !refreshToken ||
+      original._retried ||
+      NO_REFRESH_PATHS.some((path) => original.url?.includes(path))
+    ) {
+      return Promise.reject(error);
+    }
+
+    original._retried = true;
+    try {
+      if (!refreshPromise) {
+        refreshPromise = axios
+          .post(`${API}/auth/refresh`, { refresh_token: refreshToken })
+          .finally(() => { refreshPromise = null; });
+      }
+      const { data } = await refreshPromise;
+      localStorage.setItem('token', data.access_token);
+      localStorage.setItem('refresh_token', data.refresh_token);
+      original.headers.Authorization = `Bearer ${data.access_token}`;
+      return axios(original);
+    } catch (refreshError) {
+      localStorage.removeItem('token');
+      localStorage.removeItem('refresh_token');
+      return Promise.reject(error);
+    }
+  }
+);
+
 export const AuthContext = React.createContext(null);
 
 function App() {
@@ -56,18 +133,32 @@ function App() {
         setUser(response.data);
       } catch (error) {
         localStorage.removeItem('token');
+        localStorage.removeItem('refresh_token');
       }
     }
     setLoading(false);
   };
 
-  const login = (token, userData) => {
+  const login = (token, userData, refreshToken) => {
     localStorage.setItem('token', token);
+    if (refreshToken) {
+      localStorage.setItem('refresh_token', refreshToken);
+    }
     setUser(userData);
   };
 
   const logout = () => {
+    const token = localStorage.getItem('token');
+    const refreshToken = localStorage.getItem('refresh_token');
+    if (token) {
+      axios.post(
+        `${API}/auth/logout`,
+        refreshToken ? { refresh_token: refreshToken } : undefined,
+        { headers: { Authorization: `Bearer ${token}` } }
+      ).catch(() => {});
+    }
     localStorage.removeItem('token');
+    localStorage.removeItem('refresh_token');
     setUser(null);
     toast.success('Logged out successfully');
   };
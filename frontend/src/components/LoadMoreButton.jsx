@@ -0,0 +1,28 @@
+import React from 'react';
+import { Button } from '@/components/ui/button';
+import { toast } from 'sonner';
+
+// "Load more" for a list from usePagedList; renders nothing on the last page
+const LoadMoreButton = ({ list, className = 'flex justify-center mt-8' }) => {
+  if (!list.hasMore) {
+    return null;
+  }
+
+  const handleClick = async () => {
+    try {
+      await list.loadMore();
+    } catch (error) {
+      toast.error('Failed to load more');
+    }
+  };
+
+  return (
+    <div className={className}>
+      <Button type="button" variant="outline" onClick={handleClick} disabled={list.loadingMore} data-testid="load-more-btn">
+        {list.loadingMore ? 'Loading...' : 'Load more'}
+      </Button>
+    </div>
+  );
+};
+
+export default LoadMoreButton;
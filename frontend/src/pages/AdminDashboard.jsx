@@ -8,7 +8,8 @@ import { Label } from '@/components/ui/label';
 import { Textarea } from '@/components/ui/textarea';
 import { Switch } from '@/components/ui/switch';
 import Navbar from '@/components/Navbar';
-import { AuthContext, API } from '@/App';
+import LoadMoreButton from '@/components/LoadMoreButton';
+import { AuthContext, API, usePagedList } from '@/App';
 import { toast } from 'sonner';
 import axios from 'axios';
 import { 
@@ -23,7 +24,8 @@ import {
 const AdminDashboard = () => {
   const navigate = useNavigate();
   const { user, logout } = useContext(AuthContext);
-  const [campaigns, setCampaigns] = useState([]);
+  const campaignList = usePagedList();
+  const campaigns = campaignList.items;
   const [donors, setDonors] = useState([]);
   const [selectedCampaign, setSelectedCampaign] = useState(null);
   const [campaignAnalytics, setCampaignAnalytics] = useState(null);
@@ -41,11 +43,10 @@ const AdminDashboard = () => {
 
   const fetchInitialData = async () => {
     try {
-      const [campaignsRes, donorsRes] = await Promise.all([
-        axios.get(`${API}/campaigns?status=active`),
-        axios.get(`${API}/admin/donors`)
+      const [donorsRes] = await Promise.all([
+        axios.get(`${API}/admin/donors`),
+        campaignList.load(`${API}/campaigns?status=active`)
       ]);
-      setCampaigns(campaignsRes.data);
       setDonors(donorsRes.data);
     } catch (error) {
       if (error.response?.status === 401) {
@@ -174,7 +175,7 @@ const AdminDashboard = () => {
               <div className="flex items-center justify-between">
                 <div>
                   <p className="text-sm text-gray-500 mb-1">Active Campaigns</p>
-                  <p className="text-3xl font-bold text-orange-600">{campaigns.length}</p>
+                  <p className="text-3xl font-bold text-orange-600">{campaigns.length}{campaignList.hasMore ? '+' : ''}</p>
                 </div>
                 <div className="w-12 h-12 bg-orange-100 rounded-full flex items-center justify-center">
                   <Target className="w-6 h-6 text-orange-600" />
@@ -273,6 +274,7 @@ const AdminDashboard = () => {
                   )}
                 </Card>
               ))}
+              <LoadMoreButton list={campaignList} className="flex justify-center" />
             </div>
           </TabsContent>
 
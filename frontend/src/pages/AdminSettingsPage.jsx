@@ -8,7 +8,8 @@ import { Textarea } from '@/components/ui/textarea';
 import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs';
 import { Dialog, DialogContent, DialogHeader, DialogTitle } from '@/components/ui/dialog';
 import Navbar from '@/components/Navbar';
-import { AuthContext, API } from '@/App';
+import LoadMoreButton from '@/components/LoadMoreButton';
+import { AuthContext, API, usePagedList } from '@/App';
 import { toast } from 'sonner';
 import axios from 'axios';
 import { Settings, Download, Edit2, Trash2, Plus, Users, Calendar } from 'lucide-react';
@@ -17,7 +18,8 @@ const AdminSettingsPage = () => {
   const navigate = useNavigate();
   const { user } = useContext(AuthContext);
   const [settings, setSettings] = useState(null);
-  const [events, setEvents] = useState([]);
+  const eventList = usePagedList();
+  const events = eventList.items;
   const [users, setUsers] = useState([]);
   const [loading, setLoading] = useState(true);
   const [showEventDialog, setShowEventDialog] = useState(false);
@@ -34,13 +36,12 @@ const AdminSettingsPage = () => {
 
   const fetchData = async () => {
     try {
-      const [settingsRes, eventsRes, usersRes] = await Promise.all([
+      const [settingsRes, usersRes] = await Promise.all([
         axios.get(`${API}/admin/settings`),
-        axios.get(`${API}/admin/events`),
-        axios.get(`${API}/admin/users`)
+        axios.get(`${API}/admin/users`),
+        fetchEvents()
       ]);
       setSettings(settingsRes.data);
-      setEvents(eventsRes.data);
       setUsers(usersRes.data);
     } catch (error) {
       toast.error('Failed to load data');
@@ -49,6 +50,8 @@ const AdminSettingsPage = () => {
     }
   };
 
+  const fetchEvents = () => eventList.load(`${API}/admin/events`);
+
   const handleSaveSettings = async (e) => {
     e.preventDefault();
     const formData = new FormData(e.target);
@@ -102,7 +105,7 @@ const AdminSettingsPage = () => {
       }
       setShowEventDialog(false);
       setEditingEvent(null);
-      fetchData();
+      fetchEvents();
     } catch (error) {
       toast.error('Failed to save event');
     }
@@ -114,7 +117,7 @@ const AdminSettingsPage = () => {
     try {
       await axios.delete(`${API}/admin/events/${eventId}`);
       toast.success('Event deleted');
-      fetchData();
+      eventList.setItems((current) => current.filter((event) => event.id !== eventId));
     } catch (error) {
       toast.error('Failed to delete event');
     }
@@ -277,6 +280,7 @@ const AdminSettingsPage = () => {
                   </Card>
                 ))}
               </div>
+              <LoadMoreButton list={eventList} className=\"flex justify-center\" />
             </div>
           </TabsContent>
 
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useContext } from 'react';
+import React, { useState, useEffect, useContext, useRef } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card';
 import { Button } from '@/components/ui/button';
@@ -33,12 +33,29 @@ const CampaignDetailPage = () => {
   const [legalName, setLegalName] = useState('');
   const [address, setAddress] = useState('');
 
+  // One Idempotency-Key per donation attempt, so retries and double clicks
+  // don't create a second donation; a changed form is a new attempt
+  const idempotencyKey = useRef(null);
+  useEffect(() => {
+    idempotencyKey.current = null;
+  }, [amount, customAmount, isAnonymous, want80G, pan, legalName, address]);
+
   const presetAmounts = [500, 1000, 2500, 5000];
 
   useEffect(() => {
     fetchCampaign();
   }, [id]);
 
+  // Live totals pushed by the server instead of re-fetching the campaign
+  useEffect(() => {
+    const source = new EventSource(`${API}/campaigns/${id}/stream`);
+    source.addEventListener('progress', (event) => {
+      const { current_amount, donor_count } = JSON.parse(event.data);
+      setCampaign((prev) => prev && { ...prev, current_amount, donor_count });
+    });
+    return () => source.close();
+  }, [id]);
+
   const fetchCampaign = async () => {
     try {
       const response = await axios.get(`${API}/campaigns/${id}`);
@@ -71,6 +88,9 @@ const CampaignDetailPage = () => {
     }
 
     setProcessing(true);
+    if (!idempotencyKey.current) {
+      idempotencyKey.current = crypto.randomUUID();
+    }
 
     try {
       const response = await axios.post(`${API}/donations`, {
@@ -82,6 +102,8 @@ const CampaignDetailPage = () => {
         pan: want80G ? pan : null,
         legal_name: want80G ? legalName : null,
         address: want80G ? address : null
+      }, {
+        headers: { 'Idempotency-Key': idempotencyKey.current }
       });
 
       const { donation_id, order, razorpay_key } = response.data;
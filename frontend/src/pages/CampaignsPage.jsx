@@ -4,26 +4,31 @@ import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/com
 import { Button } from '@/components/ui/button';
 import { Progress } from '@/components/ui/progress';
 import { Badge } from '@/components/ui/badge';
+import { Input } from '@/components/ui/input';
 import Navbar from '@/components/Navbar';
-import { AuthContext, API } from '@/App';
+import LoadMoreButton from '@/components/LoadMoreButton';
+import { AuthContext, API, usePagedList } from '@/App';
 import { toast } from 'sonner';
-import axios from 'axios';
-import { Heart, Users } from 'lucide-react';
+import { Heart, Users, Search } from 'lucide-react';
 
 const CampaignsPage = () => {
   const navigate = useNavigate();
   const { user } = useContext(AuthContext);
-  const [campaigns, setCampaigns] = useState([]);
+  const campaignList = usePagedList();
+  const campaigns = campaignList.items;
   const [loading, setLoading] = useState(true);
+  const [query, setQuery] = useState('');
 
+  // Debounce typing so each keystroke doesn't hit the search endpoint
   useEffect(() => {
-    fetchCampaigns();
-  }, []);
+    const timer = setTimeout(() => fetchCampaigns(query.trim()), query ? 300 : 0);
+    return () => clearTimeout(timer);
+  }, [query]);
 
-  const fetchCampaigns = async () => {
+  const fetchCampaigns = async (q) => {
     try {
-      const response = await axios.get(`${API}/campaigns`);
-      setCampaigns(response.data);
+      const url = q ? `${API}/campaigns/search?q=${encodeURIComponent(q)}` : `${API}/campaigns`;
+      await campaignList.load(url);
     } catch (error) {
       toast.error('Failed to load campaigns');
     } finally {
@@ -50,6 +55,16 @@ const CampaignsPage = () => {
             Active Campaigns
           </h1>
           <p className="text-gray-600 mt-2">Support causes that matter to you</p>
+          <div className="relative mt-6 max-w-md">
+            <Search className="w-4 h-4 text-gray-400 absolute left-3 top-1/2 -translate-y-1/2" />
+            <Input
+              value={query}
+              onChange={(e) => setQuery(e.target.value)}
+              placeholder="Search campaigns"
+              className="pl-9"
+              data-testid="campaign-search-input"
+            />
+          </div>
         </div>
       </div>
 
@@ -58,8 +73,12 @@ const CampaignsPage = () => {
         {campaigns.length === 0 ? (
           <div className="text-center py-20">
             <Heart className="w-16 h-16 text-gray-300 mx-auto mb-4" />
-            <h3 className="text-2xl font-semibold text-gray-600 mb-2">No Active Campaigns</h3>
-            <p className="text-gray-500">Check back soon for new campaigns!</p>
+            <h3 className="text-2xl font-semibold text-gray-600 mb-2">
+              {query ? 'No Matching Campaigns' : 'No Active Campaigns'}
+            </h3>
+            <p className="text-gray-500">
+              {query ? 'Try a different search term.' : 'Check back soon for new campaigns!'}
+            </p>
           </div>
         ) : (
           <div className="grid md:grid-cols-2 lg:grid-cols-3 gap-8">
@@ -127,6 +146,7 @@ const CampaignsPage = () => {
             })}
           </div>
         )}
+        <LoadMoreButton list={campaignList} />
       </div>
     </div>
   );
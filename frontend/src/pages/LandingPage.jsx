@@ -31,7 +31,7 @@ const LandingPage = () => {
         roles: ['donor']
       });
       
-      login(response.data.access_token, response.data.user);
+      login(response.data.access_token, response.data.user, response.data.refresh_token);
       toast.success('Account created successfully!');
       setShowAuth(false);
       navigate('/campaigns');
@@ -53,7 +53,7 @@ const LandingPage = () => {
         password: formData.get('password')
       });
       
-      login(response.data.access_token, response.data.user);
+      login(response.data.access_token, response.data.user, response.data.refresh_token);
       toast.success('Logged in successfully!');
       setShowAuth(false);
       navigate('/campaigns');
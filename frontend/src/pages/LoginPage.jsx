@@ -26,7 +26,7 @@ const LoginPage = () => {
         password: formData.get('password')
       });
       
-      login(response.data.access_token, response.data.user);
+      login(response.data.access_token, response.data.user, response.data.refresh_token);
       toast.success('Logged in successfully!');
       
       // Redirect based on role
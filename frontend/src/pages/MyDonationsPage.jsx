@@ -5,7 +5,8 @@ import { Button } from '@/components/ui/button';
 import { Badge } from '@/components/ui/badge';
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@/components/ui/select';
 import Navbar from '@/components/Navbar';
-import { AuthContext, API } from '@/App';
+import LoadMoreButton from '@/components/LoadMoreButton';
+import { AuthContext, API, usePagedList } from '@/App';
 import { toast } from 'sonner';
 import axios from 'axios';
 import { Download, Receipt, Filter, TrendingUp, Calendar, CreditCard } from 'lucide-react';
@@ -13,18 +14,24 @@ import { Download, Receipt, Filter, TrendingUp, Calendar, CreditCard } from 'luc
 const MyDonationsPage = () => {
   const navigate = useNavigate();
   const { user, logout } = useContext(AuthContext);
-  const [donations, setDonations] = useState([]);
+  const donationList = usePagedList();
+  const [summary, setSummary] = useState({ total_count: 0, successful_count: 0, total_donated: 0 });
   const [loading, setLoading] = useState(true);
   const [statusFilter, setStatusFilter] = useState('all');
 
+  // The status filter runs server-side so it covers donations not loaded yet
   useEffect(() => {
-    fetchDonations();
-  }, []);
+    fetchDonations(statusFilter);
+  }, [statusFilter]);
 
-  const fetchDonations = async () => {
+  const fetchDonations = async (status) => {
     try {
-      const response = await axios.get(`${API}/donations/my`);
-      setDonations(response.data);
+      const url = status === 'all' ? `${API}/donations/my` : `${API}/donations/my?status=${status}`;
+      const [summaryRes] = await Promise.all([
+        axios.get(`${API}/donations/my/summary`),
+        donationList.load(url)
+      ]);
+      setSummary(summaryRes.data);
     } catch (error) {
       if (error.response?.status === 401) {
         toast.error('Session expired. Please login again.');
@@ -68,15 +75,7 @@ const MyDonationsPage = () => {
     }
   };
 
-  const filteredDonations = statusFilter === 'all' 
-    ? donations 
-    : donations.filter(d => d.status === statusFilter);
-
-  const totalDonated = donations
-    .filter(d => d.status === 'success')
-    .reduce((sum, d) => sum + d.amount, 0);
-
-  const successfulDonations = donations.filter(d => d.status === 'success').length;
+  const filteredDonations = donationList.items;
 
   if (loading) {
     return (
@@ -108,7 +107,7 @@ const MyDonationsPage = () => {
               <div className="flex items-center justify-between">
                 <div>
                   <p className="text-sm text-gray-500 mb-1">Total Donated</p>
-                  <p className="text-3xl font-bold text-blue-600">₹{totalDonated.toLocaleString()}</p>
+                  <p className="text-3xl font-bold text-blue-600">₹{summary.total_donated.toLocaleString()}</p>
                 </div>
                 <div className="w-12 h-12 bg-blue-100 rounded-full flex items-center justify-center">
                   <TrendingUp className="w-6 h-6 text-blue-600" />
@@ -122,7 +121,7 @@ const MyDonationsPage = () => {
               <div className="flex items-center justify-between">
                 <div>
                   <p className="text-sm text-gray-500 mb-1">Successful Donations</p>
-                  <p className="text-3xl font-bold text-green-600">{successfulDonations}</p>
+                  <p className="text-3xl font-bold text-green-600">{summary.successful_count}</p>
                 </div>
                 <div className="w-12 h-12 bg-green-100 rounded-full flex items-center justify-center">
                   <Receipt className="w-6 h-6 text-green-600" />
@@ -136,7 +135,7 @@ const MyDonationsPage = () => {
               <div className="flex items-center justify-between">
                 <div>
                   <p className="text-sm text-gray-500 mb-1">Total Donations</p>
-                  <p className="text-3xl font-bold text-purple-600">{donations.length}</p>
+                  <p className="text-3xl font-bold text-purple-600">{summary.total_count}</p>
                 </div>
                 <div className="w-12 h-12 bg-purple-100 rounded-full flex items-center justify-center">
                   <CreditCard className="w-6 h-6 text-purple-600" />
@@ -243,6 +242,7 @@ const MyDonationsPage = () => {
             ))}
           </div>
         )}
+        <LoadMoreButton list={donationList} />
       </div>
     </div>
   );
@@ -4,7 +4,8 @@ import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/com
 import { Button } from '@/components/ui/button';
 import { Badge } from '@/components/ui/badge';
 import Navbar from '@/components/Navbar';
-import { AuthContext, API } from '@/App';
+import LoadMoreButton from '@/components/LoadMoreButton';
+import { AuthContext, API, usePagedList } from '@/App';
 import { toast } from 'sonner';
 import axios from 'axios';
 import { Calendar, Pause, Play, XCircle, RefreshCw } from 'lucide-react';
@@ -22,7 +23,8 @@ import {
 const MyPledgesPage = () => {
   const navigate = useNavigate();
   const { user, logout } = useContext(AuthContext);
-  const [pledges, setPledges] = useState([]);
+  const pledgeList = usePagedList();
+  const pledges = pledgeList.items;
   const [loading, setLoading] = useState(true);
   const [actionPledge, setActionPledge] = useState(null);
   const [actionType, setActionType] = useState(null);
@@ -33,8 +35,7 @@ const MyPledgesPage = () => {
 
   const fetchPledges = async () => {
     try {
-      const response = await axios.get(`${API}/pledges/my`);
-      setPledges(response.data);
+      await pledgeList.load(`${API}/pledges/my`);
     } catch (error) {
       if (error.response?.status === 401) {
         toast.error('Session expired. Please login again.');
@@ -52,7 +53,11 @@ const MyPledgesPage = () => {
     try {
       await axios.patch(`${API}/pledges/${pledgeId}?action=${action}`);
       toast.success(`Pledge ${action}d successfully`);
-      fetchPledges();
+      // Update the row in place rather than reloading and dropping the pages already loaded
+      const statusMap = { pause: 'paused', cancel: 'cancelled', activate: 'active' };
+      pledgeList.setItems((current) => current.map((pledge) =>
+        pledge.id === pledgeId ? { ...pledge, status: statusMap[action] } : pledge
+      ));
       setActionPledge(null);
       setActionType(null);
     } catch (error) {
@@ -200,6 +205,7 @@ const MyPledgesPage = () => {
             ))}
           </div>
         )}
+        <LoadMoreButton list={pledgeList} />
       </div>
 
       {/* Confirmation Dialog */}
@@ -6,7 +6,8 @@ import { Input } from '@/components/ui/input';
 import { Label } from '@/components/ui/label';
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@/components/ui/select';
 import Navbar from '@/components/Navbar';
-import { AuthContext, API } from '@/App';
+import LoadMoreButton from '@/components/LoadMoreButton';
+import { AuthContext, API, usePagedList } from '@/App';
 import { toast } from 'sonner';
 import axios from 'axios';
 import { Heart, User, Phone, Mail, AlertCircle } from 'lucide-react';
@@ -16,7 +17,8 @@ const OnBehalfDonationPage = () => {
   const navigate = useNavigate();
   const { user } = useContext(AuthContext);
   const [member, setMember] = useState(null);
-  const [campaigns, setCampaigns] = useState([]);
+  const campaignList = usePagedList(100);
+  const campaigns = campaignList.items;
   const [loading, setLoading] = useState(true);
   const [processing, setProcessing] = useState(false);
 
@@ -31,21 +33,17 @@ const OnBehalfDonationPage = () => {
 
   const fetchData = async () => {
     try {
-      const [memberRes, campaignsRes] = await Promise.all([
-        axios.get(`${API}/volunteer/members`),
-        axios.get(`${API}/campaigns?status=active`)
+      const [memberRes] = await Promise.all([
+        axios.get(`${API}/volunteer/members/${memberId}`),
+        campaignList.load(`${API}/campaigns?status=active`)
       ]);
-
-      const foundMember = memberRes.data.find(m => m.id === memberId);
-      if (!foundMember) {
+      setMember(memberRes.data);
+    } catch (error) {
+      if (error.response?.status === 404) {
         toast.error('Member not found');
         navigate('/volunteer/members');
         return;
       }
-
-      setMember(foundMember);
-      setCampaigns(campaignsRes.data);
-    } catch (error) {
       toast.error('Failed to load data');
     } finally {
       setLoading(false);
@@ -212,6 +210,7 @@ const OnBehalfDonationPage = () => {
                       ))}
                     </SelectContent>
                   </Select>
+                  <LoadMoreButton list={campaignList} className="mt-2" />
                 </div>
 
                 <div>
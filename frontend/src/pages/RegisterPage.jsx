@@ -29,7 +29,7 @@ const RegisterPage = () => {
         roles: ['donor']
       });
       
-      login(response.data.access_token, response.data.user);
+      login(response.data.access_token, response.data.user, response.data.refresh_token);
       toast.success('Account created successfully!');
       navigate('/campaigns');
     } catch (error) {
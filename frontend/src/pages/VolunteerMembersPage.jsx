@@ -8,7 +8,8 @@ import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@
 import { Dialog, DialogContent, DialogHeader, DialogTitle, DialogDescription } from '@/components/ui/dialog';
 import { Checkbox } from '@/components/ui/checkbox';
 import Navbar from '@/components/Navbar';
-import { AuthContext, API } from '@/App';
+import LoadMoreButton from '@/components/LoadMoreButton';
+import { AuthContext, API, usePagedList } from '@/App';
 import { toast } from 'sonner';
 import axios from 'axios';
 import { Plus, Edit2, UserPlus } from 'lucide-react';
@@ -16,7 +17,8 @@ import { Plus, Edit2, UserPlus } from 'lucide-react';
 const VolunteerMembersPage = () => {
   const navigate = useNavigate();
   const { user } = useContext(AuthContext);
-  const [members, setMembers] = useState([]);
+  const memberList = usePagedList();
+  const members = memberList.items;
   const [loading, setLoading] = useState(true);
   const [showCreateDialog, setShowCreateDialog] = useState(false);
   const [creating, setCreating] = useState(false);
@@ -32,8 +34,7 @@ const VolunteerMembersPage = () => {
 
   const fetchMembers = async () => {
     try {
-      const response = await axios.get(`${API}/volunteer/members`);
-      setMembers(response.data);
+      await memberList.load(`${API}/volunteer/members`);
     } catch (error) {
       toast.error('Failed to load members');
     } finally {
@@ -47,7 +48,7 @@ const VolunteerMembersPage = () => {
     const formData = new FormData(e.target);
 
     try {
-      await axios.post(`${API}/volunteer/members/create`, {
+      const response = await axios.post(`${API}/volunteer/members/create`, {
         full_name: formData.get('full_name'),
         phone: formData.get('phone'),
         email: formData.get('email') || null,
@@ -64,7 +65,8 @@ const VolunteerMembersPage = () => {
 
       toast.success('Member created successfully');
       setShowCreateDialog(false);
-      fetchMembers();
+      // The list is newest first, so the new member goes on top of the pages already loaded
+      memberList.setItems((current) => [response.data, ...current]);
       e.target.reset();
     } catch (error) {
       toast.error(error.response?.data?.detail || 'Failed to create member');
@@ -170,6 +172,7 @@ const VolunteerMembersPage = () => {
             ))}
           </div>
         )}
+        <LoadMoreButton list={memberList} />
       </div>
 
       {/* Create Member Dialog */}